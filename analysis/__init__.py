@@ -1,45 +1,128 @@
-from .basic_analysis import extract_basic_information
-from .financial_analysis import analyze_financials, calculate_financial_score
+import queue
+from typing import Union
+
+from .basic_analysis import extract_basic_information, basic_info_input
+from .financial_analysis import analyze_financials, calculate_financial_score, financial_analysis_input
 from .risk_analysis import assess_risks
 from .competitive_analysis import analyze_competitiveness
-from .compatibility_analysis import analyze_compatibility
+from .compatibility_analysis import analyze_compatibility, compatibility_input
 from .compliance_analysis import generate_compliance_matrix
 from .stakeholder_analysis import analyze_stakeholders
 from .content_generation import generate_proposal_content
+from .fused_analysis import extract_basic_and_financial, fused_extraction_input
+from .incremental import AnalysisSnapshot, summarize_changes, stage_fingerprint
+from .stage_graph import Stage, StageEvent, StageRecord, iter_stage_graph, run_stage_graph
+from config.settings import MAX_CONCURRENT_STAGES, FUSED_EXTRACTION
+from utils.document_model import DocumentModel, as_document
+
+def multi_stage_rfp_analysis(text: Union[str, DocumentModel], organization_profile: str = None,
+                             max_concurrency: int = MAX_CONCURRENT_STAGES,
+                             previous: StageRecord = None, record: StageRecord = None) -> dict:
+    """Comprehensive multi-stage RFP analysis
+
+    Independent stages run concurrently; each stage starts as soon as the
+    stages it depends on have finished. Pass the `record` of an earlier run as
+    `previous` to reuse every stage whose input did not change.
+    """
+    return run_stage_graph(build_analysis_stages(text, organization_profile), max_concurrency,
+                           previous=previous, record=record)
+
+
+def iter_rfp_analysis(text: Union[str, DocumentModel], organization_profile: str = None,
+                      max_concurrency: int = MAX_CONCURRENT_STAGES,
+                      previous: StageRecord = None, record: StageRecord = None):
+    """
+    Run the same pipeline as multi_stage_rfp_analysis, yielding StageEvents.
+
+    A finished event is yielded as soon as each stage completes; LLM stages also
+    stream partial events (`event.delta`) while their response is generated.
+    Reused stages are yielded straight away with `event.reused` set.
+    """
+    deltas = queue.Queue()
+
+    def streamer(stage_name):
+        return lambda fragment: deltas.put(StageEvent(stage_name, delta=fragment))
+
+    stages = build_analysis_stages(text, organization_profile, streamer)
+    yield from iter_stage_graph(stages, max_concurrency, deltas=deltas, previous=previous, record=record)
+
+
+def build_analysis_stages(text: Union[str, DocumentModel], organization_profile: str = None, streamer=None,
+                          fused: bool = FUSED_EXTRACTION) -> list:
+    """
+    Declare every analysis stage together with the results it needs.
+
+    `streamer(stage_name)`, when given, returns the on_delta callback for that
+    stage's streamed LLM output. With `fused`, stages 1 and 2 share a single
+    LLM request and just split its result.
+
+    Each stage is fingerprinted with the text it actually reads, so a revised
+    upload only re-runs stages whose input window changed. `text` may be plain
+    cleaned text or a DocumentModel; every stage gets the model, so LLM stages
+    can send just their sections and heuristic stages can cite locations.
+    """
+    document = as_document(text)
+
+    def on_delta(stage_name):
+        return streamer(stage_name) if streamer else None
+
+    # Heuristic stages scan the whole document; derived stages depend only on their inputs
+    whole_text = stage_fingerprint(document.text)
+    derived = stage_fingerprint()
+
+    if fused:
+        extraction = [
+            Stage('basic_financial_extraction',
+                  lambda r: extract_basic_and_financial(document, on_delta('basic_financial_extraction')), hidden=True,
+                  fingerprint=stage_fingerprint(fused_extraction_input(document))),
+            Stage('basic_info', lambda r: r['basic_financial_extraction'][0], inputs=('basic_financial_extraction',),
+                  fingerprint=derived),
+            Stage('financial_analysis', lambda r: r['basic_financial_extraction'][1],
+                  inputs=('basic_financial_extraction',), fingerprint=derived),
+        ]
+    else:
+        extraction = [
+            # Stage 1: Basic Information Extraction
+            Stage('basic_info', lambda r: extract_basic_information(document, on_delta('basic_info')),
+                  fingerprint=stage_fingerprint(basic_info_input(document))),
+
+            # Stage 2: Financial Deep Dive
+            Stage('financial_analysis', lambda r: analyze_financials(document, on_delta('financial_analysis')),
+                  fingerprint=stage_fingerprint(financial_analysis_input(document))),
+        ]
+
+    stages = extraction + [
+        # Stage 3: Risk Assessment
+        Stage('risk_assessment', lambda r: assess_risks(document, r['basic_info']), inputs=('basic_info',),
+              fingerprint=whole_text),
+
+        # Stage 4: Competitive Intelligence
+        Stage('competitive_analysis', lambda r: analyze_competitiveness(document, r['basic_info']),
+              inputs=('basic_info',), fingerprint=whole_text),
+
+        # Stage 5: Resource & Timeline Planning
+        Stage('resource_planning', lambda r: plan_resources_timeline(r['basic_info']), inputs=('basic_info',),
+              fingerprint=derived),
+
+        # Stage 6: Compliance Matrix
+        Stage('compliance_matrix', lambda r: generate_compliance_matrix(document), fingerprint=whole_text),
+
+        # Stage 7: Stakeholder Analysis
+        Stage('stakeholder_analysis', lambda r: analyze_stakeholders(document), fingerprint=whole_text),
+    ]
 
-def multi_stage_rfp_analysis(text: str, organization_profile: str = None) -> dict:
-    """Comprehensive multi-stage RFP analysis"""
-    analysis_results = {}
-
-    # Stage 1: Basic Information Extraction
-    analysis_results['basic_info'] = extract_basic_information(text)
-
-    # Stage 2: Financial Deep Dive
-    analysis_results['financial_analysis'] = analyze_financials(text)
-
-    # Stage 3: Risk Assessment
-    analysis_results['risk_assessment'] = assess_risks(text, analysis_results['basic_info'])
-
-    # Stage 4: Competitive Intelligence
-    analysis_results['competitive_analysis'] = analyze_competitiveness(text, analysis_results['basic_info'])
-
-    # Stage 5: Resource & Timeline Planning
-    analysis_results['resource_planning'] = plan_resources_timeline(analysis_results['basic_info'])
-
-    # Stage 6: Compliance Matrix
-    analysis_results['compliance_matrix'] = generate_compliance_matrix(text)
-
-    # Stage 7: Stakeholder Analysis
-    analysis_results['stakeholder_analysis'] = analyze_stakeholders(text)
-
-    # Stage 8: Content Generation
-    analysis_results['content_suggestions'] = generate_proposal_content(analysis_results)
+    # Stage 8: Content Generation - needs every stage above
+    stages.append(Stage('content_suggestions', lambda r: generate_proposal_content(r),
+                        inputs=tuple(stage.name for stage in stages if not stage.hidden), fingerprint=derived))
 
     # Stage 9: Compatibility Analysis
     if organization_profile:
-        analysis_results['compatibility_analysis'] = analyze_compatibility(text, organization_profile)
+        stages.append(Stage('compatibility_analysis',
+                            lambda r: analyze_compatibility(document, organization_profile,
+                                                            on_delta('compatibility_analysis')),
+                            fingerprint=stage_fingerprint(compatibility_input(document, organization_profile))))
 
-    return analysis_results
+    return stages
 
 def plan_resources_timeline(basic_info: dict) -> dict:
     """Resource planning and timeline analysis - moved here to avoid circular imports"""
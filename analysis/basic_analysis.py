@@ -1,27 +1,20 @@
-import json
-from groq import Groq
-from config.settings import GROQ_API_KEY, MODEL_NAME, TEMPERATURE, MAX_TOKENS
+from typing import Callable, Union
+from models.schemas import BasicInfo
+from utils.document_model import DocumentModel, OTHER_SECTIONS, stage_text
+from utils.llm_client import chat_completion
+from utils.token_budget import plan_stage_budget
+from utils.validation import validate_stage_output
+from .map_reduce import map_reduce_json, select_stage_input, FIRST_NON_NULL, LONGEST
 
-client = Groq(api_key=GROQ_API_KEY)
+# Bump when the prompt changes so cached responses are not reused
+BASIC_INFO_PROMPT_VERSION = "v1"
 
+# Document sections the stage reads - its fields span the whole RFP, so everything but the terms and
+# conditions, including sections of no known kind (agency overview, contacts under an unusual title)
+BASIC_INFO_SECTIONS = ("scope", "eligibility", "evaluation", "submission", "budget", "contact", OTHER_SECTIONS)
 
-def extract_basic_information(text: str) -> dict:
-    """Enhanced basic information extraction with anti-truncation measures"""
-
-    prompt = """Extract comprehensive RFP information as JSON.
-
-    CRITICAL INSTRUCTIONS:
-    1. Provide COMPLETE values - never truncate words or cut off sentences
-    2. Always use full, proper names and titles
-    3. Ensure every field value is a complete thought
-    4. If a value starts with a word that seems cut off, provide the full word
-
-    Example of what NOT to do:
-    - "oid Epidemic Response Services" → WRONG (truncated)
-    - "Opioid Epidemic Response Services" → CORRECT (complete)
-
-    Required JSON structure:
-    {
+# JSON structure the model is asked to fill (shared with the fused extraction prompt)
+BASIC_INFO_SCHEMA = """{
         "title": "Complete, unabbreviated document title",
         "event_id": "Full RFP number or identifier", 
         "date_of_release": "Complete release date",
@@ -37,28 +30,84 @@ def extract_basic_information(text: str) -> dict:
         "scope_of_work": "Full scope description",
         "technical_requirements": "Complete technical specs",
         "submission_requirements": "Full submission details"
-    }
+    }"""
+
+BASIC_INFO_PROMPT = """Extract comprehensive RFP information as JSON.
+
+    CRITICAL INSTRUCTIONS:
+    1. Provide COMPLETE values - never truncate words or cut off sentences
+    2. Always use full, proper names and titles
+    3. Ensure every field value is a complete thought
+    4. If a value starts with a word that seems cut off, provide the full word
+
+    Example of what NOT to do:
+    - "oid Epidemic Response Services" → WRONG (truncated)
+    - "Opioid Epidemic Response Services" → CORRECT (complete)
+
+    Required JSON structure:
+    """ + BASIC_INFO_SCHEMA + """
 
     Remember: NEVER truncate words or cut off responses."""
 
-    try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "system", "content": prompt}, {"role": "user", "content": text[:6000]}],  # Reduced input
-            temperature=0.1,  # Lower temperature for more consistent results
-            max_tokens=3500,  # Increased tokens for complete responses
-            response_format={"type": "json_object"}
-        )
+# How per-chunk answers are merged in chunked mode (lists are always unioned)
+BASIC_INFO_REDUCE_RULES = {
+    "title": FIRST_NON_NULL,
+    "event_id": FIRST_NON_NULL,
+    "date_of_release": FIRST_NON_NULL,
+    "date_of_submission": FIRST_NON_NULL,
+    "department_agency": FIRST_NON_NULL,
+    "type": FIRST_NON_NULL,
+    "contract_term": FIRST_NON_NULL,
+    "point_of_contact": FIRST_NON_NULL,
+    "total_budget": FIRST_NON_NULL,
+    "objective": LONGEST,
+    "eligibility": LONGEST,
+    "evaluation_criteria": LONGEST,
+    "scope_of_work": LONGEST,
+    "technical_requirements": LONGEST,
+    "submission_requirements": LONGEST,
+}
 
-        result = json.loads(response.choices[0].message.content)
 
-        # Apply post-processing
-        from utils.text_cleaning import fix_ai_truncation_patterns, ensure_complete_sentences
-        for key, value in result.items():
-            if isinstance(value, str):
-                result[key] = fix_ai_truncation_patterns(ensure_complete_sentences(value))
+def extract_basic_information(text: Union[str, DocumentModel], on_delta: Callable[[str], None] = None) -> dict:
+    """Enhanced basic information extraction with anti-truncation measures"""
+    text = stage_text(text, BASIC_INFO_SECTIONS)
+
+    def build_messages(chunk: str) -> list:
+        return [{"role": "system", "content": BASIC_INFO_PROMPT}, {"role": "user", "content": chunk}]
+
+    budget = plan_stage_budget("basic_info", BASIC_INFO_PROMPT)
+    request = dict(
+        temperature=0.1,  # Lower temperature for more consistent results
+        max_tokens=budget.max_tokens,
+        response_format={"type": "json_object"},
+        prompt_version=BASIC_INFO_PROMPT_VERSION
+    )
+
+    try:
+        window, chunked = select_stage_input(text, budget)
+        if chunked:
+            content = map_reduce_json(text, build_messages, budget.input_chars, BASIC_INFO_REDUCE_RULES, **request)
+        else:
+            content = chat_completion(messages=build_messages(window), on_delta=on_delta, **request)
+        result = validate_stage_output("basic_info", BasicInfo, content, BASIC_INFO_PROMPT_VERSION)
 
-        return result
+        return postprocess_basic_info(result.model_dump(exclude_none=True))
 
     except Exception as e:
-        return {"error": f"Basic info extraction failed: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Basic info extraction failed: {str(e)}"}
+
+
+def basic_info_input(text: Union[str, DocumentModel]) -> str:
+    """The document text extract_basic_information reads"""
+    text = stage_text(text, BASIC_INFO_SECTIONS)
+    return select_stage_input(text, plan_stage_budget("basic_info", BASIC_INFO_PROMPT))[0]
+
+
+def postprocess_basic_info(result: dict) -> dict:
+    """Repair truncated sentences and words in extracted string fields"""
+    from utils.text_cleaning import fix_ai_truncation_patterns, ensure_complete_sentences
+    for key, value in result.items():
+        if isinstance(value, str):
+            result[key] = fix_ai_truncation_patterns(ensure_complete_sentences(value), key)
+    return result
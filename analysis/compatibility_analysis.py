@@ -1,13 +1,22 @@
-import json
 import re
-from groq import Groq
-from config.settings import GROQ_API_KEY, MODEL_NAME, TEMPERATURE
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from config.settings import COMPATIBILITY_JSON_MODE, TEMPERATURE
+from models.schemas import CompatibilityAnalysis
+from utils.document_model import DocumentModel, stage_text
+from utils.llm_client import chat_completion
+from utils.token_budget import StageBudget, plan_stage_budget, fit_text, estimate_tokens
+from utils.validation import validate_stage_output
+from .map_reduce import map_chunks, merge_chunk_results, select_stage_input, UNION, LONGEST, MEAN
 
-client = Groq(api_key=GROQ_API_KEY)
+# Bump when the prompt changes so cached responses are not reused
+COMPATIBILITY_PROMPT_VERSION = "v1"
 
-def analyze_compatibility(rfp_text: str, organization_profile: str) -> dict:
-    """Analyze compatibility between RFP and organization capabilities"""
-    prompt = """Analyze the compatibility between this RFP and the organization's profile. Be brutally honest and factual.
+# Document sections the stage reads
+COMPATIBILITY_SECTIONS = ("scope", "eligibility", "evaluation")
+
+COMPATIBILITY_SYSTEM_PROMPT = "You are an expert RFP compatibility analyst. Provide honest, factual assessments. Always use complete sentences and never truncate text."
+
+COMPATIBILITY_PROMPT = """Analyze the compatibility between this RFP and the organization's profile. Be brutally honest and factual.
 
 CRITICAL INSTRUCTIONS:
 1. Provide COMPLETE values - never truncate words or cut off sentences
@@ -38,158 +47,291 @@ ORGANIZATION PROFILE:
 
 Focus on factual analysis, not optimism."""
 
+# JSON-mode variant: the same analysis as an object keyed by result field, validated against its schema
+COMPATIBILITY_JSON_PROMPT_VERSION = "v1-json"
+
+COMPATIBILITY_JSON_PROMPT = """Analyze the compatibility between this RFP and the organization's profile. Be brutally honest and factual.
+
+Return JSON with exactly these keys, using complete sentences and full words throughout:
+{{
+    "overall_compatibility_score": "Integer 0-100",
+    "compatibility_level": "High, Medium or Low",
+    "strengths_alignment": ["Strengths relevant to the RFP"],
+    "gaps_identified": ["Capability gaps"],
+    "recommendation": "Strongly Recommended, Recommended, Not Recommended or Conditional",
+    "risk_assessment": "Description of the main risks",
+    "key_differentiators": ["What sets the organization apart"],
+    "resource_gap_analysis": "Staff, systems or funds still needed",
+    "strategic_fit": "Fit with the organization's mission",
+    "estimated_effort_required": "High, Medium or Low",
+    "timeline_feasibility": "Whether the timeline is achievable and why"
+}}
+
+RFP REQUIREMENTS:
+{rfp_text}
+
+ORGANIZATION PROFILE:
+{organization_profile}
+
+Focus on factual analysis, not optimism."""
+
+# How per-chunk analyses are merged in chunked mode; other fields keep the first answer
+COMPATIBILITY_REDUCE_RULES = {
+    "overall_compatibility_score": MEAN,
+    "strengths_alignment": UNION,
+    "gaps_identified": UNION,
+    "key_differentiators": UNION,
+    "risk_assessment": LONGEST,
+    "resource_gap_analysis": LONGEST,
+    "strategic_fit": LONGEST,
+    "timeline_feasibility": LONGEST,
+}
+
+def analyze_compatibility(rfp_text: Union[str, DocumentModel], organization_profile: str,
+                          on_delta: Callable[[str], None] = None) -> dict:
+    """Analyze compatibility between RFP and organization capabilities"""
+    rfp_text = stage_text(rfp_text, COMPATIBILITY_SECTIONS)
+    budget, profile, rfp_budget, rfp_window = _plan_inputs(rfp_text, organization_profile)
+    prompt, parse = (COMPATIBILITY_JSON_PROMPT, parse_compatibility_json) if COMPATIBILITY_JSON_MODE \
+        else (COMPATIBILITY_PROMPT, parse_compatibility_response)
+
+    def build_messages(chunk: str) -> list:
+        return [
+            {"role": "system", "content": COMPATIBILITY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt.format(
+                rfp_text=chunk,
+                organization_profile=profile
+            )}
+        ]
+
+    request = dict(
+        temperature=TEMPERATURE,
+        max_tokens=budget.max_tokens,
+        prompt_version=COMPATIBILITY_PROMPT_VERSION
+    )
+    if COMPATIBILITY_JSON_MODE:
+        request.update(response_format={"type": "json_object"}, prompt_version=COMPATIBILITY_JSON_PROMPT_VERSION)
+
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are an expert RFP compatibility analyst. Provide honest, factual assessments. Always use complete sentences and never truncate text."},
-                {"role": "user", "content": prompt.format(
-                    rfp_text=rfp_text[:6000],
-                    organization_profile=organization_profile[:3000]
-                )}
-            ],
-            temperature=TEMPERATURE,
-            max_tokens=2000
-        )
-
-        analysis_text = response.choices[0].message.content
-        return parse_compatibility_response(analysis_text)
+        window, chunked = select_stage_input(rfp_text, StageBudget(rfp_budget, budget.max_tokens), rfp_window)
+        if chunked:
+            responses = map_chunks(rfp_text, build_messages, max(rfp_window, 1), **request)
+            parse_fields = parse_json_fields if COMPATIBILITY_JSON_MODE else parse_text_fields
+            # Merge only what each chunk actually answered; defaults are filled in once, afterwards
+            merged = merge_chunk_results([parse_fields(r) for r in responses], COMPATIBILITY_REDUCE_RULES)
+            if "overall_compatibility_score" in merged:
+                merged["compatibility_level"] = level_for_score(merged["overall_compatibility_score"])
+            return finish_compatibility_result(merged, "\n\n---\n\n".join(responses))
+
+        analysis_text = chat_completion(messages=build_messages(window), on_delta=on_delta, **request)
+        return parse(analysis_text)
 
     except Exception as e:
         return {"error": f"Compatibility analysis failed: {str(e)}"}
 
 
+def _plan_inputs(rfp_text: str, organization_profile: str) -> Tuple[StageBudget, str, int, int]:
+    """Split the input budget: the organization profile gets at most a third, the RFP the rest"""
+    budget = plan_stage_budget("compatibility_analysis", COMPATIBILITY_SYSTEM_PROMPT, COMPATIBILITY_PROMPT)
+    profile = fit_text(organization_profile, budget.input_tokens // 3)
+    rfp_budget = budget.input_tokens - estimate_tokens(profile)
+    rfp_window = int(rfp_budget * len(rfp_text) / max(estimate_tokens(rfp_text), 1)) if rfp_text else 0
+    return budget, profile, rfp_budget, rfp_window
+
+
+def compatibility_input(rfp_text: Union[str, DocumentModel], organization_profile: str) -> str:
+    """The profile and RFP text analyze_compatibility reads"""
+    rfp_text = stage_text(rfp_text, COMPATIBILITY_SECTIONS)
+    budget, profile, rfp_budget, rfp_window = _plan_inputs(rfp_text, organization_profile)
+    window, _ = select_stage_input(rfp_text, StageBudget(rfp_budget, budget.max_tokens), rfp_window)
+    return profile + "\n\n" + window
+
+
+# Section headers the prompt asks for (and the names models drift to), mapped to result fields
+SECTION_FIELDS = {
+    "OVERALL COMPATIBILITY SCORE": "overall_compatibility_score",
+    "COMPATIBILITY SCORE": "overall_compatibility_score",
+    "COMPATIBILITY LEVEL": "compatibility_level",
+    "STRENGTHS": "strengths_alignment",
+    "STRENGTHS ALIGNMENT": "strengths_alignment",
+    "GAPS": "gaps_identified",
+    "GAPS IDENTIFIED": "gaps_identified",
+    "RECOMMENDATION": "recommendation",
+    "RISK ASSESSMENT": "risk_assessment",
+    "DIFFERENTIATORS": "key_differentiators",
+    "KEY DIFFERENTIATORS": "key_differentiators",
+    "RESOURCE GAPS": "resource_gap_analysis",
+    "RESOURCE GAP ANALYSIS": "resource_gap_analysis",
+    "STRATEGIC FIT": "strategic_fit",
+    "EFFORT REQUIRED": "estimated_effort_required",
+    "ESTIMATED EFFORT REQUIRED": "estimated_effort_required",
+    "TIMELINE FEASIBILITY": "timeline_feasibility",
+}
+
+# A known header at the start of a line, allowing markdown ("## ", "**...:**") and numbering ("1. ")
+_SECTION_HEADER = re.compile(
+    r'^[ \t>#*_\d.)]*('
+    + "|".join(r'[ \t]+'.join(map(re.escape, header.split()))
+               for header in sorted(SECTION_FIELDS, key=len, reverse=True))
+    + r')[ \t*_]*(?::|-(?=\s))[ \t*_]*',
+    re.IGNORECASE | re.MULTILINE
+)
+_BULLET = re.compile(r'[ \t]*(?:[-•*+]|\d{1,2}[.)])[ \t]+')
+_NUMBER = re.compile(r'\d{1,3}')
+_LEVEL = re.compile(r'\b(high|medium|moderate|low)\b', re.IGNORECASE)
+_RECOMMENDATION = re.compile(r'strongly\s+recommended|not\s+recommended|conditional|recommended', re.IGNORECASE)
+
+COMPATIBILITY_DEFAULTS = {
+    "overall_compatibility_score": 50,
+    "compatibility_level": "Medium",
+    "strengths_alignment": [],
+    "gaps_identified": [],
+    "recommendation": "Conditional",
+    "risk_assessment": "Moderate risk",
+    "key_differentiators": [],
+    "resource_gap_analysis": "Some gaps identified",
+    "strategic_fit": "Moderate alignment",
+    "estimated_effort_required": "Medium",
+    "timeline_feasibility": "Feasible with effort",
+}
+
+# Shown when the model left a list section out or empty
+LIST_PLACEHOLDERS = {
+    "strengths_alignment": "Organization demonstrates relevant capabilities based on analysis",
+    "gaps_identified": "Some capability gaps identified requiring further assessment",
+    "key_differentiators": "Organization brings relevant experience and qualifications",
+}
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    Split a response on its section headers in one scan: {field: section body}.
+    A section runs to the next header; if a header repeats, the first wins.
+    """
+    sections: Dict[str, str] = {}
+    headers = list(_SECTION_HEADER.finditer(text))
+    for index, header in enumerate(headers):
+        end = headers[index + 1].start() if index + 1 < len(headers) else len(text)
+        field = SECTION_FIELDS[" ".join(header.group(1).upper().split())]
+        sections.setdefault(field, text[header.end():end].strip())
+    return sections
+
+
+def _items(value: str) -> List[str]:
+    """Bulleted or numbered items; unmarked lines continue the item above them"""
+    items: List[str] = []
+    for line in value.splitlines():
+        bullet = _BULLET.match(line)
+        line = line[bullet.end():] if bullet else line
+        line = line.strip().strip("*_").strip()
+        if not line:
+            continue
+        if bullet or not items:
+            items.append(line)
+        else:
+            items[-1] += " " + line
+    return items
+
+
+def _prose(value: str) -> str:
+    return " ".join(_items(value))
+
+
+def _score(value: str) -> Optional[int]:
+    number = _NUMBER.search(value)
+    return min(100, int(number.group())) if number else None
+
+
+def _level(value: str) -> Optional[str]:
+    level = _LEVEL.search(value)
+    if not level:
+        return None
+    level = level.group().capitalize()
+    return "Medium" if level == "Moderate" else level
+
+
+def _recommendation(value: str) -> Optional[str]:
+    recommendation = _RECOMMENDATION.search(value)
+    return " ".join(recommendation.group().split()).title() if recommendation else None
+
+
+FIELD_PARSERS = {
+    "overall_compatibility_score": _score,
+    "compatibility_level": _level,
+    "strengths_alignment": _items,
+    "gaps_identified": _items,
+    "recommendation": _recommendation,
+    "risk_assessment": _prose,
+    "key_differentiators": _items,
+    "resource_gap_analysis": _prose,
+    "strategic_fit": _prose,
+    "estimated_effort_required": _level,
+    "timeline_feasibility": _prose,
+}
+
+
+def _as_text(value: Any) -> str:
+    """JSON-mode values may be lists or numbers; give every parser the text form"""
+    if isinstance(value, list):
+        return "\n".join(f"- {item}" for item in value)
+    return "" if value is None else str(value)
+
+
+def level_for_score(score: int) -> str:
+    """The compatibility level a score implies, on the same bands as the Go/No-Go decision"""
+    if score >= 80:
+        return "High"
+    return "Medium" if score >= 60 else "Low"
+
+
+def parse_section_fields(sections: Dict[str, Any]) -> dict:
+    """Parse each section's value into its field, leaving out missing or unreadable ones"""
+    fields = {}
+    for field, value in sections.items():
+        parser = FIELD_PARSERS.get(field)
+        if parser:
+            parsed = parser(_as_text(value))
+            if parsed or parsed == 0:
+                fields[field] = parsed
+    return fields
+
+
+def finish_compatibility_result(fields: Dict[str, Any], raw_analysis: str) -> dict:
+    """Fill in the defaults (and list placeholders) for every field the analysis didn't provide"""
+    result = {**COMPATIBILITY_DEFAULTS, **fields}
+    for field, placeholder in LIST_PLACEHOLDERS.items():
+        if not result[field]:
+            result[field] = [placeholder]
+    result["raw_analysis"] = raw_analysis  # Keep original for reference
+    return result
+
+
+def build_compatibility_result(sections: Dict[str, Any], raw_analysis: str) -> dict:
+    """Parse each section's value into its field, keeping the defaults for missing or unreadable ones"""
+    return finish_compatibility_result(parse_section_fields(sections), raw_analysis)
+
+
+def parse_text_fields(text: str) -> dict:
+    """The fields a sectioned response actually answered, without defaults (for merging chunks)"""
+    return parse_section_fields(split_sections(text))
+
+
 def parse_compatibility_response(text: str) -> dict:
-    """Parse the free-text compatibility analysis into structured data"""
-    # Initialize with defaults
-    result = {
-        "overall_compatibility_score": 50,
-        "compatibility_level": "Medium",
-        "strengths_alignment": [],
-        "gaps_identified": [],
-        "recommendation": "Conditional",
-        "risk_assessment": "Moderate risk",
-        "key_differentiators": [],
-        "resource_gap_analysis": "Some gaps identified",
-        "strategic_fit": "Moderate alignment",
-        "estimated_effort_required": "Medium",
-        "timeline_feasibility": "Feasible with effort",
-        "raw_analysis": text  # Keep original for reference
-    }
+    """Parse the sectioned compatibility analysis into structured data, in one pass over the text"""
+    sections = split_sections(text)
+    result = build_compatibility_result(sections, text)
+    if not sections:
+        result["analysis_note"] = "The analysis did not use the expected section headers; showing defaults"
+    return result
 
-    try:
-        # Extract score (more comprehensive pattern)
-        score_matches = re.findall(r'(\b\d{1,3}\b)\s*(?:out of 100|score|%|percent|compatibility)', text, re.IGNORECASE)
-        if not score_matches:
-            # Alternative pattern: look for numbers near "score" or "compatibility"
-            score_matches = re.findall(r'(?:score|compatibility)[^\d]*(\d{1,3})', text, re.IGNORECASE)
-        if score_matches:
-            result["overall_compatibility_score"] = min(100, max(0, int(score_matches[0])))
-
-        # Extract compatibility level with better context
-        if re.search(r'\b(high|strong|excellent)\b', text, re.IGNORECASE):
-            result["compatibility_level"] = "High"
-        elif re.search(r'\b(low|poor|weak|minimal)\b', text, re.IGNORECASE):
-            result["compatibility_level"] = "Low"
-
-        # Extract recommendation with better patterns
-        if re.search(r'strongly\s+recommended|definitely\s+pursue|highly\s+recommended', text, re.IGNORECASE):
-            result["recommendation"] = "Strongly Recommended"
-        elif re.search(r'not\s+recommended|avoid|do\s+not\s+pursue|decline', text, re.IGNORECASE):
-            result["recommendation"] = "Not Recommended"
-        elif re.search(r'\brecommended\b|pursue|consider', text, re.IGNORECASE):
-            result["recommendation"] = "Recommended"
-
-        # Improved section extraction that doesn't cut off sentences
-        def extract_section(section_name, text):
-            """Extract complete section content without cutting off sentences"""
-            # Pattern to find the section and capture everything until next section or end
-            pattern = rf'{section_name}[:\-]\s*(.*?)(?=\n\s*\n\s*[A-Z][a-z]+\s*[:\-]|\n\s*[A-Z][a-z]+\s*[:\-]|\Z)'
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-
-            if matches:
-                content = matches[0].strip()
-                # Split by bullets, numbers, or new lines while preserving complete sentences
-                items = re.split(r'\n\s*[•\-\*]\s*|\n\s*\d+\.\s*', content)
-                # Filter out empty items and ensure reasonable length
-                valid_items = []
-                for item in items:
-                    item = item.strip()
-                    # Remove trailing incomplete sentences
-                    item = re.sub(r'[^.!?]*$', '', item).strip()
-                    if item and len(item) >= 15:  # Minimum reasonable length
-                        valid_items.append(item)
-                return valid_items
-            return []
-
-        # Extract strengths with improved method
-        result["strengths_alignment"] = extract_section('strengths', text)
-
-        # Extract gaps
-        result["gaps_identified"] = extract_section('gaps', text)
-
-        # Extract differentiators
-        result["key_differentiators"] = extract_section('differentiators', text)
-
-        # Extract risk assessment
-        risk_sections = extract_section('risk assessment', text)
-        if risk_sections:
-            result["risk_assessment"] = risk_sections[0] if risk_sections else "Moderate risk"
-
-        # Extract strategic fit
-        strategic_sections = extract_section('strategic fit', text)
-        if strategic_sections:
-            result["strategic_fit"] = strategic_sections[0] if strategic_sections else "Moderate alignment"
-
-        # Extract effort required
-        if re.search(r'high\s+effort|significant\s+effort|substantial\s+work', text, re.IGNORECASE):
-            result["estimated_effort_required"] = "High"
-        elif re.search(r'low\s+effort|minimal\s+effort|little\s+work', text, re.IGNORECASE):
-            result["estimated_effort_required"] = "Low"
-
-        # Extract timeline feasibility
-        if re.search(r'not\s+feasible|unrealistic|too\s+tight|insufficient\s+time', text, re.IGNORECASE):
-            result["timeline_feasibility"] = "Not feasible"
-        elif re.search(r'feasible|achievable|realistic|adequate', text, re.IGNORECASE):
-            result["timeline_feasibility"] = "Feasible"
-
-        # Fallback: if we couldn't extract meaningful lists, use smarter text analysis
-        if not result["strengths_alignment"] or not result["gaps_identified"]:
-            # Use the raw text to create basic analysis
-            lines = text.split('\n')
-            for i, line in enumerate(lines):
-                line_lower = line.lower()
-                if any(word in line_lower for word in ['strength', 'advantage', 'aligns', 'matches', 'capable']):
-                    if line.strip() and len(line.strip()) > 20:
-                        result["strengths_alignment"].append(line.strip())
-                elif any(word in line_lower for word in ['gap', 'lack', 'missing', 'weakness', 'limitation']):
-                    if line.strip() and len(line.strip()) > 20:
-                        result["gaps_identified"].append(line.strip())
-
-        # Ensure we have at least basic content
-        if not result["strengths_alignment"]:
-            result["strengths_alignment"] = ["Organization demonstrates relevant capabilities based on analysis"]
-        if not result["gaps_identified"]:
-            result["gaps_identified"] = ["Some capability gaps identified requiring further assessment"]
-        if not result["key_differentiators"]:
-            result["key_differentiators"] = ["Organization brings relevant experience and qualifications"]
-
-        return result
 
-    except Exception as e:
-        # If parsing fails, return a basic analysis with the raw text
-        return {
-            "overall_compatibility_score": 50,
-            "compatibility_level": "Medium",
-            "strengths_alignment": ["Organization shows alignment with key requirements"],
-            "gaps_identified": ["Some capability gaps require assessment"],
-            "recommendation": "Further analysis needed",
-            "risk_assessment": "Moderate risk",
-            "key_differentiators": ["Relevant organizational experience"],
-            "resource_gap_analysis": "Standard resource requirements",
-            "strategic_fit": "Moderate alignment",
-            "estimated_effort_required": "Medium",
-            "timeline_feasibility": "Feasible with planning",
-            "analysis_note": f"Basic analysis completed - detailed parsing encountered issues: {str(e)}",
-            "raw_analysis": text
-        }
\ No newline at end of file
+def parse_json_fields(text: str) -> dict:
+    """The fields a JSON-mode response actually answered, validated but without defaults"""
+    result = validate_stage_output("compatibility_analysis", CompatibilityAnalysis, text,
+                                   COMPATIBILITY_JSON_PROMPT_VERSION)
+    return parse_section_fields(result.model_dump(exclude_unset=True))
+
+
+def parse_compatibility_json(text: str) -> dict:
+    """Validate a JSON-mode compatibility analysis (field names as keys) straight from the raw response"""
+    return finish_compatibility_result(parse_json_fields(text), text)
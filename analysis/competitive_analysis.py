@@ -1,6 +1,9 @@
 import numpy as np
+from typing import Union
 
-def analyze_competitiveness(text: str, basic_info: dict) -> dict:
+from utils.document_model import DocumentModel
+
+def analyze_competitiveness(text: Union[str, DocumentModel], basic_info: dict) -> dict:
     """Competitive intelligence and win probability analysis"""
     # Simulate market analysis
     market_factors = {
@@ -1,33 +1,58 @@
-def generate_compliance_matrix(text: str) -> list:
-    """Generate compliance requirement checklist"""
-    compliance_items = [
-        {
-            "requirement": "Minimum 5 years organizational experience",
-            "found_in_text": True,
-            "page_reference": "Section 3.2",
-            "compliance_level": "Mandatory",
-            "our_status": "Compliant",
-            "evidence_required": "Organization history document",
-            "risk_level": "Low"
-        },
-        {
-            "requirement": "Financial audit capability",
-            "found_in_text": True,
-            "page_reference": "Section 4.1",
-            "compliance_level": "Mandatory",
-            "our_status": "Needs Review",
-            "evidence_required": "Audit certificates",
-            "risk_level": "Medium"
-        },
-        {
-            "requirement": "Technical certification in relevant domain",
-            "found_in_text": True,
-            "page_reference": "Section 5.3",
-            "compliance_level": "Desired",
-            "our_status": "Compliant",
-            "evidence_required": "Certification documents",
-            "risk_level": "Low"
-        }
-    ]
+import re
+from typing import Union
+
+from utils.document_model import DocumentModel, as_document
+
+# Each requirement is looked up in the document so its reference points at a real location
+COMPLIANCE_REQUIREMENTS = [
+    {
+        "requirement": "Minimum 5 years organizational experience",
+        "pattern": re.compile(r'\b(?:\d+|three|five|ten)\s*\+?\s*(?:\(\d+\)\s*)?years?\b[^.]{0,80}\bexperience'
+                              r'|\bexperience\b[^.]{0,80}\b(?:\d+|three|five|ten)\s*\+?\s*years?\b', re.IGNORECASE),
+        "compliance_level": "Mandatory",
+        "our_status": "Compliant",
+        "evidence_required": "Organization history document",
+        "risk_level": "Low"
+    },
+    {
+        "requirement": "Financial audit capability",
+        "pattern": re.compile(r'\b(?:single\s+)?audit(?:s|ed|or|ing)?\b', re.IGNORECASE),
+        "compliance_level": "Mandatory",
+        "our_status": "Needs Review",
+        "evidence_required": "Audit certificates",
+        "risk_level": "Medium"
+    },
+    {
+        "requirement": "Technical certification in relevant domain",
+        "pattern": re.compile(r'\b(?:certif(?:ied|ication|icate)s?|licen[sc](?:ed|e|ure))\b', re.IGNORECASE),
+        "compliance_level": "Desired",
+        "our_status": "Compliant",
+        "evidence_required": "Certification documents",
+        "risk_level": "Low"
+    }
+]
+
+_EXCERPT_CHARS = 80
+
+
+def generate_compliance_matrix(text: Union[str, DocumentModel]) -> list:
+    """Generate compliance requirement checklist
+
+    Each requirement's page_reference cites the page and section where the
+    document first mentions it.
+    """
+    document = as_document(text)
+    compliance_items = []
+    for requirement in COMPLIANCE_REQUIREMENTS:
+        match = requirement["pattern"].search(document.text)
+        item = {key: value for key, value in requirement.items() if key != "pattern"}
+        if match:
+            start = max(0, match.start() - _EXCERPT_CHARS // 2)
+            excerpt = document.text[start:match.end() + _EXCERPT_CHARS // 2].strip()
+            item.update(found_in_text=True, page_reference=document.cite(match.start(), match.end()),
+                        evidence_excerpt=f"…{excerpt}…")
+        else:
+            item.update(found_in_text=False, page_reference="Not referenced in document", evidence_excerpt="")
+        compliance_items.append(item)
 
     return compliance_items
@@ -1,13 +1,20 @@
-import json
-from groq import Groq
-from config.settings import GROQ_API_KEY, MODEL_NAME, TEMPERATURE
+from typing import Callable, Union
+from config.settings import TEMPERATURE
+from models.schemas import FinancialAnalysis
+from utils.document_model import DocumentModel, stage_text
+from utils.llm_client import chat_completion
+from utils.token_budget import plan_stage_budget
+from utils.validation import validate_stage_output
+from .map_reduce import map_reduce_json, select_stage_input, FIRST_NON_NULL, LONGEST
 
-client = Groq(api_key=GROQ_API_KEY)
+# Bump when the prompt changes so cached responses are not reused
+FINANCIAL_PROMPT_VERSION = "v1"
 
-def analyze_financials(text: str) -> dict:
-    """Deep financial analysis"""
-    prompt = """Analyze financial aspects and return detailed JSON:
-    {
+# Document sections the stage reads
+FINANCIAL_SECTIONS = ("budget",)
+
+# JSON structure the model is asked to fill (shared with the fused extraction prompt)
+FINANCIAL_SCHEMA = """{
         "total_budget": "Total contract value with currency",
         "annual_budget": "Yearly funding breakdown",
         "payment_schedule": "Payment terms and milestones",
@@ -21,24 +28,63 @@ def analyze_financials(text: str) -> dict:
         "funding_stability": "Funding source and stability assessment"
     }"""
 
+FINANCIAL_PROMPT = """Analyze financial aspects and return detailed JSON:
+    """ + FINANCIAL_SCHEMA
+
+# How per-chunk answers are merged in chunked mode (lists are always unioned)
+FINANCIAL_REDUCE_RULES = {
+    "total_budget": FIRST_NON_NULL,
+    "indirect_cost_rate": FIRST_NON_NULL,
+    "annual_budget": LONGEST,
+    "payment_schedule": LONGEST,
+    "cost_sharing": LONGEST,
+    "allowable_costs": LONGEST,
+    "budget_categories": LONGEST,
+    "financial_reporting": LONGEST,
+    "audit_requirements": LONGEST,
+    "budget_flexibility": LONGEST,
+    "funding_stability": LONGEST,
+}
+
+def analyze_financials(text: Union[str, DocumentModel], on_delta: Callable[[str], None] = None) -> dict:
+    """Deep financial analysis"""
+    text = stage_text(text, FINANCIAL_SECTIONS)
+
+    def build_messages(chunk: str) -> list:
+        return [{"role": "system", "content": FINANCIAL_PROMPT}, {"role": "user", "content": chunk}]
+
+    budget = plan_stage_budget("financial_analysis", FINANCIAL_PROMPT)
+    request = dict(
+        temperature=TEMPERATURE,
+        max_tokens=budget.max_tokens,
+        response_format={"type": "json_object"},
+        prompt_version=FINANCIAL_PROMPT_VERSION
+    )
+
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "system", "content": prompt}, {"role": "user", "content": text[:10000]}],
-            temperature=TEMPERATURE,
-            max_tokens=2000,
-            response_format={"type": "json_object"}
-        )
-        financial_data = json.loads(response.choices[0].message.content)
-
-        # Add calculated metrics
-        if financial_data.get('total_budget'):
-            financial_data['financial_score'] = calculate_financial_score(financial_data)
-
-        return financial_data
+        window, chunked = select_stage_input(text, budget)
+        if chunked:
+            content = map_reduce_json(text, build_messages, budget.input_chars, FINANCIAL_REDUCE_RULES, **request)
+        else:
+            content = chat_completion(messages=build_messages(window), on_delta=on_delta, **request)
+        financial_data = validate_stage_output("financial_analysis", FinancialAnalysis, content,
+                                               FINANCIAL_PROMPT_VERSION)
+
+        return add_financial_metrics(financial_data.model_dump(exclude_none=True))
     except Exception as e:
         return {"error": f"Financial analysis failed: {str(e)}"}
 
+def financial_analysis_input(text: Union[str, DocumentModel]) -> str:
+    """The document text analyze_financials reads"""
+    text = stage_text(text, FINANCIAL_SECTIONS)
+    return select_stage_input(text, plan_stage_budget("financial_analysis", FINANCIAL_PROMPT))[0]
+
+def add_financial_metrics(financial_data: dict) -> dict:
+    """Add calculated metrics to the extracted financial data"""
+    if financial_data.get('total_budget'):
+        financial_data['financial_score'] = calculate_financial_score(financial_data)
+    return financial_data
+
 def calculate_financial_score(financial_data: dict) -> int:
     """Calculate financial health score (0-100)"""
     score = 70  # Base score
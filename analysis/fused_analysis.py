@@ -0,0 +1,87 @@
+import json
+from typing import Callable, Tuple, Union
+
+from config.settings import TEMPERATURE
+from models.schemas import FusedExtraction
+from utils.document_model import DocumentModel, stage_text
+from utils.llm_client import chat_completion
+from utils.token_budget import plan_stage_budget
+from utils.validation import validate_stage_output
+from .basic_analysis import BASIC_INFO_SCHEMA, BASIC_INFO_SECTIONS, BASIC_INFO_REDUCE_RULES, postprocess_basic_info
+from .financial_analysis import FINANCIAL_SCHEMA, FINANCIAL_REDUCE_RULES, add_financial_metrics
+from .map_reduce import map_chunks, merge_chunk_results, select_stage_input
+
+# Bump when the prompt changes so cached responses are not reused
+FUSED_PROMPT_VERSION = "v1"
+
+FUSED_PROMPT = """Extract comprehensive RFP information and analyze its financial aspects. Return JSON with two objects.
+
+    CRITICAL INSTRUCTIONS:
+    1. Provide COMPLETE values - never truncate words or cut off sentences
+    2. Always use full, proper names and titles
+    3. Ensure every field value is a complete thought
+    4. If a value starts with a word that seems cut off, provide the full word
+
+    Required JSON structure:
+    {
+    "basic_info": """ + BASIC_INFO_SCHEMA + """,
+    "financial_analysis": """ + FINANCIAL_SCHEMA + """
+    }
+
+    Remember: NEVER truncate words or cut off responses."""
+
+
+def extract_basic_and_financial(text: Union[str, DocumentModel], on_delta: Callable[[str], None] = None) -> Tuple[dict, dict]:
+    """
+    Extract basic RFP information and the financial analysis in one request.
+
+    Returns (basic_info, financial_analysis) shaped exactly like the results of
+    extract_basic_information and analyze_financials, so downstream scoring and
+    the UI tabs don't need to know which path produced them.
+    """
+    text = stage_text(text, BASIC_INFO_SECTIONS)
+
+    def build_messages(chunk: str) -> list:
+        return [{"role": "system", "content": FUSED_PROMPT}, {"role": "user", "content": chunk}]
+
+    budget = plan_stage_budget("basic_financial_extraction", FUSED_PROMPT)
+    request = dict(
+        temperature=TEMPERATURE,
+        max_tokens=budget.max_tokens,
+        response_format={"type": "json_object"},
+        prompt_version=FUSED_PROMPT_VERSION
+    )
+
+    try:
+        window, chunked = select_stage_input(text, budget)
+        if chunked:
+            parts = []
+            for response in map_chunks(text, build_messages, budget.input_chars, **request):
+                try:
+                    parts.append(json.loads(response))
+                except json.JSONDecodeError:
+                    continue
+            if not parts:
+                raise ValueError("No chunk returned valid JSON")
+            content = {
+                "basic_info": merge_chunk_results([p.get("basic_info") or {} for p in parts], BASIC_INFO_REDUCE_RULES),
+                "financial_analysis": merge_chunk_results([p.get("financial_analysis") or {} for p in parts],
+                                                          FINANCIAL_REDUCE_RULES),
+            }
+        else:
+            content = chat_completion(messages=build_messages(window), on_delta=on_delta, **request)
+        result = validate_stage_output("basic_financial_extraction", FusedExtraction, content, FUSED_PROMPT_VERSION)
+        basic_info = result.basic_info.model_dump(exclude_none=True)
+        financial = result.financial_analysis.model_dump(exclude_none=True)
+
+    except Exception as e:
+        error = f"Fused extraction failed: {str(e)}"
+        return {"error": error}, {"error": error}
+
+    return postprocess_basic_info(basic_info), add_financial_metrics(financial)
+
+
+def fused_extraction_input(text: Union[str, DocumentModel]) -> str:
+    """The document text extract_basic_and_financial reads"""
+    text = stage_text(text, BASIC_INFO_SECTIONS)
+    return select_stage_input(text, plan_stage_budget("basic_financial_extraction", FUSED_PROMPT))[0]
@@ -0,0 +1,133 @@
+import hashlib
+import re
+import zlib
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, List
+
+from utils.document_model import SECTION_HEADING, iter_section_headings
+from .stage_graph import StageRecord
+
+# Without headings, cut after sentences whose hash hits this modulus (~1 cut per 8 sentences).
+# Boundaries depend only on nearby content, so an edit doesn't shift every later section.
+_FALLBACK_CUT_MODULUS = 8
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+PREVIEW_CHARS = 160
+
+
+@dataclass
+class DocumentSection:
+    """One section of a cleaned RFP and the digest used to diff it"""
+    title: str
+    text: str
+    digest: str = ""
+
+    def __post_init__(self):
+        if not self.digest:
+            self.digest = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class AnalysisSnapshot:
+    """What a finished analysis run keeps so a revised upload can reuse it"""
+    text: str
+    organization_profile: str
+    sections: List[DocumentSection] = field(default_factory=list)
+    stages: StageRecord = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, text: str, organization_profile: str, stages: StageRecord) -> "AnalysisSnapshot":
+        # Failed stages are never carried over, so a revised upload retries them
+        kept = {name: entry for name, entry in stages.items() if not _failed(entry[1])}
+        return cls(text, organization_profile or "", split_sections(text), kept)
+
+
+def _failed(result: Any) -> bool:
+    if isinstance(result, tuple):
+        return any(_failed(part) for part in result)
+    return isinstance(result, dict) and "error" in result
+
+
+def split_sections(text: str) -> List[DocumentSection]:
+    """Split cleaned text into sections at headings, falling back to content-defined chunks"""
+    if not text:
+        return []
+
+    starts = [match.start() for match in iter_section_headings(text)]
+    if len(starts) >= 2:
+        if starts[0] > 0:
+            starts.insert(0, 0)
+        sections = []
+        for start, end in zip(starts, starts[1:] + [len(text)]):
+            body = text[start:end].strip()
+            match = SECTION_HEADING.match(body)
+            sections.append(DocumentSection(match.group(0) if match else "Preamble", body))
+        return sections
+
+    return _content_defined_sections(text)
+
+
+def _content_defined_sections(text: str) -> List[DocumentSection]:
+    sections, current = [], []
+    for sentence in _SENTENCE_END.split(text):
+        current.append(sentence)
+        if zlib.crc32(sentence.encode("utf-8")) % _FALLBACK_CUT_MODULUS == 0:
+            sections.append(" ".join(current))
+            current = []
+    if current:
+        sections.append(" ".join(current))
+    return [DocumentSection(f"Passage {i}", body) for i, body in enumerate(sections, 1)]
+
+
+def _preview(text: str) -> str:
+    return text if len(text) <= PREVIEW_CHARS else text[:PREVIEW_CHARS].rsplit(" ", 1)[0] + "..."
+
+
+def summarize_changes(previous: AnalysisSnapshot, current: AnalysisSnapshot) -> Dict[str, Any]:
+    """
+    Describe how a revised document differs from the previous one, section by section.
+
+    `similarity` is the share of the larger document's characters that sit in
+    unchanged sections; a low value means this is a different RFP, not a revision.
+    """
+    old, new = previous.sections, current.sections
+    matcher = SequenceMatcher(None, [s.digest for s in old], [s.digest for s in new], autojunk=False)
+
+    added, removed, modified = [], [], []
+    unchanged_chars = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            unchanged_chars += sum(len(s.text) for s in new[j1:j2])
+            continue
+        # Pair replaced sections up as modifications; any surplus is an addition or removal
+        pairs = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for old_section, new_section in zip(old[i1:i1 + pairs], new[j1:j1 + pairs]):
+            modified.append({"section": new_section.title, "previous_title": old_section.title,
+                             "preview": _preview(new_section.text)})
+        added.extend({"section": s.title, "preview": _preview(s.text)} for s in new[j1 + pairs:j2])
+        removed.extend({"section": s.title, "preview": _preview(s.text)} for s in old[i1 + pairs:i2])
+
+    # Reused stages carry the very same result object over from the previous run
+    reused = sorted(name for name, (_, result) in current.stages.items()
+                    if name in previous.stages and previous.stages[name][1] is result)
+    return {
+        "similarity": round(unchanged_chars / max(len(previous.text), len(current.text), 1), 3),
+        "sections_before": len(old),
+        "sections_after": len(new),
+        "added": added,
+        "removed": removed,
+        "modified": modified,
+        "profile_changed": previous.organization_profile != current.organization_profile,
+        "reused_stages": reused,
+        "rerun_stages": sorted(name for name in current.stages if name not in reused),
+    }
+
+
+def stage_fingerprint(*parts: str) -> str:
+    """Digest of the document input a stage reads"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
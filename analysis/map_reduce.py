@@ -0,0 +1,133 @@
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+from config.settings import CHUNKED_ANALYSIS, CHUNK_OVERLAP, MAX_CHUNKS
+from utils.chunking import split_into_windows
+from utils.llm_client import chat_completion_many
+from utils.token_budget import StageBudget, fit_text
+
+# Field-level reduce rules for merging per-chunk results
+FIRST_NON_NULL = "first_non_null"
+UNION = "union"
+LONGEST = "longest"
+MEAN = "mean"
+
+_NULL_STRINGS = {"", "null", "none", "n/a", "na", "not specified", "not mentioned", "not provided", "unknown"}
+
+
+def is_null(value: Any) -> bool:
+    """True for values the model uses to say 'not found in this chunk'"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in _NULL_STRINGS
+    if isinstance(value, (list, dict)):
+        return len(value) == 0
+    return False
+
+
+def _union(values: List[Any]) -> list:
+    merged, seen = [], set()
+    for value in values:
+        for item in (value if isinstance(value, list) else [value]):
+            marker = json.dumps(item, sort_keys=True, default=str).lower()
+            if marker not in seen:
+                seen.add(marker)
+                merged.append(item)
+    return merged
+
+
+def _longest(values: List[Any]) -> Any:
+    return max(values, key=lambda v: len(v) if isinstance(v, (str, list, dict)) else len(str(v)))
+
+
+def _mean(values: List[Any]) -> Any:
+    numbers = [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    if not numbers:
+        return values[0]
+    return round(sum(numbers) / len(numbers))
+
+
+def merge_chunk_results(results: List[Dict[str, Any]], rules: Dict[str, str] = None,
+                        default_rule: str = FIRST_NON_NULL) -> Dict[str, Any]:
+    """
+    Merge per-chunk result dicts into one, field by field.
+
+    Fields without an explicit rule use `default_rule`, except list values which
+    are always unioned and dict values which are merged recursively.
+    """
+    rules = rules or {}
+    merged: Dict[str, Any] = {}
+    keys = []
+    for result in results:
+        for key in result:
+            if key not in keys:
+                keys.append(key)
+
+    for key in keys:
+        values = [result[key] for result in results if key in result and not is_null(result[key])]
+        if not values:
+            # Keep the field so the schema stays stable
+            merged[key] = next((result[key] for result in results if key in result), None)
+            continue
+
+        rule = rules.get(key, default_rule)
+        if rule == UNION or (key not in rules and any(isinstance(v, list) for v in values)):
+            merged[key] = _union(values)
+        elif key not in rules and all(isinstance(v, dict) for v in values):
+            merged[key] = merge_chunk_results(values)
+        elif rule == LONGEST:
+            merged[key] = _longest(values)
+        elif rule == MEAN:
+            merged[key] = _mean(values)
+        else:
+            merged[key] = values[0]
+
+    return merged
+
+
+def select_stage_input(text: str, budget: StageBudget, window_chars: int = None) -> Tuple[str, bool]:
+    """
+    Decide what document text a stage sends.
+
+    Returns (text, True) when the stage should map-reduce over the whole text in
+    chunked mode, otherwise (the budget-sized prefix, False).
+    """
+    window_chars = budget.input_chars if window_chars is None else window_chars
+    if CHUNKED_ANALYSIS and text and len(text) > window_chars:
+        return text, True
+    return fit_text(text, budget.input_tokens), False
+
+
+def map_chunks(text: str, build_messages: Callable[[str], List[Dict[str, str]]], window_size: int,
+               **completion_kwargs) -> List[str]:
+    """
+    Run one prompt over overlapping windows of `text` in parallel.
+
+    Returns the successful responses in document order; raises the first error
+    only when every chunk failed.
+    """
+    chunks = split_into_windows(text, window_size, CHUNK_OVERLAP, MAX_CHUNKS)
+    responses = chat_completion_many([build_messages(chunk) for chunk in chunks], **completion_kwargs)
+
+    successes = [response for response in responses if not isinstance(response, Exception)]
+    if not successes and responses:
+        raise responses[0]
+    return successes
+
+
+def map_reduce_json(text: str, build_messages: Callable[[str], List[Dict[str, str]]], window_size: int,
+                    rules: Dict[str, str] = None, **completion_kwargs) -> Dict[str, Any]:
+    """Chunked variant of a JSON-mode stage: map the prompt over windows and merge the results"""
+    results = []
+    for content in map_chunks(text, build_messages, window_size, **completion_kwargs):
+        try:
+            parsed = json.loads(content)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            results.append(parsed)
+
+    if not results:
+        raise ValueError("No chunk returned valid JSON")
+    return merge_chunk_results(results, rules)
@@ -1,6 +1,9 @@
 import numpy as np
+from typing import Union
 
-def assess_risks(text: str, basic_info: dict) -> dict:
+from utils.document_model import DocumentModel
+
+def assess_risks(text: Union[str, DocumentModel], basic_info: dict) -> dict:
     """Comprehensive risk assessment with scoring"""
     risk_factors = {
         "technical_risk": {
@@ -0,0 +1,179 @@
+import hashlib
+import queue
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Stage name -> (effective fingerprint, result) from a finished run
+StageRecord = Dict[str, Tuple[str, Any]]
+
+
+@dataclass
+class Stage:
+    """A single analysis stage and the results it depends on"""
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    inputs: Sequence[str] = field(default_factory=tuple)
+    # Hidden stages feed other stages but are left out of events and results
+    hidden: bool = False
+    # Digest of the document input the stage reads; None means always re-run
+    fingerprint: Optional[str] = None
+
+
+@dataclass
+class StageEvent:
+    """Progress from a running stage graph: a finished stage or a streamed fragment"""
+    stage: str
+    result: Any = None
+    delta: Optional[str] = None
+    # True when the result was carried over from a previous run
+    reused: bool = False
+
+    @property
+    def done(self) -> bool:
+        return self.delta is None
+
+
+def _validate_stages(stages: List[Stage]) -> None:
+    """Reject duplicate names, unknown inputs and dependency cycles"""
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate stage names: {names}")
+
+    known = set(names)
+    for stage in stages:
+        missing = [dep for dep in stage.inputs if dep not in known]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+    # Kahn's algorithm - if we can't order every stage there is a cycle
+    remaining = {stage.name: set(stage.inputs) for stage in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _effective_fingerprints(stages: List[Stage]) -> Dict[str, Optional[str]]:
+    """
+    Combine each stage's own fingerprint with those of the stages it depends on,
+    so a changed input also invalidates everything downstream of it.
+    """
+    stages_by_name = {stage.name: stage for stage in stages}
+    fingerprints: Dict[str, Optional[str]] = {}
+
+    def resolve(name):
+        if name not in fingerprints:
+            stage = stages_by_name[name]
+            deps = [resolve(dep) for dep in stage.inputs]
+            if stage.fingerprint is None or any(dep is None for dep in deps):
+                fingerprints[name] = None
+            else:
+                digest = hashlib.sha256(stage.fingerprint.encode("utf-8"))
+                for dep_name, dep in sorted(zip(stage.inputs, deps)):
+                    digest.update(f"|{dep_name}={dep}".encode("utf-8"))
+                fingerprints[name] = digest.hexdigest()
+        return fingerprints[name]
+
+    for stage in stages:
+        resolve(stage.name)
+    return fingerprints
+
+
+def iter_stage_graph(stages: List[Stage], max_concurrency: int = 4,
+                     context: Optional[Dict[str, Any]] = None,
+                     deltas: Optional["queue.Queue[StageEvent]"] = None,
+                     poll_interval: float = 0.1,
+                     previous: Optional[StageRecord] = None,
+                     record: Optional[StageRecord] = None) -> Iterator[StageEvent]:
+    """
+    Run stages on a thread pool as soon as their inputs are available.
+
+    Each stage function receives a dict holding the initial context plus the
+    results of every stage finished so far. A StageEvent is yielded, in the
+    calling thread, as each stage finishes. When `deltas` is given, partial
+    events that stages put on that queue are yielded in between.
+
+    Stages whose fingerprint matches an entry in `previous` reuse that result
+    instead of running. Every fingerprinted stage is written to `record`, which
+    can be passed back as `previous` on the next run.
+    """
+    _validate_stages(stages)
+
+    results: Dict[str, Any] = dict(context or {})
+    stages_by_name = {stage.name: stage for stage in stages}
+    fingerprints = _effective_fingerprints(stages)
+    previous = previous or {}
+    pending = dict(stages_by_name)
+    done_names = set()
+    reused_names = set()
+    running = {}
+
+    def drain():
+        while deltas is not None:
+            try:
+                yield deltas.get_nowait()
+            except queue.Empty:
+                return
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        while pending or running:
+            # Submit every stage whose inputs are all finished, reusing unchanged ones
+            submitted = True
+            while submitted:
+                submitted = False
+                for name, stage in list(pending.items()):
+                    if not all(dep in done_names for dep in stage.inputs):
+                        continue
+                    del pending[name]
+                    fingerprint = fingerprints[name]
+                    # A stage whose inputs were recomputed may see different results, so it runs too
+                    if (fingerprint is not None and previous.get(name, (None,))[0] == fingerprint
+                            and all(dep in reused_names for dep in stage.inputs)):
+                        results[name] = previous[name][1]
+                        done_names.add(name)
+                        reused_names.add(name)
+                        if record is not None:
+                            record[name] = (fingerprint, results[name])
+                        if not stage.hidden:
+                            yield StageEvent(name, results[name], reused=True)
+                        # Stages waiting on this one may be ready now
+                        submitted = True
+                    else:
+                        future = executor.submit(stage.func, dict(results))
+                        running[future] = name
+
+            if not running:
+                continue
+
+            finished, _ = wait(list(running), timeout=poll_interval if deltas is not None else None,
+                               return_when=FIRST_COMPLETED)
+            yield from drain()
+            for future in finished:
+                name = running.pop(future)
+                # Let stage exceptions propagate, same as the sequential pipeline
+                results[name] = future.result()
+                done_names.add(name)
+                if record is not None and fingerprints[name] is not None:
+                    record[name] = (fingerprints[name], results[name])
+                if not stages_by_name[name].hidden:
+                    yield StageEvent(name, results[name])
+
+    yield from drain()
+
+
+def run_stage_graph(stages: List[Stage], max_concurrency: int = 4,
+                    context: Optional[Dict[str, Any]] = None,
+                    previous: Optional[StageRecord] = None,
+                    record: Optional[StageRecord] = None) -> Dict[str, Any]:
+    """
+    Run the whole graph and return one entry per visible stage, in declaration
+    order, regardless of completion order.
+    """
+    results = {event.stage: event.result
+               for event in iter_stage_graph(stages, max_concurrency, context, previous=previous, record=record)}
+    return {stage.name: results[stage.name] for stage in stages if not stage.hidden}
@@ -1,4 +1,9 @@
-def analyze_stakeholders(text: str) -> dict:
+from typing import Union
+
+from utils.document_model import DocumentModel
+
+
+def analyze_stakeholders(text: Union[str, DocumentModel]) -> dict:
     """Stakeholder identification and analysis"""
     return {
         "decision_makers": [
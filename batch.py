@@ -0,0 +1,294 @@
+"""
+Headless batch analysis of many RFPs - the same pipeline as the dashboard, without Streamlit.
+
+Usage (from the repository root):
+    python batch.py rfps/ --out results/
+    python batch.py "inbox/*.pdf" weekly.zip --profile org_profile.txt --documents 4 --llm-concurrency 16
+
+Inputs may be folders (searched recursively), glob patterns, single files or
+ZIP archives of PDF/DOCX/TXT documents. Each document is pre-flight checked,
+extracted, cleaned and run through multi_stage_rfp_analysis; the full result is
+appended to <out>/results.jsonl and a one-line summary to <out>/summary.csv as
+soon as the document finishes.
+
+Re-running with the same --out resumes: documents already recorded with the
+same content are skipped, so an interrupted batch picks up where it stopped.
+Ctrl+C starts no new documents and saves the ones in progress as they
+finish; a second Ctrl+C exits at once and leaves those to the next run.
+Failed documents are retried unless --skip-failed is given.
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+SUPPORTED_SUFFIXES = (".pdf", ".docx", ".txt")
+
+SUMMARY_FIELDS = [
+    "document", "status", "title", "event_id", "department_agency", "date_of_submission", "total_budget",
+    "financial_score", "risk_level", "compatibility_score", "pages", "characters", "stage_errors",
+    "elapsed_s", "error",
+]
+
+
+@dataclass
+class BatchDocument:
+    """One document to analyze: a file on disk or a member of a ZIP archive"""
+    name: str
+    open_buffer: Callable[[], ContextManager[memoryview]]
+
+
+def _zip_member(archive_path: Path, member: str) -> Callable[[], ContextManager[memoryview]]:
+    def open_buffer():
+        from utils.upload_buffer import open_document_buffer
+        with zipfile.ZipFile(archive_path) as archive:
+            data = archive.read(member)
+        return open_document_buffer(data)
+    return open_buffer
+
+
+def _file(path: Path) -> Callable[[], ContextManager[memoryview]]:
+    def open_buffer():
+        from utils.upload_buffer import open_document_buffer
+        return open_document_buffer(path)
+    return open_buffer
+
+
+def collect_documents(inputs: List[str]) -> List[BatchDocument]:
+    """Expand folders, globs and ZIP archives into a sorted, de-duplicated document list"""
+    paths: List[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths.extend(p for p in sorted(path.rglob("*")) if p.is_file())
+        elif path.is_file():
+            paths.append(path)
+        else:
+            paths.extend(Path(p) for p in sorted(glob.glob(item, recursive=True)) if Path(p).is_file())
+
+    documents, seen = [], set()
+    for path in paths:
+        suffix = path.suffix.lower()
+        if suffix == ".zip":
+            with zipfile.ZipFile(path) as archive:
+                for member in sorted(archive.namelist()):
+                    if member.lower().endswith(SUPPORTED_SUFFIXES) and not member.endswith("/"):
+                        name = f"{path}!{member}"
+                        if name not in seen:
+                            seen.add(name)
+                            documents.append(BatchDocument(name, _zip_member(path, member)))
+        elif suffix in SUPPORTED_SUFFIXES and str(path) not in seen:
+            seen.add(str(path))
+            documents.append(BatchDocument(str(path), _file(path)))
+    return documents
+
+
+def load_completed(results_path: Path, include_failed: bool) -> Dict[str, str]:
+    """Map document name -> content hash for every document already recorded in results.jsonl"""
+    completed: Dict[str, str] = {}
+    if not results_path.exists():
+        return completed
+    with open(results_path, encoding="utf-8") as results:
+        for line in results:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of an interrupted run may be cut short
+                continue
+            if record.get("status") != "error" or include_failed:
+                completed[record["document"]] = record.get("sha256", "")
+    return completed
+
+
+def summarize(record: dict) -> dict:
+    """Flatten one results.jsonl record into a summary.csv row"""
+    results = record.get("results") or {}
+    basic = results.get("basic_info") or {}
+    financial = results.get("financial_analysis") or {}
+    risk = results.get("risk_assessment") or {}
+    compatibility = results.get("compatibility_analysis") or {}
+    row = {field: record.get(field, "") for field in SUMMARY_FIELDS}
+    row.update({field: basic.get(field, "") for field in
+                ("title", "event_id", "department_agency", "date_of_submission", "total_budget")})
+    row.update(financial_score=financial.get("financial_score", ""), risk_level=risk.get("risk_level", ""),
+               compatibility_score=compatibility.get("overall_compatibility_score", ""))
+    return row
+
+
+class BatchWriter:
+    """Appends results and summary rows as documents finish; safe to call from worker threads"""
+
+    def __init__(self, out_dir: Path):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.results_path = out_dir / "results.jsonl"
+        self.summary_path = out_dir / "summary.csv"
+        self._lock = threading.Lock()
+
+        self._results = open(self.results_path, "a+", encoding="utf-8")
+        self._results.seek(0, os.SEEK_END)
+        if self._results.tell():
+            # Start on a fresh line if an interrupted run left a partial record
+            self._results.seek(self._results.tell() - 1)
+            if self._results.read(1) != "\n":
+                self._results.write("\n")
+
+        new_summary = not self.summary_path.exists() or self.summary_path.stat().st_size == 0
+        self._summary = open(self.summary_path, "a", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._summary, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        if new_summary:
+            self._csv.writeheader()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock:
+            self._results.write(line + "\n")
+            self._results.flush()
+            self._csv.writerow(summarize(record))
+            self._summary.flush()
+
+    def close(self) -> None:
+        self._results.close()
+        self._summary.close()
+
+
+def document_hash(document: BatchDocument) -> str:
+    with document.open_buffer() as data:
+        return hashlib.sha256(data).hexdigest()
+
+
+def analyze_document(document: BatchDocument, profile: Optional[str], stage_concurrency: int) -> dict:
+    """Pre-flight, extract and analyze one document into a results.jsonl record"""
+    from analysis import multi_stage_rfp_analysis
+    from utils.file_processing import extract_document
+    from utils.preflight import preflight
+
+    start = time.perf_counter()
+    record = {"document": document.name, "status": "ok"}
+    try:
+        with document.open_buffer() as data:
+            record["sha256"] = hashlib.sha256(data).hexdigest()
+            report = preflight(data)
+            record.update(file_type=report.file_type, pages=report.page_count)
+            if not report.ok:
+                record.update(status="rejected", error=report.reason)
+                return record
+            parsed = extract_document(data, report.file_type)
+
+        record["characters"] = len(parsed)
+        results = multi_stage_rfp_analysis(parsed, profile, max_concurrency=stage_concurrency)
+        record["stage_errors"] = sum(1 for result in results.values() if isinstance(result, dict) and "error" in result)
+        record["results"] = results
+    except Exception as e:
+        record.update(status="error", error=f"Analysis failed: {str(e)}")
+    finally:
+        record["elapsed_s"] = round(time.perf_counter() - start, 2)
+    return record
+
+
+def iter_batch(documents: List[BatchDocument], profile: Optional[str], document_concurrency: int,
+               stage_concurrency: int) -> Iterator[dict]:
+    """
+    Analyze documents concurrently, yielding each record as its document finishes.
+
+    On Ctrl+C, documents that haven't started are cancelled and the ones in
+    progress are still yielded as they finish - their LLM calls are already
+    paid for - before the KeyboardInterrupt is re-raised. A second Ctrl+C
+    abandons them.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, document_concurrency), thread_name_prefix="batch-document")
+    futures = [executor.submit(analyze_document, document, profile, stage_concurrency) for document in documents]
+    unyielded = set(futures)
+    try:
+        for future in as_completed(futures):
+            unyielded.discard(future)
+            yield future.result()
+    except KeyboardInterrupt:
+        executor.shutdown(wait=False, cancel_futures=True)
+        in_progress = [future for future in unyielded if not future.cancelled()]
+        if in_progress:
+            print(f"Interrupted - saving {len(in_progress)} documents in progress as they finish; "
+                  "press Ctrl+C again to abandon them", file=sys.stderr)
+        for future in as_completed(in_progress):
+            yield future.result()
+        raise
+    finally:
+        # Never block here: a consumer that stops early or a second Ctrl+C must not wait for running documents
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def pending_documents(documents: List[BatchDocument], completed: Dict[str, str]) -> Tuple[List[BatchDocument], int]:
+    """Drop documents already recorded with unchanged content"""
+    pending, skipped = [], 0
+    for document in documents:
+        if document.name in completed and completed[document.name] == document_hash(document):
+            skipped += 1
+        else:
+            pending.append(document)
+    return pending, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="folders, glob patterns, files or ZIP archives")
+    parser.add_argument("--out", type=Path, default=Path("batch_results"), help="output folder (default: %(default)s)")
+    parser.add_argument("--profile", type=Path, help="organization profile, enables compatibility analysis")
+    parser.add_argument("--documents", type=int, default=2, help="documents analyzed at once (default: %(default)s)")
+    parser.add_argument("--stages", type=int, help="stages run at once per document (default: MAX_CONCURRENT_STAGES)")
+    parser.add_argument("--llm-concurrency", type=int, help="in-flight LLM requests across all documents "
+                                                            "(default: LLM_MAX_CONCURRENCY)")
+    parser.add_argument("--skip-failed", action="store_true", help="don't retry documents that errored last run")
+    args = parser.parse_args()
+
+    # Must be set before the pipeline's settings are imported
+    if args.llm_concurrency:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(args.llm_concurrency)
+
+    from config.settings import MAX_CONCURRENT_STAGES
+    from utils.file_processing import extract_text
+    from utils.preflight import sniff_type
+    from utils.text_cleaning import clean_text
+
+    profile = None
+    if args.profile:
+        data = args.profile.read_bytes()
+        profile = clean_text(extract_text(data, sniff_type(data) or ""))
+
+    documents = collect_documents(args.inputs)
+    writer = BatchWriter(args.out)
+    completed = load_completed(writer.results_path, include_failed=args.skip_failed)
+    pending, skipped = pending_documents(documents, completed)
+    print(f"{len(documents)} documents found, {skipped} already done, {len(pending)} to analyze", file=sys.stderr)
+
+    counts = {"ok": 0, "rejected": 0, "error": 0}
+    try:
+        for done, record in enumerate(iter_batch(pending, profile, args.documents,
+                                                 args.stages or MAX_CONCURRENT_STAGES), 1):
+            writer.write(record)
+            counts[record["status"]] += 1
+            detail = record.get("error") or f"{record.get('elapsed_s')}s"
+            print(f"[{done}/{len(pending)}] {record['status']:8} {record['document']} ({detail})", file=sys.stderr)
+    except KeyboardInterrupt:
+        writer.close()
+        print("Interrupted - finished documents are saved; re-run the same command to resume", file=sys.stderr)
+        sys.stderr.flush()
+        # Abandoned documents are still running on executor threads, which a normal exit would wait for
+        os._exit(130)
+    finally:
+        writer.close()
+
+    print(json.dumps({"found": len(documents), "skipped": skipped, **counts,
+                      "results": str(writer.results_path), "summary": str(writer.summary_path)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
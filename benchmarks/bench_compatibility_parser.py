@@ -0,0 +1,273 @@
+"""
+Compatibility response parsing: the one-pass section tokenizer vs the regex parser it replaced.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_compatibility_parser --sizes-kb 4 16 64 --runs 5
+    python -m benchmarks.bench_compatibility_parser --from-cache .cache/llm_responses.sqlite3
+
+Every response in the corpus (benchmarks/data/compatibility_responses.json,
+or --corpus) is parsed by both parsers and checked against its expected
+score, level, recommendation, effort and list lengths. --from-cache adds the
+sectioned compatibility responses stored in an LLM response cache; those have
+no expected values, so the report counts the fields on which the two parsers
+agree. For timing, the first corpus response is padded with extra strengths
+bullets up to each --sizes-kb, and a response without any section headers
+(the fallback path) is timed at the same sizes. Results are printed as JSON.
+"""
+import argparse
+import json
+import re
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+
+from analysis.compatibility_analysis import parse_compatibility_response
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "compatibility_responses.json"
+CHECKED_FIELDS = ("overall_compatibility_score", "compatibility_level", "recommendation",
+                  "estimated_effort_required", "strengths_alignment", "gaps_identified", "key_differentiators")
+
+FILLER = ("- The organization has delivered comparable services for the county for several years "
+          "and can show outcome data for each of them.\n")
+PROSE = ("The organization appears capable of delivering most of the scope, although staffing in the rural "
+         "counties and the reporting system would need attention before the contract starts.\n")
+
+
+def legacy_parse_compatibility_response(text: str) -> dict:
+    """The parser the section tokenizer replaced: a lazy DOTALL lookahead per section plus whole-text searches"""
+    # Initialize with defaults
+    result = {
+        "overall_compatibility_score": 50,
+        "compatibility_level": "Medium",
+        "strengths_alignment": [],
+        "gaps_identified": [],
+        "recommendation": "Conditional",
+        "risk_assessment": "Moderate risk",
+        "key_differentiators": [],
+        "resource_gap_analysis": "Some gaps identified",
+        "strategic_fit": "Moderate alignment",
+        "estimated_effort_required": "Medium",
+        "timeline_feasibility": "Feasible with effort",
+        "raw_analysis": text  # Keep original for reference
+    }
+
+    try:
+        # Extract score (more comprehensive pattern)
+        score_matches = re.findall(r'(\b\d{1,3}\b)\s*(?:out of 100|score|%|percent|compatibility)', text, re.IGNORECASE)
+        if not score_matches:
+            # Alternative pattern: look for numbers near "score" or "compatibility"
+            score_matches = re.findall(r'(?:score|compatibility)[^\d]*(\d{1,3})', text, re.IGNORECASE)
+        if score_matches:
+            result["overall_compatibility_score"] = min(100, max(0, int(score_matches[0])))
+
+        # Extract compatibility level with better context
+        if re.search(r'\b(high|strong|excellent)\b', text, re.IGNORECASE):
+            result["compatibility_level"] = "High"
+        elif re.search(r'\b(low|poor|weak|minimal)\b', text, re.IGNORECASE):
+            result["compatibility_level"] = "Low"
+
+        # Extract recommendation with better patterns
+        if re.search(r'strongly\s+recommended|definitely\s+pursue|highly\s+recommended', text, re.IGNORECASE):
+            result["recommendation"] = "Strongly Recommended"
+        elif re.search(r'not\s+recommended|avoid|do\s+not\s+pursue|decline', text, re.IGNORECASE):
+            result["recommendation"] = "Not Recommended"
+        elif re.search(r'\brecommended\b|pursue|consider', text, re.IGNORECASE):
+            result["recommendation"] = "Recommended"
+
+        # Improved section extraction that doesn't cut off sentences
+        def extract_section(section_name, text):
+            """Extract complete section content without cutting off sentences"""
+            # Pattern to find the section and capture everything until next section or end
+            pattern = rf'{section_name}[:\-]\s*(.*?)(?=\n\s*\n\s*[A-Z][a-z]+\s*[:\-]|\n\s*[A-Z][a-z]+\s*[:\-]|\Z)'
+            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
+
+            if matches:
+                content = matches[0].strip()
+                # Split by bullets, numbers, or new lines while preserving complete sentences
+                items = re.split(r'\n\s*[•\-\*]\s*|\n\s*\d+\.\s*', content)
+                # Filter out empty items and ensure reasonable length
+                valid_items = []
+                for item in items:
+                    item = item.strip()
+                    # Remove trailing incomplete sentences
+                    item = re.sub(r'[^.!?]*$', '', item).strip()
+                    if item and len(item) >= 15:  # Minimum reasonable length
+                        valid_items.append(item)
+                return valid_items
+            return []
+
+        # Extract strengths with improved method
+        result["strengths_alignment"] = extract_section('strengths', text)
+
+        # Extract gaps
+        result["gaps_identified"] = extract_section('gaps', text)
+
+        # Extract differentiators
+        result["key_differentiators"] = extract_section('differentiators', text)
+
+        # Extract risk assessment
+        risk_sections = extract_section('risk assessment', text)
+        if risk_sections:
+            result["risk_assessment"] = risk_sections[0] if risk_sections else "Moderate risk"
+
+        # Extract strategic fit
+        strategic_sections = extract_section('strategic fit', text)
+        if strategic_sections:
+            result["strategic_fit"] = strategic_sections[0] if strategic_sections else "Moderate alignment"
+
+        # Extract effort required
+        if re.search(r'high\s+effort|significant\s+effort|substantial\s+work', text, re.IGNORECASE):
+            result["estimated_effort_required"] = "High"
+        elif re.search(r'low\s+effort|minimal\s+effort|little\s+work', text, re.IGNORECASE):
+            result["estimated_effort_required"] = "Low"
+
+        # Extract timeline feasibility
+        if re.search(r'not\s+feasible|unrealistic|too\s+tight|insufficient\s+time', text, re.IGNORECASE):
+            result["timeline_feasibility"] = "Not feasible"
+        elif re.search(r'feasible|achievable|realistic|adequate', text, re.IGNORECASE):
+            result["timeline_feasibility"] = "Feasible"
+
+        # Fallback: if we couldn't extract meaningful lists, use smarter text analysis
+        if not result["strengths_alignment"] or not result["gaps_identified"]:
+            # Use the raw text to create basic analysis
+            lines = text.split('\n')
+            for i, line in enumerate(lines):
+                line_lower = line.lower()
+                if any(word in line_lower for word in ['strength', 'advantage', 'aligns', 'matches', 'capable']):
+                    if line.strip() and len(line.strip()) > 20:
+                        result["strengths_alignment"].append(line.strip())
+                elif any(word in line_lower for word in ['gap', 'lack', 'missing', 'weakness', 'limitation']):
+                    if line.strip() and len(line.strip()) > 20:
+                        result["gaps_identified"].append(line.strip())
+
+        # Ensure we have at least basic content
+        if not result["strengths_alignment"]:
+            result["strengths_alignment"] = ["Organization demonstrates relevant capabilities based on analysis"]
+        if not result["gaps_identified"]:
+            result["gaps_identified"] = ["Some capability gaps identified requiring further assessment"]
+        if not result["key_differentiators"]:
+            result["key_differentiators"] = ["Organization brings relevant experience and qualifications"]
+
+        return result
+
+    except Exception as e:
+        # If parsing fails, return a basic analysis with the raw text
+        return {
+            "overall_compatibility_score": 50,
+            "compatibility_level": "Medium",
+            "strengths_alignment": ["Organization shows alignment with key requirements"],
+            "gaps_identified": ["Some capability gaps require assessment"],
+            "recommendation": "Further analysis needed",
+            "risk_assessment": "Moderate risk",
+            "key_differentiators": ["Relevant organizational experience"],
+            "resource_gap_analysis": "Standard resource requirements",
+            "strategic_fit": "Moderate alignment",
+            "estimated_effort_required": "Medium",
+            "timeline_feasibility": "Feasible with planning",
+            "analysis_note": f"Basic analysis completed - detailed parsing encountered issues: {str(e)}",
+            "raw_analysis": text
+        }
+
+
+def field_value(result: dict, field: str):
+    """Lists are compared by length, since item wording is free text"""
+    value = result.get(field)
+    return len(value) if isinstance(value, list) else value
+
+
+def check_corpus(corpus: list) -> dict:
+    rows, totals = [], {"legacy": 0, "tokenizer": 0, "fields": 0}
+    for entry in corpus:
+        expected = entry["expected"]
+        outputs = {"legacy": legacy_parse_compatibility_response(entry["response"]),
+                   "tokenizer": parse_compatibility_response(entry["response"])}
+        row = {"name": entry["name"]}
+        for parser, result in outputs.items():
+            wrong = {field: field_value(result, field) for field, value in expected.items()
+                     if field_value(result, field) != value}
+            totals[parser] += len(expected) - len(wrong)
+            row[f"{parser}_mismatches"] = wrong
+        totals["fields"] += len(expected)
+        rows.append(row)
+    return {"responses": rows, "fields_correct": totals}
+
+
+def load_cached_responses(path: Path) -> list:
+    """Sectioned compatibility responses from an LLM response cache"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        values = [row[0] for row in conn.execute("SELECT value FROM responses")]
+    finally:
+        conn.close()
+    return [value for value in values if re.search(r'COMPATIBILITY\s+LEVEL', value, re.IGNORECASE)]
+
+
+def check_agreement(responses: list) -> dict:
+    agreed = {field: 0 for field in CHECKED_FIELDS}
+    for response in responses:
+        legacy = legacy_parse_compatibility_response(response)
+        tokenizer = parse_compatibility_response(response)
+        for field in CHECKED_FIELDS:
+            agreed[field] += field_value(legacy, field) == field_value(tokenizer, field)
+    return {"responses": len(responses), "fields_agreeing": agreed}
+
+
+def measure(fn, text: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def padded_response(response: str, size: int) -> str:
+    """The response with filler bullets added to its STRENGTHS section until it reaches `size` characters"""
+    head, sep, rest = response.partition("STRENGTHS:\n")
+    if not sep:
+        head, sep, rest = response + "\nSTRENGTHS:\n", "", ""
+    filler = FILLER * max(0, (size - len(response)) // len(FILLER) + 1)
+    return head + sep + filler + rest
+
+
+def time_sizes(sample: str, sizes_kb: list, runs: int) -> list:
+    rows = []
+    for size_kb in sizes_kb:
+        size = int(size_kb * 1024)
+        for shape, text in (("sectioned", padded_response(sample, size)),
+                            ("no_headers", (PROSE * (size // len(PROSE) + 1))[:size])):
+            legacy = measure(legacy_parse_compatibility_response, text, runs)
+            tokenizer = measure(parse_compatibility_response, text, runs)
+            rows.append({
+                "size_kb": size_kb,
+                "shape": shape,
+                "legacy_ms": round(legacy * 1000, 3),
+                "tokenizer_ms": round(tokenizer * 1000, 3),
+                "speedup": round(legacy / tokenizer, 1) if tokenizer else None,
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH)
+    parser.add_argument("--from-cache", type=Path, help="LLM response cache (SQLite) to take real responses from")
+    parser.add_argument("--sizes-kb", type=float, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = json.loads(args.corpus.read_text(encoding="utf-8"))
+    report = {
+        "corpus": str(args.corpus),
+        "correctness": check_corpus(corpus),
+        "runs": args.runs,
+        "timing": time_sizes(corpus[0]["response"], args.sizes_kb, args.runs),
+    }
+    if args.from_cache:
+        report["cached_responses"] = check_agreement(load_cached_responses(args.from_cache))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
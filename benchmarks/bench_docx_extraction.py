@@ -0,0 +1,102 @@
+"""
+Streaming DOCX extraction vs the python-docx paragraph walk it replaced.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_docx_extraction --paragraphs 20000 --tables 200 --runs 3
+    python -m benchmarks.bench_docx_extraction --docx path/to/rfp.docx
+
+Without --docx a large test document (paragraphs, budget tables, header and
+footer) is generated with python-docx. Each extractor is timed and its peak
+Python allocation measured with tracemalloc; the report also shows how much
+text each one recovers. Results are printed as JSON.
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+from docx import Document
+
+from utils.file_processing import extract_text_from_docx
+
+
+def extract_paragraphs_only(data: bytes) -> str:
+    """The previous extractor: body paragraphs via the full python-docx object model"""
+    doc = Document(BytesIO(data))
+    return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+
+
+def make_docx(paragraphs: int, tables: int) -> bytes:
+    doc = Document()
+    section = doc.sections[0]
+    section.header.paragraphs[0].text = "RFP 2025-0147 - Opioid Epidemic Response Services"
+    section.footer.paragraphs[0].text = "Department of Health and Human Services - Confidential"
+
+    table_every = max(1, paragraphs // max(tables, 1)) if tables else None
+    for i in range(paragraphs):
+        doc.add_paragraph(f"{i + 1}. The contractor shall deliver peer recovery services in each county "
+                          f"and report outcomes monthly as described in this section.")
+        if table_every and (i + 1) % table_every == 0:
+            table = doc.add_table(rows=4, cols=3)
+            for row, (item, amount, share) in enumerate([("Category", "Amount", "Share"),
+                                                         ("Personnel", "$975,000", "65%"),
+                                                         ("Operations", "$300,000", "20%"),
+                                                         ("Indirect", "$225,000", "15%")]):
+                for col, value in enumerate((item, amount, share)):
+                    table.cell(row, col).text = value
+    out = BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def measure(fn, data: bytes, runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        text = fn(data)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_s": round(statistics.median(timings), 4),
+        "peak_alloc_mb": round(peak / (1024 * 1024), 2),
+        "characters": len(text),
+        "lines": text.count("\n"),
+        "contains_tables": "$975,000" in text,
+        "contains_header": "RFP 2025-0147" in text,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docx", type=Path, help="real document instead of a generated one")
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    data = args.docx.read_bytes() if args.docx else make_docx(args.paragraphs, args.tables)
+    previous = measure(extract_paragraphs_only, data, args.runs)
+    streaming = measure(extract_text_from_docx, data, args.runs)
+
+    print(json.dumps({
+        "source": str(args.docx) if args.docx else f"generated ({args.paragraphs} paragraphs, {args.tables} tables)",
+        "bytes": len(data),
+        "runs": args.runs,
+        "python_docx_paragraphs": previous,
+        "streaming": streaming,
+        "speedup": round(previous["median_s"] / streaming["median_s"], 2) if streaming["median_s"] else None,
+        "peak_memory_ratio": round(previous["peak_alloc_mb"] / streaming["peak_alloc_mb"], 2)
+        if streaming["peak_alloc_mb"] else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
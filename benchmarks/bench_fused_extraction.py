@@ -0,0 +1,90 @@
+"""
+Compare fused basic+financial extraction against the two-call path.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_fused_extraction path/to/rfp.pdf --runs 5
+
+The response cache is disabled so every run hits the API. Both paths are timed
+the way the pipeline runs them (the two separate calls concurrently), and token
+usage is taken from the API's usage counters. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from analysis.basic_analysis import extract_basic_information  # noqa: E402
+from analysis.financial_analysis import analyze_financials  # noqa: E402
+from analysis.fused_analysis import extract_basic_and_financial  # noqa: E402
+from utils.file_processing import extract_text_from_pdf, extract_text_from_docx  # noqa: E402
+from utils.llm_client import get_llm_client  # noqa: E402
+from utils.text_cleaning import clean_text  # noqa: E402
+
+
+def load_text(path: Path) -> str:
+    data = path.read_bytes()
+    if path.suffix.lower() == ".pdf":
+        return clean_text(extract_text_from_pdf(data))
+    if path.suffix.lower() == ".docx":
+        return clean_text(extract_text_from_docx(data))
+    return clean_text(data.decode("utf-8", errors="ignore"))
+
+
+def two_call(text: str):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        basic = executor.submit(extract_basic_information, text)
+        financial = executor.submit(analyze_financials, text)
+        return basic.result(), financial.result()
+
+
+def measure(fn, text: str, runs: int) -> dict:
+    client = get_llm_client()
+    latencies, errors = [], 0
+    before = dict(client.usage)
+    for _ in range(runs):
+        start = time.perf_counter()
+        basic, financial = fn(text)
+        latencies.append(time.perf_counter() - start)
+        errors += int("error" in basic) + int("error" in financial)
+
+    return {
+        "runs": runs,
+        "errors": errors,
+        "latency_mean_s": round(statistics.mean(latencies), 3),
+        "latency_median_s": round(statistics.median(latencies), 3),
+        "latency_max_s": round(max(latencies), 3),
+        "prompt_tokens_per_run": (client.usage["prompt_tokens"] - before["prompt_tokens"]) / runs,
+        "completion_tokens_per_run": (client.usage["completion_tokens"] - before["completion_tokens"]) / runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("document", type=Path, help="RFP document (.pdf, .docx or .txt)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    text = load_text(args.document)
+    two = measure(two_call, text, args.runs)
+    fused = measure(extract_basic_and_financial, text, args.runs)
+
+    report = {
+        "document": str(args.document),
+        "characters": len(text),
+        "two_call": two,
+        "fused": fused,
+        "latency_saving_pct": round(100 * (1 - fused["latency_mean_s"] / two["latency_mean_s"]), 1)
+        if two["latency_mean_s"] else None,
+        "prompt_token_saving_pct": round(100 * (1 - fused["prompt_tokens_per_run"] / two["prompt_tokens_per_run"]), 1)
+        if two["prompt_tokens_per_run"] else None,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
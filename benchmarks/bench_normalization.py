@@ -0,0 +1,91 @@
+"""
+Throughput of the single-pass normalization engine behind clean_text.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_normalization --sizes-mb 1 4 16 --runs 5
+    python -m benchmarks.bench_normalization --text path/to/extracted.txt
+
+Without --text a PDF-like document is generated: wrapped lines, blank-line
+paragraphs, a dot-leader table of contents, words hyphenated across line
+breaks, ligatures, non-breaking spaces and stray control characters. It is
+repeated up to each size. The previous two-regex clean_text is timed against
+normalize_text (collapsed and paragraph-keeping); the report gives the median
+time, throughput in MB/s and the speedup. Results are printed as JSON.
+"""
+import argparse
+import json
+import re
+import statistics
+import time
+from pathlib import Path
+
+from utils.normalization import normalize_text
+
+SAMPLE = (
+    "Table of Contents\n1. Background ........................ 3\n2. Scope of Work .................... 7\n\n"
+    "The Department of Health seeks qualiﬁed organizations to provide opioid response services in\n"
+    "rural counties. The contractor shall deliver peer recov-\nery services, naloxone distribution and\n"
+    "monthly reporting. Total funding available is $4,750,000 over three years.\n\n"
+    "    Applicants must demonstrate “five years” of experience — see Section 3.2\x0c\n"
+    "for the eﬀective date and ﬂexible match requirements.\x07\n\n"
+)
+
+
+def legacy_clean_text(text: str) -> str:
+    """The clean_text this engine replaced: two full regex passes"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\.{4,}', ' ', text)
+    return text.strip()
+
+
+def make_text(size_bytes: int, sample: str) -> str:
+    return (sample * (size_bytes // len(sample.encode("utf-8")) + 1))[:size_bytes]
+
+
+def measure(fn, text: str, runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {
+        "median_s": round(median, 4),
+        "mb_per_s": round(len(text) / (1024 * 1024) / median, 1) if median else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--text", type=Path, help="raw extracted text to repeat instead of the generated sample")
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    sample = args.text.read_text(encoding="utf-8", errors="ignore") if args.text else SAMPLE
+    rows = []
+    for size_mb in args.sizes_mb:
+        text = make_text(int(size_mb * 1024 * 1024), sample)
+        legacy = measure(legacy_clean_text, text, args.runs)
+        collapsed = measure(normalize_text, text, args.runs)
+        paragraphs = measure(lambda t: normalize_text(t, keep_paragraphs=True), text, args.runs)
+        rows.append({
+            "size_mb": size_mb,
+            "legacy_clean_text": legacy,
+            "normalize_text": collapsed,
+            "normalize_text_keep_paragraphs": paragraphs,
+            "speedup": round(legacy["median_s"] / collapsed["median_s"], 2) if collapsed["median_s"] else None,
+            "output_chars": {"legacy": len(legacy_clean_text(text)), "normalize_text": len(normalize_text(text))},
+        })
+
+    print(json.dumps({
+        "source": str(args.text) if args.text else "generated",
+        "runs": args.runs,
+        "results": rows,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Serial vs process-pool PDF text extraction across page counts.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pdf_extraction --pages 5 10 20 40 80 160 320 --runs 3
+    python -m benchmarks.bench_pdf_extraction --pdf path/to/rfp.pdf --pages 10 50 100 300
+
+Without --pdf a synthetic text PDF is generated for each page count; with it,
+the document's pages are repeated/truncated to each count. The first parallel
+run warms the worker pool and is not timed. The report lists both timings per
+page count and the smallest count from which parallel extraction keeps winning,
+which is what PDF_PARALLEL_MIN_PAGES should be set to. Results are printed as JSON.
+"""
+import argparse
+import json
+import statistics
+import time
+from io import BytesIO
+from pathlib import Path
+
+import PyPDF2
+
+from utils.file_processing import extract_text_from_pdf
+from utils.parallel_pdf import extraction_workers
+
+LINE = "The contractor shall provide opioid response services in accordance with Section {page}.{line} of this RFP."
+
+
+def make_text_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """Build a minimal PDF with `pages` pages of plain Helvetica text"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        commands = ["BT /F1 9 Tf 11 TL 40 800 Td"]
+        for line in range(lines_per_page):
+            commands.append(f"({LINE.format(page=page + 1, line=line + 1)}) Tj T*")
+        commands.append("ET")
+        stream = "\n".join(commands)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+
+def resize_pdf(data: bytes, pages: int) -> bytes:
+    """Repeat or truncate a real document's pages to exactly `pages` pages"""
+    reader = PyPDF2.PdfReader(BytesIO(data))
+    writer = PyPDF2.PdfWriter()
+    for i in range(pages):
+        writer.add_page(reader.pages[i % len(reader.pages)])
+    out = BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def time_extraction(data: bytes, parallel: bool, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        extract_text_from_pdf(data, parallel=parallel)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", type=Path, help="real PDF to resize instead of a synthetic one")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 10, 20, 40, 80, 160, 320])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    source = args.pdf.read_bytes() if args.pdf else None
+    build = (lambda n: resize_pdf(source, n)) if source else make_text_pdf
+
+    # Start the workers before timing anything
+    extract_text_from_pdf(build(min(args.pages)), parallel=True)
+
+    rows = []
+    for pages in sorted(args.pages):
+        data = build(pages)
+        serial = time_extraction(data, False, args.runs)
+        parallel = time_extraction(data, True, args.runs)
+        rows.append({
+            "pages": pages,
+            "bytes": len(data),
+            "serial_s": round(serial, 4),
+            "parallel_s": round(parallel, 4),
+            "speedup": round(serial / parallel, 2) if parallel else None,
+        })
+
+    # Smallest page count from which parallel extraction wins at every larger size too
+    crossover = None
+    for row in reversed(rows):
+        if row["parallel_s"] >= row["serial_s"]:
+            break
+        crossover = row["pages"]
+
+    print(json.dumps({
+        "source": str(args.pdf) if args.pdf else "synthetic",
+        "workers": extraction_workers(),
+        "runs": args.runs,
+        "results": rows,
+        "crossover_pages": crossover,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
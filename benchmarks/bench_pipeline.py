@@ -0,0 +1,97 @@
+"""
+Throughput and tail latency of the full analysis pipeline against the local Groq stub.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pipeline path/to/rfp.pdf --runs 20 --concurrency 4 \\
+        --latency lognormal --latency-mean 1.5 --latency-stddev 1.0 --error-rate-429 0.05
+
+A stub server (benchmarks/groq_stub_server.py) is started in-process unless
+--base-url points at one that is already running. The response cache is
+disabled and the rate limits are lifted (unless set in the environment), so
+the numbers reflect the pipeline and the stub's latency model only. Results
+are printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.groq_stub_server import add_stub_arguments, config_from_args, start_stub_server
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("document", type=Path, help="RFP document (.pdf, .docx or .txt)")
+    parser.add_argument("--profile", type=Path, help="Organization profile text, enables compatibility analysis")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1, help="documents analyzed at once")
+    parser.add_argument("--base-url", help="use an already running Groq-compatible server")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = start_stub_server(config_from_args(args))
+
+    # Must be set before the pipeline's settings are imported
+    os.environ["GROQ_BASE_URL"] = base_url
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "0")
+    os.environ.setdefault("GROQ_TOKENS_PER_MINUTE", "0")
+
+    from analysis import multi_stage_rfp_analysis
+    from benchmarks.bench_fused_extraction import load_text
+    from utils.llm_client import get_llm_client
+    from utils.validation import get_validation_stats
+
+    text = load_text(args.document)
+    profile = args.profile.read_text(encoding="utf-8", errors="ignore") if args.profile else None
+
+    def run_once(_):
+        start = time.perf_counter()
+        results = multi_stage_rfp_analysis(text, profile)
+        errors = sum(1 for result in results.values() if isinstance(result, dict) and "error" in result)
+        return time.perf_counter() - start, errors
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        outcomes = list(executor.map(run_once, range(args.runs)))
+    wall = time.perf_counter() - wall_start
+
+    latencies = [latency for latency, _ in outcomes]
+    report = {
+        "document": str(args.document),
+        "characters": len(text),
+        "base_url": base_url,
+        "runs": args.runs,
+        "concurrency": args.concurrency,
+        "stage_errors": sum(errors for _, errors in outcomes),
+        "wall_s": round(wall, 3),
+        "documents_per_minute": round(60 * args.runs / wall, 2) if wall else None,
+        "latency_mean_s": round(statistics.mean(latencies), 3),
+        "latency_p50_s": round(percentile(latencies, 50), 3),
+        "latency_p95_s": round(percentile(latencies, 95), 3),
+        "latency_p99_s": round(percentile(latencies, 99), 3),
+        "latency_max_s": round(max(latencies), 3),
+        "client": get_llm_client().get_stats(),
+        "validation": get_validation_stats(),
+    }
+    if server is not None:
+        report["stub"] = dict(server.state.stats)
+        server.shutdown()
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Result-tree post-processing: the compiled engine vs the nested helpers it replaced.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_postprocessing --documents 200 --runs 5
+
+A synthetic result tree is built for --documents analyses, shaped like the
+pipeline's output: flat string fields, lists of strings, and lists of nested
+records (budget categories, risk factors, timeline milestones), with model
+answers that are truncated at either end. The previous fix_all_truncated_sentences
+(four helpers per string, two levels deep; its two
+rule helpers are kept here as they were) is timed against postprocess_results,
+with its memo cleared before every run ("cold") and kept ("warm"). The report
+also counts how many strings each one reached, so the per-string cost is the
+fair comparison. The truncated-opening rules are then padded with --rules
+synthetic fragments to show how matching scales: the completion trie walks
+each string once, while a startswith scan grows with the rule count. Results
+are printed as JSON.
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+
+from config.settings import COMPLETION_RULES_PATH
+from utils.completion_trie import CompletionTrie, load_completion_rules
+from utils.postprocessing import postprocess_results, postprocess_text
+from utils.prompt_helpers import fix_truncated_ai_response
+from utils.text_cleaning import ensure_complete_sentences
+
+WORDS = ("contractor", "shall", "provide", "quarterly", "reports", "budget", "services", "county", "funding",
+         "audit", "recovery", "outcomes", "personnel", "indirect", "costs", "approval", "monthly", "deliver")
+OPENINGS = ("y and annual", "al audit", "the budget", "e for the", "ns allowed", "", "", "", "", "")
+
+
+def legacy_fix_ai_truncation_patterns(text: str) -> str:
+    """The effective (second) fix_ai_truncation_patterns: one regex per rule, run in turn"""
+    if not text or not isinstance(text, str):
+        return text or ""
+
+    text = text.strip()
+    if len(text) < 3:
+        return text
+
+    # ONLY keep generalized patterns
+    generalized_fixes = {
+        r'^[a-z]': lambda m: m.group().upper(),  # Capitalize first letter
+        r'^\d+-': 'RFP-',  # Add RFP prefix to numbers with dash
+        r'^\d': '$',  # Add dollar sign to numbers (financial)
+    }
+
+    fixed_text = text
+
+    # Apply generalized fixes
+    for pattern, replacement in generalized_fixes.items():
+        if isinstance(replacement, str):
+            if re.match(pattern, fixed_text):
+                fixed_text = re.sub(pattern, replacement, fixed_text)
+        else:  # Function
+            match = re.match(pattern, fixed_text)
+            if match:
+                fixed_text = replacement(match) + fixed_text[1:]
+
+    return fixed_text
+
+
+def legacy_complete_financial_sentences(text: str, field_name: str = "") -> str:
+    """The effective (second) complete_financial_sentences: a startswith scan over each rule dict"""
+    if not text:
+        return text
+
+    # Common financial sentence beginnings and their completions
+    financial_completions = {
+        'y and annual': 'Quarterly and annual',
+        'al audit': 'Annual audit',
+        'the budget': 'Modify the budget',
+        'e for the': 'Funding is available for the',
+        'ns allowed': 'Modifications allowed',
+    }
+
+    # Check if text starts with any known truncation pattern
+    for truncated, complete in financial_completions.items():
+        if text.startswith(truncated):
+            return complete + text[len(truncated):]
+
+    # Field-specific completions
+    field_completions = {
+        'financial_reporting': {
+            'y and annual': 'Quarterly and annual',
+            'al audit': 'Annual audit',
+        },
+        'budget_flexibility': {
+            'the budget': 'Modify the budget',
+            'ns allowed': 'Modifications allowed',
+        },
+        'funding_stability': {
+            'e for the': 'Funding is available for the',
+        }
+    }
+
+    # Apply field-specific completions
+    if field_name in field_completions:
+        for truncated, complete in field_completions[field_name].items():
+            if text.startswith(truncated):
+                return complete + text[len(truncated):]
+
+
+def legacy_fix_all_truncated_sentences(results):
+    """The walker this engine replaced: two levels deep, a different helper order for lists"""
+    if not isinstance(results, dict):
+        return results
+
+    fixed_results = {}
+    for category, data in results.items():
+        if isinstance(data, dict):
+            fixed_results[category] = {}
+            for key, value in data.items():
+                if isinstance(value, str):
+                    step1 = legacy_complete_financial_sentences(value, key)
+                    step2 = legacy_fix_ai_truncation_patterns(step1)
+                    step3 = ensure_complete_sentences(step2)
+                    fixed_results[category][key] = fix_truncated_ai_response(step3)
+                elif isinstance(value, list):
+                    fixed_results[category][key] = [
+                        legacy_complete_financial_sentences(legacy_fix_ai_truncation_patterns(ensure_complete_sentences(
+                            fix_truncated_ai_response(str(item)))), key) if isinstance(item, str) else item
+                        for item in value
+                    ]
+                else:
+                    fixed_results[category][key] = value
+        elif isinstance(data, str):
+            fixed_results[category] = legacy_complete_financial_sentences(legacy_fix_ai_truncation_patterns(
+                ensure_complete_sentences(fix_truncated_ai_response(data))))
+        else:
+            fixed_results[category] = data
+    return fixed_results
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = rng.choice(OPENINGS) + " " + " ".join(rng.choice(WORDS) for _ in range(words))
+    # Half the answers stop mid-sentence
+    return text.strip() + ("." if rng.random() < 0.5 else " and " + rng.choice(WORDS))
+
+
+def make_result_tree(documents: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    tree = {}
+    for doc in range(documents):
+        tree[f"rfp_{doc}"] = {
+            "basic_info": {field: sentence(rng, rng.randint(3, 25)) for field in
+                           ("title", "objective", "scope_of_work", "eligibility", "evaluation_criteria")},
+            "financial_analysis": {
+                "financial_reporting": sentence(rng, 12),
+                "budget_flexibility": sentence(rng, 12),
+                "funding_stability": sentence(rng, 12),
+                "budget_categories": [{"category": rng.choice(WORDS), "notes": sentence(rng, 10)} for _ in range(5)],
+                "financial_score": rng.randint(60, 100),
+            },
+            "risk_assessment": {
+                "risk_factors": {name: {"score": rng.randint(1, 9), "description": sentence(rng, 15)}
+                                 for name in ("technical", "financial", "schedule", "compliance")},
+                "recommendations": [sentence(rng, 8) for _ in range(4)],
+            },
+            "resource_planning": {
+                "timeline_milestones": [{"task": sentence(rng, 4), "team": ["PM", "Writer"]} for _ in range(6)],
+            },
+            "content_suggestions": [sentence(rng, 20) for _ in range(6)],
+        }
+    return tree
+
+
+def count_strings(tree) -> int:
+    if isinstance(tree, str):
+        return 1
+    if isinstance(tree, dict):
+        return sum(count_strings(value) for value in tree.values())
+    if isinstance(tree, (list, tuple)):
+        return sum(count_strings(item) for item in tree)
+    return 0
+
+
+def collect_strings(tree) -> list:
+    if isinstance(tree, str):
+        return [tree]
+    if isinstance(tree, dict):
+        return [text for value in tree.values() for text in collect_strings(value)]
+    if isinstance(tree, (list, tuple)):
+        return [text for item in tree for text in collect_strings(item)]
+    return []
+
+
+def count_legacy_reachable(results: dict) -> int:
+    """Strings the legacy walker visits: top-level strings, and strings or string lists one dict down"""
+    reached = 0
+    for data in results.values():
+        if isinstance(data, str):
+            reached += 1
+        elif isinstance(data, dict):
+            for value in data.values():
+                if isinstance(value, str):
+                    reached += 1
+                elif isinstance(value, list):
+                    reached += sum(isinstance(item, str) for item in value)
+    return reached
+
+
+def count_changed(before, after) -> int:
+    if isinstance(before, str):
+        return int(before != after)
+    if isinstance(before, dict) and isinstance(after, dict):
+        return sum(count_changed(value, after.get(key)) for key, value in before.items())
+    if isinstance(before, (list, tuple)) and isinstance(after, (list, tuple)):
+        return sum(count_changed(a, b) for a, b in zip(before, after))
+    return 0
+
+
+def measure(fn, runs: int, clear_cache: bool) -> float:
+    timings = []
+    for _ in range(runs):
+        if clear_cache:
+            postprocess_text.cache_clear()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def random_fragment(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(rng.randint(3, 14))).strip() or "x"
+
+
+def measure_rule_scaling(rule_counts, strings, runs: int) -> list:
+    """Per-string cost of matching openings against N synthetic rules: trie walk vs a startswith scan"""
+    rng = random.Random(11)
+    base = load_completion_rules(COMPLETION_RULES_PATH)[0]
+    rows = []
+    for count in rule_counts:
+        rules = dict(base)
+        while len(rules) < len(base) + count:
+            rules[random_fragment(rng)] = "Completed"
+        trie = CompletionTrie(rules)
+        ordered = sorted(rules.items(), key=lambda rule: len(rule[0]), reverse=True)
+
+        def scan():
+            for text in strings:
+                for fragment, completion in ordered:
+                    if text.startswith(fragment):
+                        break
+
+        def walk():
+            for text in strings:
+                trie.match(text)
+
+        linear = measure(scan, runs, clear_cache=False)
+        tried = measure(walk, runs, clear_cache=False)
+        rows.append({
+            "rules": len(rules),
+            "us_per_string": {"startswith_scan": round(linear / len(strings) * 1e6, 2),
+                              "trie": round(tried / len(strings) * 1e6, 2)},
+            "speedup": round(linear / tried, 2) if tried else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rules", type=int, nargs="+", default=[0, 1000, 10000],
+                        help="synthetic completion rules to add for the rule-scaling comparison")
+    args = parser.parse_args()
+
+    documents = make_result_tree(args.documents)
+    # The legacy walker only goes two levels deep, so give it one document at a time as the pipeline did
+    legacy = measure(lambda: [legacy_fix_all_truncated_sentences(doc) for doc in documents.values()], args.runs,
+                     clear_cache=False)
+    cold = measure(lambda: postprocess_results(documents), args.runs, clear_cache=True)
+    warm = measure(lambda: postprocess_results(documents), args.runs, clear_cache=False)
+
+    legacy_output = {name: legacy_fix_all_truncated_sentences(doc) for name, doc in documents.items()}
+    engine_output = postprocess_results(documents)
+    strings = count_strings(documents)
+    legacy_reached = sum(count_legacy_reachable(doc) for doc in documents.values())
+    print(json.dumps({
+        "documents": args.documents,
+        "strings": strings,
+        "strings_reached": {"legacy": legacy_reached, "engine": strings},
+        "runs": args.runs,
+        "legacy_s": round(legacy, 4),
+        "engine_cold_s": round(cold, 4),
+        "engine_warm_s": round(warm, 4),
+        "us_per_string": {"legacy": round(legacy / legacy_reached * 1e6, 2),
+                          "engine_cold": round(cold / strings * 1e6, 2),
+                          "engine_warm": round(warm / strings * 1e6, 2)},
+        "per_string_speedup_cold": round((legacy / legacy_reached) / (cold / strings), 2) if cold else None,
+        "strings_changed": {"legacy": count_changed(documents, legacy_output),
+                            "engine": count_changed(documents, engine_output)},
+        "rule_scaling": measure_rule_scaling(args.rules, collect_strings(documents), args.runs),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
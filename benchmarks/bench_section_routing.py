@@ -0,0 +1,114 @@
+"""
+Prompt size of each LLM stage with and without section routing.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_section_routing --boilerplate-pages 120 --max-prompt-tokens 6000
+    python -m benchmarks.bench_section_routing --document path/to/rfp.pdf --profile org.txt
+
+Without --document a long RFP is generated: the budget, scope, eligibility,
+evaluation and submission sections sit between many pages of terms and
+conditions, the way real solicitations bury them. For each stage the report
+gives the estimated prompt tokens it would send reading the whole text
+(prefix-fitted to its budget, as before) and reading only its sections, and
+whether the section's key facts (e.g. the budget figure) reach the model
+either way. --max-prompt-tokens simulates a smaller context window. Results
+are printed as JSON.
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+BUDGET_FIGURE = "$4,750,000"
+SCOPE_FACT = "peer recovery specialists"
+
+BOILERPLATE = ("The Contractor shall comply with all applicable federal, state and local laws, and nothing in "
+               "these general terms shall be construed to limit the rights of the State under this Agreement. ")
+
+SECTIONS = [
+    ("1. Background and Purpose", "The Department seeks to reduce opioid overdose deaths in rural counties. "),
+    ("2. Scope of Work", f"The contractor shall deploy {SCOPE_FACT} in each county and deliver monthly reports. "),
+    ("3. Minimum Qualifications", "Applicants must have five years of experience and hold a state license. "),
+    ("4. General Terms and Conditions", None),
+    ("5. Budget and Cost Proposal", f"Total funding available is {BUDGET_FIGURE} over three years; "
+                                    "indirect costs are capped at 10% and a 15% match is required. "),
+    ("6. Evaluation Criteria", "Technical approach 40 points, experience 30 points, cost 30 points. "),
+    ("7. Submission Instructions", "Submit proposals electronically by 2:00 PM on March 14, 2025. "),
+]
+
+
+def make_rfp(boilerplate_pages: int) -> str:
+    parts = ["RFP 2025-0147 Opioid Epidemic Response Services. Department of Health and Human Services. "
+             "Release date January 6, 2025."]
+    for title, body in SECTIONS:
+        # About 3,000 characters of boilerplate per page
+        parts.append(title + " " + (body or BOILERPLATE * 14 * boilerplate_pages))
+    return " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--document", type=Path, help="real RFP (.pdf, .docx or .txt) instead of a generated one")
+    parser.add_argument("--profile", type=Path, help="organization profile for the compatibility stage")
+    parser.add_argument("--boilerplate-pages", type=int, default=120)
+    parser.add_argument("--max-prompt-tokens", type=int, help="cap each prompt, like a small-context model")
+    args = parser.parse_args()
+
+    # Must be set before the pipeline's settings are imported
+    os.environ.setdefault("GROQ_API_KEY", "unused")
+    if args.max_prompt_tokens:
+        os.environ["MAX_PROMPT_TOKENS"] = str(args.max_prompt_tokens)
+
+    from analysis import basic_info_input, compatibility_input, financial_analysis_input, fused_extraction_input
+    from utils.document_model import DocumentModel
+    from utils.file_processing import extract_document
+    from utils.preflight import sniff_type
+    from utils.text_cleaning import clean_text
+    from utils.token_budget import estimate_tokens
+
+    if args.document:
+        data = args.document.read_bytes()
+        started = time.perf_counter()
+        document = extract_document(data, sniff_type(data) or "")
+    else:
+        text = clean_text(make_rfp(args.boilerplate_pages))
+        started = time.perf_counter()
+        document = DocumentModel.from_text(text)
+    index_s = time.perf_counter() - started
+    profile = (args.profile.read_text(encoding="utf-8", errors="ignore") if args.profile
+               else "Regional nonprofit providing peer recovery and harm reduction services since 2012.")
+
+    stages = {
+        "basic_info": basic_info_input,
+        "financial_analysis": financial_analysis_input,
+        "basic_financial_extraction": fused_extraction_input,
+        "compatibility_analysis": lambda source: compatibility_input(source, profile),
+    }
+    rows = {}
+    for stage, stage_input in stages.items():
+        whole, routed = stage_input(document.text), stage_input(document)
+        rows[stage] = {
+            "whole_text_tokens": estimate_tokens(whole),
+            "routed_tokens": estimate_tokens(routed),
+            "token_reduction": round(1 - estimate_tokens(routed) / max(estimate_tokens(whole), 1), 3),
+            "whole_text_has_budget": BUDGET_FIGURE in whole,
+            "routed_has_budget": BUDGET_FIGURE in routed,
+            "whole_text_has_scope": SCOPE_FACT in whole,
+            "routed_has_scope": SCOPE_FACT in routed,
+        }
+
+    print(json.dumps({
+        "source": str(args.document) if args.document else f"generated ({args.boilerplate_pages} boilerplate pages)",
+        "characters": len(document),
+        "max_prompt_tokens": args.max_prompt_tokens,
+        "index_s": round(index_s, 4),
+        "sections": [{"title": title, "kinds": [kind for kind, indexes in document.kind_sections.items()
+                                                 if index in indexes], "characters": end - start}
+                     for index, (title, start, end) in enumerate(document.iter_sections())],
+        "stages": rows,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Scaling and fuzz suite for the text cleaning functions in the request path.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_text_cleaning --sizes 1K 32K 1M 10M 50M --runs 3 --out cleaning.json
+    python -m benchmarks.bench_text_cleaning --sizes 1K 1M --fuzz 2000 --fuzz-seed 42
+    python -m benchmarks.bench_text_cleaning --compare before.json after.json
+
+clean_text, ensure_complete_sentences, fix_ai_truncation_patterns and
+parse_compatibility_response are timed on inputs of each --sizes (K/M/G
+suffixes) in several shapes: ordinary PDF-like prose and the adversarial
+cases - no punctuation at all, huge runs of dots, bullets nested hundreds of
+levels deep, and long whitespace runs. Each row has the median time and MB/s,
+and each function and shape gets a scaling exponent fitted over the two
+largest sizes (1.0 is linear; none when the smaller run takes under a
+millisecond). An exponent more than --tolerance above max(1, the exponent of
+simply copying the input) is flagged. On Linux the run is restarted with
+glibc settings that keep large blocks on the heap (see GLIBC_ALLOCATOR_ENV),
+since fresh mmap'd memory otherwise makes every 50 MB copy superlinear;
+--keep-allocator opts out.
+
+--fuzz N then feeds N random strings (stdlib random, seeded, biased towards
+punctuation, bullets, headers and odd Unicode) to every function and checks
+that each call finishes within --fuzz-max-seconds and keeps its contract:
+clean_text is idempotent, ensure_complete_sentences honours max_length and
+parse_compatibility_response returns every field. With hypothesis installed,
+--hypothesis runs the same properties under its shrinking engine as well.
+
+The report is JSON, tagged with the git commit; --compare prints the speedup
+of every row between two saved reports. Exits with status 1 if a property
+failed or a function scaled superlinearly.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from analysis.compatibility_analysis import FIELD_PARSERS, parse_compatibility_response
+from benchmarks.bench_normalization import SAMPLE, make_text
+from utils.text_cleaning import clean_text, ensure_complete_sentences, fix_ai_truncation_patterns
+
+TARGETS = {
+    "clean_text": clean_text,
+    "clean_text_paragraphs": lambda text: clean_text(text, keep_paragraphs=True),
+    "ensure_complete_sentences": ensure_complete_sentences,
+    "ensure_complete_sentences_max_length": lambda text: ensure_complete_sentences(text, max(1, len(text) // 2)),
+    "fix_ai_truncation_patterns": fix_ai_truncation_patterns,
+    "parse_compatibility_response": parse_compatibility_response,
+}
+
+WORDS = "the contractor shall provide peer recovery services in six rural counties with monthly reporting "
+BULLET_DEPTH = 400
+
+# One repeating unit per input shape; make_text repeats it up to the requested size
+SHAPES = {
+    "prose": SAMPLE,
+    "no_punctuation": WORDS * 40,
+    "dot_runs": "Budget Justification" + "." * 65536 + " 12\n" + ". " * 4096,
+    "deep_bullets": "STRENGTHS:\n" + "".join("  " * depth + ("-", "*", "\u2022", "1.")[depth % 4] + " Item at depth "
+                                             + str(depth) + " continues\n" for depth in range(BULLET_DEPTH)),
+    "whitespace_runs": "word" + " " * 4096 + "\n" * 4096 + "\t \r\n" * 1024,
+}
+
+# Characters the fuzzer favours: sentence ends, dot leaders, bullets, header colons, hyphens and odd Unicode
+FUZZ_ALPHABET = (". . ....!?:-\n\n \t\u2022*#1)" "abcdefghijklmnopqrstuvwxyz" "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+                 "\u00a0\u00ad\u200b\ufb01\u2014\u201c\u2026\x00\x0c")
+FUZZ_FRAGMENTS = ("STRENGTHS:\n", "GAPS:\n", "OVERALL COMPATIBILITY SCORE: ", "**Recommendation:** ", "\n- ",
+                  "\n    * ", "y and annual", "ns allowed", "12-345", "4,500,000", "recov-\nery", ". " * 8, "." * 64)
+
+MIN_FIT_SECONDS = 0.001
+
+# One copy of the input, to show what allocating a result of that size costs on this machine
+BASELINE = "baseline_copy"
+
+# glibc hands allocations above its mmap threshold (at most 32 MB) fresh, page-faulted memory on every
+# call, which makes any function that copies a 50 MB input look superlinear; these settings keep large
+# blocks on the heap so the exponents measure the code
+GLIBC_ALLOCATOR_ENV = {"MALLOC_MMAP_THRESHOLD_": str(1 << 32), "MALLOC_TRIM_THRESHOLD_": str(1 << 32)}
+
+SIZE_SUFFIXES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().upper().rstrip("B")
+    multiplier = SIZE_SUFFIXES.get(value[-1:], 1)
+    return int(float(value[:-1] if value[-1:] in SIZE_SUFFIXES else value) * multiplier)
+
+
+def tune_allocator() -> None:
+    """Re-run this process with GLIBC_ALLOCATOR_ENV set, on Linux, unless it already is"""
+    if not sys.platform.startswith("linux") or all(os.environ.get(k) == v for k, v in GLIBC_ALLOCATOR_ENV.items()):
+        return
+    module = __spec__.name if __spec__ else None
+    command = [sys.executable, *(f"-W{option}" for option in sys.warnoptions)]
+    command += ["-m", module] if module else [sys.argv[0]]
+    os.execve(sys.executable, command + sys.argv[1:], {**os.environ, **GLIBC_ALLOCATOR_ENV})
+
+
+def copy_text(text: str) -> str:
+    return text[1:]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def measure(fn, text: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def fit_exponent(timings: list):
+    """Scaling exponent between the two largest sizes, from [(chars, seconds)]"""
+    if len(timings) < 2:
+        return None
+    (small_chars, small_s), (large_chars, large_s) = timings[-2], timings[-1]
+    # Below MIN_FIT_SECONDS timer resolution and cache effects swamp the fit
+    if small_s < MIN_FIT_SECONDS or large_chars <= small_chars:
+        return None
+    return math.log(large_s / small_s) / math.log(large_chars / small_chars)
+
+
+def run_scaling(sizes: list, runs: int, tolerance: float) -> dict:
+    rows, scaling = [], []
+    for shape, unit in SHAPES.items():
+        texts = [(size, make_text(size, unit)) for size in sizes]
+        baseline = None
+        for name, fn in {BASELINE: copy_text, **TARGETS}.items():
+            timings = []
+            for size, text in texts:
+                median = measure(fn, text, runs)
+                timings.append((len(text), median))
+                rows.append({
+                    "function": name,
+                    "shape": shape,
+                    "size_bytes": size,
+                    "median_s": round(median, 6),
+                    "mb_per_s": round(len(text) / (1024 * 1024) / median, 1) if median else None,
+                })
+            exponent = fit_exponent(timings)
+            if name == BASELINE:
+                baseline = exponent
+                continue
+            scaling.append({
+                "function": name,
+                "shape": shape,
+                "exponent": round(exponent, 2) if exponent is not None else None,
+                "superlinear": exponent is not None and exponent > max(1.0, baseline or 1.0) + tolerance,
+            })
+    return {"rows": rows, "scaling": scaling}
+
+
+def fuzz_string(rng: random.Random, max_chars: int) -> str:
+    parts, length = [], rng.randint(0, max_chars)
+    while sum(map(len, parts)) < length:
+        if rng.random() < 0.2:
+            parts.append(rng.choice(FUZZ_FRAGMENTS))
+        else:
+            parts.append("".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(1, 64))))
+    return "".join(parts)[:length]
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _Timeout()
+
+
+def call_with_deadline(fn, text: str, seconds: float):
+    """(result, elapsed); raises _Timeout when SIGALRM is available and the call overruns"""
+    armed = hasattr(signal, "setitimer")
+    if armed:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+    start = time.perf_counter()
+    try:
+        return fn(text), time.perf_counter() - start
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def check_properties(name: str, text: str, result) -> list:
+    """The contract each function keeps for any input; returns the violated properties"""
+    violations = []
+    if name.startswith("clean_text"):
+        paragraphs = name == "clean_text_paragraphs"
+        if not isinstance(result, str):
+            violations.append("returns str")
+        elif clean_text(result, keep_paragraphs=paragraphs) != result:
+            violations.append("idempotent")
+        elif not paragraphs and re.search(r'\s\s|^\s|\s$', result):
+            violations.append("whitespace collapsed")
+    elif name == "ensure_complete_sentences_max_length":
+        if len(result) > max(1, len(text) // 2):
+            violations.append("honours max_length")
+    elif name in ("ensure_complete_sentences", "fix_ai_truncation_patterns"):
+        if not isinstance(result, str) or len(result) > len(text.strip()) + 64:
+            violations.append("bounded str result")
+    elif name == "parse_compatibility_response":
+        missing = [field for field in FIELD_PARSERS if field not in result]
+        if missing or not 0 <= result["overall_compatibility_score"] <= 100:
+            violations.append("every field present, score in 0-100")
+    return violations
+
+
+def run_fuzz(iterations: int, seed: int, max_chars: int, max_seconds: float) -> dict:
+    rng = random.Random(seed)
+    failures, slowest = [], {name: 0.0 for name in TARGETS}
+    for iteration in range(iterations):
+        text = fuzz_string(rng, max_chars)
+        for name, fn in TARGETS.items():
+            try:
+                result, elapsed = call_with_deadline(fn, text, max_seconds)
+                slowest[name] = max(slowest[name], elapsed)
+                violations = check_properties(name, text, result)
+                if elapsed > max_seconds:
+                    violations.append(f"finishes within {max_seconds}s")
+            except _Timeout:
+                violations = [f"finishes within {max_seconds}s"]
+            except Exception as e:
+                violations = [f"raises {type(e).__name__}: {e}"]
+            for violation in violations:
+                failures.append({"function": name, "property": violation, "iteration": iteration,
+                                 "input_chars": len(text), "input": text[:200]})
+    return {
+        "iterations": iterations,
+        "seed": seed,
+        "max_chars": max_chars,
+        "max_seconds": max_seconds,
+        "slowest_s": {name: round(elapsed, 6) for name, elapsed in slowest.items()},
+        "failures": failures,
+    }
+
+
+def run_hypothesis(examples: int, max_chars: int, max_seconds: float) -> dict:
+    """The fuzz properties under hypothesis, if it is installed"""
+    try:
+        from hypothesis import given, settings, strategies as st
+    except ImportError:
+        return {"skipped": "hypothesis is not installed"}
+
+    text_strategy = st.one_of(
+        st.text(max_size=max_chars),
+        st.text(alphabet=st.sampled_from(sorted(set(FUZZ_ALPHABET))), max_size=max_chars),
+        st.lists(st.sampled_from(FUZZ_FRAGMENTS), max_size=max_chars // 16).map("".join),
+    )
+    failures = []
+    for name, fn in TARGETS.items():
+        @settings(max_examples=examples, deadline=max_seconds * 1000, database=None)
+        @given(text_strategy)
+        def prop(text):
+            violations = check_properties(name, text, fn(text))
+            assert not violations, violations
+
+        try:
+            prop()
+        except Exception as e:
+            failures.append({"function": name, "error": f"{type(e).__name__}: {e}"[:500]})
+    return {"examples_per_function": examples, "failures": failures}
+
+
+def compare_reports(before_path: Path, after_path: Path) -> dict:
+    before, after = (json.loads(path.read_text(encoding="utf-8")) for path in (before_path, after_path))
+    key = lambda row: (row["function"], row["shape"], row["size_bytes"])  # noqa: E731
+    earlier = {key(row): row for row in before.get("benchmark", {}).get("rows", [])}
+    rows = []
+    for row in after.get("benchmark", {}).get("rows", []):
+        old = earlier.get(key(row))
+        if old and old["median_s"] and row["median_s"]:
+            rows.append({"function": row["function"], "shape": row["shape"], "size_bytes": row["size_bytes"],
+                         "before_s": old["median_s"], "after_s": row["median_s"],
+                         "speedup": round(old["median_s"] / row["median_s"], 2)})
+    return {"before": before.get("commit"), "after": after.get("commit"), "rows": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1K", "32K", "1M", "10M", "50M"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="flag exponents this far above linear (or the copy baseline, if worse)")
+    parser.add_argument("--fuzz", type=int, default=300, help="random inputs per function (0 to skip)")
+    parser.add_argument("--fuzz-seed", type=int, default=0)
+    parser.add_argument("--fuzz-max-chars", type=int, default=20000)
+    parser.add_argument("--fuzz-max-seconds", type=float, default=1.0)
+    parser.add_argument("--hypothesis", type=int, default=0, metavar="EXAMPLES",
+                        help="also run the properties under hypothesis with this many examples per function")
+    parser.add_argument("--out", type=Path, help="write the JSON report here as well")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two saved reports instead of running")
+    parser.add_argument("--keep-allocator", action="store_true",
+                        help="don't re-run with the glibc allocator settings that keep large blocks on the heap")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare_reports(*args.compare), indent=2))
+        return
+    if not args.keep_allocator:
+        tune_allocator()
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "allocator_env": {key: os.environ.get(key) for key in GLIBC_ALLOCATOR_ENV},
+        "runs": args.runs,
+        "benchmark": run_scaling([parse_size(size) for size in args.sizes], args.runs, args.tolerance),
+    }
+    if args.fuzz:
+        report["fuzz"] = run_fuzz(args.fuzz, args.fuzz_seed, args.fuzz_max_chars, args.fuzz_max_seconds)
+    if args.hypothesis:
+        report["hypothesis"] = run_hypothesis(args.hypothesis, args.fuzz_max_chars, args.fuzz_max_seconds)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+    failed = (any(row["superlinear"] for row in report["benchmark"]["scaling"])
+              or report.get("fuzz", {}).get("failures") or report.get("hypothesis", {}).get("failures"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Local stand-in for the Groq chat-completions API, for offline load and latency testing.
+
+Usage (from the repository root):
+    python -m benchmarks.groq_stub_server --port 8765 --latency lognormal --latency-mean 1.5 \\
+        --error-rate-429 0.02 --seed 7
+    GROQ_BASE_URL=http://127.0.0.1:8765 streamlit run main.py
+
+Speaks the OpenAI/Groq wire format on POST /openai/v1/chat/completions, both
+plain JSON and `stream=true` server-sent events. Each request gets a latency
+drawn from the configured distribution and may be failed with a 429 (with a
+retry-after header) or a 500. The response body is a canned answer chosen by
+the prompt type (basic info, financial, fused, compatibility, compatibility_json),
+overridable with --responses pointing at a JSON file of {prompt_type: content}.
+
+Randomness is seeded per request from --seed and the request body, so the same
+workload sees the same latencies and errors on every run.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+BASIC_INFO = {
+    "title": "Opioid Epidemic Response Services",
+    "event_id": "RFP-2025-0147",
+    "date_of_release": "January 6, 2025",
+    "date_of_submission": "March 14, 2025",
+    "department_agency": "Department of Health and Human Services",
+    "type": "Request for Proposals",
+    "objective": "Expand community-based prevention, treatment and recovery services across the state.",
+    "contract_term": "Three years with two optional one-year renewals",
+    "point_of_contact": "Jordan Lee, Procurement Officer, procurement@example.gov",
+    "total_budget": "$4,500,000",
+    "eligibility": "Nonprofit organizations licensed to provide behavioral health services in the state.",
+    "evaluation_criteria": "Technical approach 40%, experience 30%, cost 20%, local presence 10%.",
+    "scope_of_work": "Deliver peer recovery support, naloxone distribution and care coordination in six counties.",
+    "technical_requirements": "Secure case management system with monthly outcome reporting.",
+    "submission_requirements": "Electronic submission via the state procurement portal, 30-page limit.",
+}
+
+FINANCIAL = {
+    "total_budget": "$4,500,000",
+    "annual_budget": "$1,500,000 per contract year",
+    "payment_schedule": "Quarterly reimbursement against approved invoices",
+    "cost_sharing": "No cost sharing required",
+    "allowable_costs": "Personnel, supplies and travel are allowable; capital purchases are not.",
+    "budget_categories": "Personnel 65%, operations 20%, indirect 15%",
+    "indirect_cost_rate": "Capped at 15% of direct costs",
+    "financial_reporting": "Quarterly expenditure reports",
+    "audit_requirements": "Single audit for awards over $750,000",
+    "budget_flexibility": "Up to 10% may move between categories with approval",
+    "funding_stability": "Stable state general fund appropriation",
+}
+
+COMPATIBILITY = """OVERALL COMPATIBILITY SCORE: 72
+COMPATIBILITY LEVEL: Medium
+STRENGTHS:
+- The organization runs an established peer recovery program in four of the six counties.
+- Existing case management system already meets the reporting requirements.
+GAPS:
+- Limited presence in the two northern counties named in the scope of work.
+RECOMMENDATION: Recommended
+RISK ASSESSMENT: Moderate risk driven by the need to staff the northern counties quickly.
+DIFFERENTIATORS:
+- Ten years of state-funded behavioral health contracts with clean audits.
+RESOURCE GAPS: Two additional peer specialists and one regional coordinator are needed.
+STRATEGIC FIT: Strong alignment with the organization's recovery services mission.
+EFFORT REQUIRED: Medium
+TIMELINE FEASIBILITY: Feasible with a six-week hiring plan."""
+
+COMPATIBILITY_JSON = {
+    "overall_compatibility_score": 72,
+    "compatibility_level": "Medium",
+    "strengths_alignment": [
+        "The organization runs an established peer recovery program in four of the six counties.",
+        "Existing case management system already meets the reporting requirements.",
+    ],
+    "gaps_identified": ["Limited presence in the two northern counties named in the scope of work."],
+    "recommendation": "Recommended",
+    "risk_assessment": "Moderate risk driven by the need to staff the northern counties quickly.",
+    "key_differentiators": ["Ten years of state-funded behavioral health contracts with clean audits."],
+    "resource_gap_analysis": "Two additional peer specialists and one regional coordinator are needed.",
+    "strategic_fit": "Strong alignment with the organization's recovery services mission.",
+    "estimated_effort_required": "Medium",
+    "timeline_feasibility": "Feasible with a six-week hiring plan.",
+}
+
+DEFAULT_RESPONSES = {
+    "fused": json.dumps({"basic_info": BASIC_INFO, "financial_analysis": FINANCIAL}),
+    "basic_info": json.dumps(BASIC_INFO),
+    "financial": json.dumps(FINANCIAL),
+    "compatibility": COMPATIBILITY,
+    "compatibility_json": json.dumps(COMPATIBILITY_JSON),
+    "default": json.dumps({"result": "ok"}),
+}
+
+
+def classify_prompt(messages: list) -> str:
+    """Map a request to the canned response type by looking at its prompt text"""
+    prompt = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+    if '"basic_info"' in prompt and '"financial_analysis"' in prompt:
+        return "fused"
+    if "Extract comprehensive RFP information" in prompt:
+        return "basic_info"
+    if "Analyze financial aspects" in prompt:
+        return "financial"
+    if "compatibility" in prompt.lower():
+        # The JSON-mode variant carries its schema in the user message
+        conversation = " ".join(str(m.get("content", "")) for m in messages)
+        return "compatibility_json" if '"overall_compatibility_score"' in conversation else "compatibility"
+    return "default"
+
+
+@dataclass
+class StubConfig:
+    """Latency, failure and response settings for the stub server"""
+    latency: str = "fixed"  # fixed | uniform | normal | lognormal
+    latency_mean: float = 0.5  # seconds
+    latency_stddev: float = 0.2  # seconds (spread for uniform/normal/lognormal)
+    first_token_fraction: float = 0.2  # share of the latency spent before the first streamed token
+    stream_chunk_chars: int = 16
+    error_rate_429: float = 0.0
+    error_rate_500: float = 0.0
+    retry_after: float = 1.0  # seconds, sent with 429s
+    seed: int = 0
+    responses: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_RESPONSES))
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.latency == "uniform":
+            value = rng.uniform(self.latency_mean - self.latency_stddev, self.latency_mean + self.latency_stddev)
+        elif self.latency == "normal":
+            value = rng.gauss(self.latency_mean, self.latency_stddev)
+        elif self.latency == "lognormal":
+            # Parameterized by the mean and stddev of the latency itself, not of its log
+            mean = max(self.latency_mean, 1e-6)
+            sigma2 = math.log(1 + (self.latency_stddev / mean) ** 2)
+            value = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+        else:
+            value = self.latency_mean
+        return max(value, 0.0)
+
+
+class StubState:
+    """Shared counters, plus per-request seeding so runs are reproducible"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self.stats = {"requests": 0, "streamed": 0, "errors_429": 0, "errors_500": 0}
+
+    def request_rng(self, body: bytes) -> random.Random:
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            # Identical requests (retries, repeated runs) get the next value in their own sequence
+            occurrence = self._seen.get(digest, 0)
+            self._seen[digest] = occurrence + 1
+        return random.Random(f"{self.config.seed}:{digest}:{occurrence}")
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "GroqStub/1.0"
+    state: StubState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, dict(self.state.stats))
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != COMPLETIONS_PATH:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        config = self.state.config
+        rng = self.state.request_rng(body)
+        self.state.count("requests")
+        latency = config.sample_latency(rng)
+
+        roll = rng.random()
+        if roll < config.error_rate_429:
+            self.state.count("errors_429")
+            time.sleep(min(latency, 0.05))
+            self._send_json(429, {"error": {"message": "Rate limit reached (stub)", "type": "tokens",
+                                            "code": "rate_limit_exceeded"}},
+                            {"retry-after": f"{config.retry_after:g}"})
+            return
+        if roll < config.error_rate_429 + config.error_rate_500:
+            self.state.count("errors_500")
+            time.sleep(latency)
+            self._send_json(500, {"error": {"message": "Internal server error (stub)", "type": "internal_server_error"}})
+            return
+
+        messages = request.get("messages") or []
+        content = config.responses.get(classify_prompt(messages), config.responses["default"])
+        prompt_tokens = sum(_estimate_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+        meta = {"id": f"chatcmpl-{uuid.UUID(int=rng.getrandbits(128)).hex}", "created": int(time.time()),
+                "model": request.get("model", "stub")}
+
+        if request.get("stream"):
+            self.state.count("streamed")
+            self._stream(content, latency, meta)
+            return
+
+        time.sleep(latency)
+        self._send_json(200, {
+            **meta,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop", "logprobs": None}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    def _stream(self, content: str, latency: float, meta: dict):
+        """Send the response as server-sent events, spreading the latency over the chunks"""
+        config = self.state.config
+        size = max(1, config.stream_chunk_chars)
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+        first_token = latency * config.first_token_fraction
+        per_piece = (latency - first_token) / len(pieces)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta: dict, finish_reason=None):
+            chunk = {**meta, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason, "logprobs": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        time.sleep(first_token)
+        event({"role": "assistant", "content": ""})
+        for piece in pieces:
+            time.sleep(per_piece)
+            event({"content": piece})
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_stub_server(config: StubConfig = None, host: str = "127.0.0.1",
+                      port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Serve the stub from a daemon thread and return (server, base_url).
+
+    Port 0 picks a free port. Call `server.shutdown()` to stop it.
+    """
+    state = StubState(config or StubConfig())
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, name="groq-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    responses = dict(DEFAULT_RESPONSES)
+    if args.responses:
+        with open(args.responses, encoding="utf-8") as f:
+            overrides = json.load(f)
+        responses.update({k: v if isinstance(v, str) else json.dumps(v) for k, v in overrides.items()})
+    return StubConfig(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_stddev=args.latency_stddev,
+        first_token_fraction=args.first_token_fraction,
+        error_rate_429=args.error_rate_429,
+        error_rate_500=args.error_rate_500,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        responses=responses,
+    )
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """Stub settings, shared with benchmarks that start the server in-process"""
+    parser.add_argument("--latency", choices=["fixed", "uniform", "normal", "lognormal"], default="fixed")
+    parser.add_argument("--latency-mean", type=float, default=0.5, help="seconds")
+    parser.add_argument("--latency-stddev", type=float, default=0.2, help="seconds")
+    parser.add_argument("--first-token-fraction", type=float, default=0.2)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate-500", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="seconds, sent with 429 responses")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--responses", help="JSON file mapping prompt type to canned content")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(config_from_args(args), args.host, args.port)
+    print(f"Groq stub listening on {base_url} (set GROQ_BASE_URL={base_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
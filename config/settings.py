@@ -31,11 +31,71 @@ MODEL_NAME = os.getenv("MODEL_NAME", "llama-3.1-8b-instant")
 # --- File Processing Settings ---
 MAX_FILE_SIZE = 200 * 1024 * 1024  # 200MB
 SUPPORTED_FILE_TYPES = ["pdf", "docx", "txt"]
+# PDFs with at least this many pages are extracted on a process pool (see utils.parallel_pdf)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "0"))  # 0 = one per CPU
+# Streamed uploads larger than this are spooled to disk and memory-mapped (see utils.upload_buffer)
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+# Pre-flight check (see utils.preflight): pages sampled for a text layer, and the minimum text per page
+PREFLIGHT_SAMPLE_PAGES = int(os.getenv("PREFLIGHT_SAMPLE_PAGES", "3"))
+PREFLIGHT_MIN_CHARS_PER_PAGE = int(os.getenv("PREFLIGHT_MIN_CHARS_PER_PAGE", "40"))
+# Extracted text kept per process, keyed on the upload's SHA-256 (see utils.extraction_cache)
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
 
 # --- Analysis Settings ---
-MAX_TEXT_LENGTH = 6000
 TEMPERATURE = 0.1
-MAX_TOKENS = 10000
+MAX_TOKENS = 10000  # hard cap on completion tokens for any single request
+MAX_PROMPT_TOKENS = int(os.getenv("MAX_PROMPT_TOKENS", "0"))  # 0 = use the model's full context window
+MAX_INPUT_TOKENS = int(os.getenv("MAX_INPUT_TOKENS", "0"))  # document tokens per request; 0 = no cap
+
+# Completion tokens each LLM stage asks for - see utils.token_budget
+STAGE_OUTPUT_TOKENS = {
+    "basic_info": 2500,
+    "financial_analysis": 2000,
+    "compatibility_analysis": 2000,
+    "basic_financial_extraction": 4000,
+}
+MAX_CONCURRENT_STAGES = int(os.getenv("MAX_CONCURRENT_STAGES", "4"))
+
+# Map-reduce over overlapping windows instead of truncating long documents
+CHUNKED_ANALYSIS = os.getenv("CHUNKED_ANALYSIS", "false").lower() == "true"
+CHUNK_OVERLAP = 500  # characters shared by consecutive windows
+MAX_CHUNKS = int(os.getenv("MAX_CHUNKS", "8"))  # bounds the parallel fan-out per stage
+
+# Send each LLM stage only the document sections it needs (budget, scope, ...), plus the opening
+SECTION_ROUTING = os.getenv("SECTION_ROUTING", "true").lower() == "true"
+SECTION_LEAD_CHARS = 2000  # opening characters always sent - title, RFP number, agency, dates
+
+# Extract basic and financial information in a single request
+FUSED_EXTRACTION = os.getenv("FUSED_EXTRACTION", "false").lower() == "true"
+
+# Ask the compatibility stage for a JSON object instead of sectioned text
+COMPATIBILITY_JSON_MODE = os.getenv("COMPATIBILITY_JSON_MODE", "false").lower() == "true"
+
+# Truncated-opening completions applied to model answers (see utils.postprocessing)
+COMPLETION_RULES_PATH = os.getenv("COMPLETION_RULES_PATH", str(Path(__file__).resolve().parent / "completion_rules.json"))
+
+# --- LLM Client Settings ---
+# Point the client at a Groq-compatible server, e.g. benchmarks/groq_stub_server.py (unset = Groq's API)
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))  # seconds per call
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))  # in-flight requests per process
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_KEEPALIVE_EXPIRY = 30  # seconds
+
+# --- Rate Limiting (match your Groq account tier; 0 disables a budget) ---
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "0"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = 1.0  # seconds
+LLM_BACKOFF_MAX = 60.0  # seconds
+
+# --- LLM Response Cache ---
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(Path(__file__).resolve().parents[1] / ".cache" / "llm_responses.sqlite3"))
+LLM_CACHE_MAX_ENTRIES = 512  # in-memory tier
+LLM_CACHE_MAX_DISK_BYTES = 100 * 1024 * 1024  # 100MB
+LLM_CACHE_TTL = 7 * 24 * 3600  # seconds
 
 # --- UI Settings ---
 PAGE_TITLE = "RFP Intelligence Pro"
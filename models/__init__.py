@@ -1 +1,2 @@
-from .schemas import BasicInfo, RiskFactor, RiskAssessment, CompatibilityAnalysis
+from .schemas import (BasicInfo, FinancialAnalysis, FusedExtraction, RiskFactor, RiskAssessment,
+                      CompatibilityAnalysis)
@@ -1,7 +1,26 @@
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from typing import List, Dict, Any, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
-class BasicInfo(BaseModel):
+# Placeholder strings models return for "not found"; validated to None
+NULL_STRINGS = {"", "null", "none", "n/a", "na", "not specified", "not mentioned", "not provided", "unknown"}
+
+# A financial field: prose, or a breakdown by year or category
+FinancialValue = Union[str, Dict[str, Any], List[Any]]
+
+
+class StageOutput(BaseModel):
+    """Base for LLM stage outputs: numbers are accepted as text, unknown keys are kept"""
+    model_config = ConfigDict(coerce_numbers_to_str=True, extra="allow")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _null_strings(cls, value: Any) -> Any:
+        if isinstance(value, str) and value.strip().lower() in NULL_STRINGS:
+            return None
+        return value
+
+
+class BasicInfo(StageOutput):
     title: Optional[str] = None
     event_id: Optional[str] = None
     date_of_release: Optional[str] = None
@@ -10,7 +29,39 @@ class BasicInfo(BaseModel):
     type: Optional[str] = None
     objective: Optional[str] = None
     contract_term: Optional[str] = None
+    point_of_contact: Optional[str] = None
     total_budget: Optional[str] = None
+    eligibility: Optional[str] = None
+    evaluation_criteria: Optional[str] = None
+    scope_of_work: Optional[str] = None
+    technical_requirements: Optional[str] = None
+    submission_requirements: Optional[str] = None
+
+    @field_validator("eligibility", "evaluation_criteria", "scope_of_work", "technical_requirements",
+                     "submission_requirements", mode="before")
+    @classmethod
+    def _join_lists(cls, value: Any) -> Any:
+        # Requirement fields often come back as a list of items
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return "; ".join(value)
+        return value
+
+class FinancialAnalysis(StageOutput):
+    total_budget: Optional[FinancialValue] = None
+    annual_budget: Optional[FinancialValue] = None
+    payment_schedule: Optional[FinancialValue] = None
+    cost_sharing: Optional[FinancialValue] = None
+    allowable_costs: Optional[FinancialValue] = None
+    budget_categories: Optional[FinancialValue] = None
+    indirect_cost_rate: Optional[str] = None
+    financial_reporting: Optional[FinancialValue] = None
+    audit_requirements: Optional[FinancialValue] = None
+    budget_flexibility: Optional[FinancialValue] = None
+    funding_stability: Optional[str] = None
+
+class FusedExtraction(StageOutput):
+    basic_info: BasicInfo = Field(default_factory=BasicInfo)
+    financial_analysis: FinancialAnalysis = Field(default_factory=FinancialAnalysis)
 
 class RiskFactor(BaseModel):
     score: int
@@ -23,11 +74,16 @@ class RiskAssessment(BaseModel):
     risk_level: str
     key_risks: List[str]
 
-class CompatibilityAnalysis(BaseModel):
-    overall_compatibility_score: int
-    compatibility_level: str
-    strengths_alignment: List[str]
-    gaps_identified: List[str]
-    recommendation: str
-    risk_assessment: str
-    key_differentiators: List[str]
+class CompatibilityAnalysis(StageOutput):
+    overall_compatibility_score: int = Field(50, ge=0, le=100)
+    compatibility_level: str = "Medium"
+    strengths_alignment: List[str] = []
+    gaps_identified: List[str] = []
+    recommendation: str = "Conditional"
+    risk_assessment: str = "Moderate risk"
+    key_differentiators: List[str] = []
+    resource_gap_analysis: str = "Some gaps identified"
+    strategic_fit: str = "Moderate alignment"
+    estimated_effort_required: str = "Medium"
+    timeline_feasibility: str = "Feasible with effort"
+    raw_analysis: Optional[str] = None
@@ -9,10 +9,12 @@ from dataclasses import dataclass
 import streamlit as st
 
 # Local imports
-from utils.file_processing import process_uploaded_file
-from utils.text_cleaning import clean_text
-from analysis import multi_stage_rfp_analysis
-from .tabs import display_all_tabs
+from utils.file_processing import process_uploaded_file, process_uploaded_document
+from utils.upload_buffer import upload_size
+from utils.preflight import TYPE_NAMES, preflight_upload
+from utils.document_model import DocumentModel
+from analysis import iter_rfp_analysis, AnalysisSnapshot, summarize_changes
+from .tabs import display_all_tabs, display_overview_tab, display_financial_tab
 
 
 # ---------- Configuration ----------
@@ -23,6 +25,15 @@ class AppConfig:
     ANALYSIS_TIMEOUT = 300
     MIN_TEXT_LENGTH = 50
 
+    # Tabs previewed while the pipeline is still running, with the stages each needs
+    EARLY_TABS = {
+        "overview": (("basic_info", "risk_assessment", "competitive_analysis"), display_overview_tab),
+        "financial": (("financial_analysis",), display_financial_tab),
+    }
+
+    # Below this share of unchanged text a new upload is treated as a different RFP, not a revision
+    REVISION_SIMILARITY = 0.3
+
     # Enhanced configuration with environment variables
     DEBUG: bool = False
     MAX_FILE_SIZE: int = 50
@@ -72,11 +83,20 @@ def _validate_file_upload(uploaded_file) -> bool:
         return False
 
     # Check file size
-    file_size = len(uploaded_file.getvalue()) / (1024 * 1024)  # MB
+    file_size = upload_size(uploaded_file) / (1024 * 1024)  # MB
     if file_size > AppConfig.MAX_FILE_SIZE_MB:
         st.error(f"File too large: {file_size:.1f}MB. Maximum size is {AppConfig.MAX_FILE_SIZE_MB}MB")
         return False
 
+    # Check the content itself before any expensive parsing or LLM stage runs
+    report = preflight_upload(uploaded_file)
+    if not report.ok:
+        st.error(f"Cannot analyze {uploaded_file.name}: {report.reason}")
+        return False
+    if report.rerouted:
+        st.info(f"{uploaded_file.name} does not contain {file_extension.upper()} data; "
+                f"it will be processed as {TYPE_NAMES[report.file_type]}.")
+
     return True
 
 
@@ -302,6 +322,8 @@ def main_dashboard():
         st.session_state.organization_profile = ""
     if 'analysis_in_progress' not in st.session_state:
         st.session_state.analysis_in_progress = False
+    if 'analysis_snapshot' not in st.session_state:
+        st.session_state.analysis_snapshot = None
 
     _inject_css()
 
@@ -448,9 +470,9 @@ def perform_analysis(uploaded_file, organization_profile):
 
         # Step 1: File processing
         update_progress(1, message="Processing uploaded file...")
-        raw_text = process_uploaded_file(uploaded_file)
+        document = process_uploaded_document(uploaded_file)
 
-        if not raw_text or len(raw_text.strip()) < AppConfig.MIN_TEXT_LENGTH:
+        if len(document.text) < AppConfig.MIN_TEXT_LENGTH:
             st.error(
                 f"Uploaded file appears to be empty or too short for analysis. Minimum required: {AppConfig.MIN_TEXT_LENGTH} characters")
             if progress_bar:
@@ -460,23 +482,23 @@ def perform_analysis(uploaded_file, organization_profile):
             return
 
         # Step 2: Text cleaning
+        # Pages are cleaned as they are extracted; the model keeps their offsets for citations
         update_progress(2, message="Cleaning and preparing text...")
-        text = clean_text(raw_text)
-
-        if not text or len(text.strip()) < AppConfig.MIN_TEXT_LENGTH:
-            st.error("Text cleaning resulted in insufficient content for analysis")
-            if progress_bar:
-                progress_bar.empty()
-            if status_text:
-                status_text.empty()
-            return
+        text = document.text
 
         # Step 3: AI Analysis
         update_progress(3, message="Running multi-stage AI analysis...")
-        results = multi_stage_rfp_analysis(text, organization_profile)
+        # Stages whose input is unchanged since the last upload reuse their previous result
+        previous = st.session_state.analysis_snapshot
+        record = {}
+        results = _run_streaming_analysis(document, organization_profile, status_text,
+                                          previous.stages if previous else None, record)
 
         # Step 4: Store results and complete
         update_progress(4, message="Finalizing analysis...")
+        snapshot = AnalysisSnapshot.build(text, organization_profile, record)
+        changes = summarize_changes(previous, snapshot) if previous else None
+        st.session_state.analysis_snapshot = snapshot
         st.session_state.analysis_results = results
         st.session_state.organization_profile = organization_profile
         st.session_state.last_uploaded_file = uploaded_file.name
@@ -501,6 +523,9 @@ def perform_analysis(uploaded_file, organization_profile):
         </div>
         """, unsafe_allow_html=True)
 
+        if changes and changes["similarity"] >= AppConfig.REVISION_SIMILARITY:
+            _display_changes(changes)
+
         # Render the tabs with results
         display_all_tabs(results, organization_profile)
 
@@ -520,6 +545,66 @@ def perform_analysis(uploaded_file, organization_profile):
             st.exception(e)
 
 
+def _run_streaming_analysis(document: DocumentModel, organization_profile: str, status_text,
+                            previous: Optional[Dict[str, Any]] = None,
+                            record: Optional[Dict[str, Any]] = None) -> dict:
+    """
+    Run the analysis pipeline, previewing tabs as soon as their stages finish.
+
+    Streamed LLM output is shown live below the progress bar; the previews are
+    cleared once every stage is done and the full tab set is rendered.
+    """
+    results = {}
+    fragments = {}
+    rendered = set()
+    stream_slot = st.empty()
+    preview_slots = {name: st.empty() for name in AppConfig.EARLY_TABS}
+
+    for event in iter_rfp_analysis(document, organization_profile, previous=previous, record=record):
+        label = event.stage.replace('_', ' ').title()
+
+        if not event.done:
+            parts = fragments.setdefault(event.stage, [])
+            parts.append(event.delta)
+            stream_slot.caption(f"{label} (streaming): …{''.join(parts[-80:])[-400:]}")
+            continue
+
+        results[event.stage] = event.result
+        state = "unchanged, reused" if event.reused else "complete"
+        status_text.text(f"{label} {state} ({len(results)} stages finished)...")
+
+        for name, (required, render) in AppConfig.EARLY_TABS.items():
+            if name not in rendered and all(stage in results for stage in required):
+                with preview_slots[name].container():
+                    render(results)
+                rendered.add(name)
+
+    stream_slot.empty()
+    for slot in preview_slots.values():
+        slot.empty()
+    return results
+
+
+def _display_changes(changes: Dict[str, Any]):
+    """Summarize what changed since the previously analyzed version of the RFP."""
+    with st.expander("What changed since the previous version", expanded=True):
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Sections modified", len(changes["modified"]))
+        c2.metric("Sections added", len(changes["added"]))
+        c3.metric("Sections removed", len(changes["removed"]))
+
+        for label, key in (("Modified", "modified"), ("Added", "added"), ("Removed", "removed")):
+            for item in changes[key]:
+                st.markdown(f"**{label}: {item['section']}** - {item['preview']}")
+
+        if changes["profile_changed"]:
+            st.caption("The organization profile also changed.")
+        reused = ", ".join(name.replace('_', ' ').title() for name in changes["reused_stages"]) or "none"
+        rerun = ", ".join(name.replace('_', ' ').title() for name in changes["rerun_stages"]) or "none"
+        st.caption(f"Re-analyzed: {rerun}")
+        st.caption(f"Reused from the previous version: {reused}")
+
+
 def display_previous_analysis():
     """Display previously stored analysis results."""
     if st.session_state.analysis_results:
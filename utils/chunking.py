@@ -0,0 +1,43 @@
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+def split_into_windows(text: str, window_size: int, overlap: int = 0, max_windows: int = None) -> List[str]:
+    """
+    Split text into overlapping windows of at most `window_size` characters.
+
+    Window ends are pulled back to the nearest sentence end (or space) in the
+    last fifth of the window so words and sentences are not cut in half.
+    Stopping at `max_windows` drops the rest of the text, with a warning logged.
+    """
+    if not text:
+        return []
+    if window_size <= 0:
+        raise ValueError("window_size must be positive")
+    overlap = max(0, min(overlap, window_size // 2))
+
+    windows = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + window_size, length)
+        if end < length:
+            floor = start + (window_size * 4) // 5
+            boundary = max(text.rfind('. ', floor, end), text.rfind('? ', floor, end), text.rfind('! ', floor, end))
+            if boundary == -1:
+                boundary = text.rfind(' ', floor, end)
+            if boundary != -1:
+                end = boundary + 1
+
+        windows.append(text[start:end].strip())
+        if end >= length:
+            break
+        if max_windows and len(windows) >= max_windows:
+            logger.warning("Stopped at %d windows of %d characters; the last %d of %d characters are not analyzed",
+                           max_windows, window_size, length - end, length)
+            break
+        start = max(end - overlap, start + 1)
+
+    return [window for window in windows if window]
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+# Key of the completion stored at the trie node where a fragment ends (never a single character)
+_END = "$end"
+
+FieldRules = Dict[str, Dict[str, str]]
+
+
+class CompletionTrie:
+    """
+    Character trie of truncated fragments and their completions.
+
+    `match` walks the trie from the start of a string, so finding the longest
+    fragment that opens it costs O(fragment length) however many rules are
+    loaded. A fragment only matches when it ends on a word boundary, so "oid"
+    completes "oid treatment" but not "oidium".
+    """
+
+    def __init__(self, rules: Optional[Dict[str, str]] = None):
+        self._root: Dict[str, dict] = {}
+        self.size = 0
+        for fragment, completion in (rules or {}).items():
+            self.add(fragment, completion)
+
+    def add(self, fragment: str, completion: str) -> None:
+        if not fragment:
+            return
+        node = self._root
+        for char in fragment:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = completion
+
+    def match(self, text: str) -> Optional[Tuple[int, str]]:
+        """(fragment length, completion) of the longest fragment opening `text`, or None"""
+        node, best = self._root, None
+        for index, char in enumerate(text):
+            if _END in node and not (char.isalnum() or char == "_"):
+                best = (index, node[_END])
+            node = node.get(char)
+            if node is None:
+                return best
+        if _END in node:
+            best = (len(text), node[_END])
+        return best
+
+    def complete(self, text: str) -> str:
+        """`text` with its truncated opening replaced by the completion, if it has one"""
+        found = self.match(text)
+        return found[1] + text[found[0]:] if found else text
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def load_completion_rules(path: Union[str, Path]) -> Tuple[Dict[str, str], FieldRules]:
+    """Read (global rules, {field: rules}) from a JSON rules file"""
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    return data.get("global", {}), data.get("fields", {})
+
+
+class CompletionRules:
+    """Global and field-scoped completion tries; each field's trie also holds the global rules"""
+
+    def __init__(self, global_rules: Dict[str, str], field_rules: Optional[FieldRules] = None):
+        self.global_trie = CompletionTrie(global_rules)
+        self.field_tries = {field: CompletionTrie({**global_rules, **rules})
+                            for field, rules in (field_rules or {}).items()}
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "CompletionRules":
+        return cls(*load_completion_rules(path))
+
+    def trie_for(self, field: str = "") -> CompletionTrie:
+        return self.field_tries.get(field, self.global_trie)
+
+    def match(self, text: str, field: str = "") -> Optional[Tuple[int, str]]:
+        return self.trie_for(field).match(text)
+
+    def complete(self, text: str, field: str = "") -> str:
+        return self.trie_for(field).complete(text)
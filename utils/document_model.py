@@ -0,0 +1,296 @@
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from config.settings import SECTION_LEAD_CHARS, SECTION_ROUTING
+from utils.text_cleaning import clean_text
+
+# Headings that survive clean_text's whitespace collapsing, e.g. "SECTION 3.2", "Part IV", "Appendix B"
+SECTION_HEADING = re.compile(
+    r'\b(?:SECTION|Section|PART|Part|ARTICLE|Article|APPENDIX|Appendix|ATTACHMENT|Attachment|EXHIBIT|Exhibit)'
+    r'\s+(?:\d+(?:\.\d+)*|[IVXLC]+|[A-Z])\b'
+)
+
+# "as described in Section 3.2" is a cross-reference, not a heading
+_CROSS_REFERENCE = re.compile(r'\b(?:in|see|per|under|of|to|with|by|and|or|the|this|that)\s*$', re.IGNORECASE)
+
+# Capitalized words that open a sentence rather than a heading title
+_SENTENCE_OPENERS = ("The", "A", "An", "This", "These", "Each", "All", "Any", "If", "In", "Our", "We")
+
+# Numbered headings at the start of a sentence, e.g. "3.2 Budget Justification", "4. Evaluation Criteria"
+NUMBERED_HEADING = re.compile(
+    r'(?:^|(?<=[.:;!?]\s))(?:\d{1,2}\.\d{1,2}(?:\.\d{1,2}){0,2}\.?|\d{1,2}\.)\s+'
+    r'(?!(?:' + '|'.join(_SENTENCE_OPENERS) + r')\b)'
+    r'[A-Z][A-Za-z\-/]+(?:\s+(?:(?:and|of|for|to|the|&)\s+)?[A-Z][A-Za-z\-/]+){1,7}'
+)
+
+# All-caps heading lines, e.g. "SCOPE OF WORK", "COST PROPOSAL REQUIREMENTS"
+CAPS_HEADING = re.compile(r'\b[A-Z][A-Z\-/]{2,}(?:\s+(?:OF|AND|FOR|TO|THE|&|[A-Z][A-Z\-/]{2,})){1,7}\b(?![a-z])')
+
+# A numbered or all-caps "heading" seen this often is a running page header/footer, not a section
+_RUNNING_HEADER_REPEATS = 3
+
+# Words of the heading line kept as the section title after the "Section 3.2" marker
+_TITLE_WORDS = 8
+
+# What each kind of section is called in RFPs; a section can be more than one kind
+SECTION_KINDS: Dict[str, "re.Pattern"] = {
+    "budget": re.compile(r'\b(?:budget\w*|costs?|pricing|price|financial|funding|compensation|payments?|fees?'
+                         r'|award amount|match(?:ing)? requirements?)\b', re.IGNORECASE),
+    "scope": re.compile(r'\b(?:scope|statement of work|sow|services|deliverables?|tasks?|technical requirements'
+                        r'|specifications?|project description|background|objectives?|purpose)\b', re.IGNORECASE),
+    "evaluation": re.compile(r'\b(?:evaluation|scoring|selection|criteria|review process|points)\b', re.IGNORECASE),
+    "submission": re.compile(r'\b(?:submission|submittal|submit|proposal (?:format|preparation|instructions)'
+                             r'|instructions|deadlines?|due dates?|timeline|schedule of events|questions)\b',
+                             re.IGNORECASE),
+    "eligibility": re.compile(r'\b(?:eligib\w*|qualifications?|minimum requirements|experience|licens\w*'
+                              r'|certifications?|insurance)\b', re.IGNORECASE),
+    "contact": re.compile(r'\b(?:contacts?|procurement officer|contracting officer|issuing (?:office|agency)'
+                          r'|inquiries|correspondence)\b', re.IGNORECASE),
+    "terms": re.compile(r'\b(?:terms and conditions|general provisions|standard clauses|contract clauses'
+                        r'|indemnif\w*|governing law|warrant(?:y|ies))\b', re.IGNORECASE),
+}
+# Kind recorded for sections that match none of SECTION_KINDS (agency overview, glossary, ...)
+OTHER_SECTIONS = "other"
+# An untitled match needs this many keyword hits in the start of its body to be classified
+_BODY_MIN_HITS = 4
+_BODY_SAMPLE_CHARS = 2000
+
+
+def iter_section_headings(text: str) -> Iterator["re.Match"]:
+    """Yield heading matches in order, skipping in-sentence cross-references"""
+    for match in SECTION_HEADING.finditer(text):
+        if not _CROSS_REFERENCE.search(text, max(0, match.start() - 12), match.start()):
+            yield match
+
+
+def _marker_title(text: str, match: "re.Match") -> str:
+    """"Section 3.2" plus the words after it, up to the heading line's first sentence break"""
+    tail = text[match.end():match.end() + 120].split()
+    title = " ".join([match.group(0)] + tail[:_TITLE_WORDS])
+    return re.split(r'(?<=[.:;])\s', title, maxsplit=1)[0].rstrip('.:;')
+
+
+def _styled_heading(text: str, match: "re.Match") -> Tuple[int, int, str]:
+    """(start, end, title) of a numbered/all-caps heading, without the start of the body's first sentence"""
+    words = match.group(0).split()
+    # Whitespace is collapsed, so "Agency Overview The Department of..." runs into the body: stop at
+    # the first sentence opener, or else drop the capitalized word a lowercase sentence starts with
+    opener = next((index for index, word in enumerate(words) if index > 1 and word in _SENTENCE_OPENERS), None)
+    if opener is not None:
+        words = words[:opener]
+    elif text[match.end():match.end() + 2][1:].islower() and len(words) > 3:
+        words.pop()
+    title = " ".join(words)
+    return match.start(), match.start() + len(title), title
+
+
+def iter_headings(text: str) -> List[Tuple[int, str]]:
+    """
+    (offset, title) of every heading in the text, in order.
+
+    Combines "Section 3.2"-style markers with numbered ("3.2 Budget") and
+    all-caps ("SCOPE OF WORK") headings. Numbered and all-caps headings that
+    repeat on every page are running headers and are left out; a heading
+    that overlaps an earlier one is the same heading and is skipped.
+    """
+    found = [(match.start(), match.end(), _marker_title(text, match)) for match in iter_section_headings(text)]
+    styled = [_styled_heading(text, match) for pattern in (NUMBERED_HEADING, CAPS_HEADING)
+              for match in pattern.finditer(text)]
+    repeats = Counter(title for _, _, title in styled)
+    found.extend(heading for heading in styled if repeats[heading[2]] < _RUNNING_HEADER_REPEATS)
+    found.sort()
+
+    headings, covered = [], -1
+    for start, end, title in found:
+        if start >= covered:
+            headings.append((start, title))
+            covered = end
+    return headings
+
+
+def classify_section(title: str, body: str) -> Tuple[str, ...]:
+    """Section kinds named in the title, or else the single kind its opening text is mostly about"""
+    kinds = tuple(kind for kind, pattern in SECTION_KINDS.items() if pattern.search(title))
+    if kinds:
+        return kinds
+    sample = body[:_BODY_SAMPLE_CHARS]
+    hits = {kind: len(pattern.findall(sample)) for kind, pattern in SECTION_KINDS.items()}
+    kind = max(hits, key=hits.get)
+    return (kind,) if hits[kind] >= _BODY_MIN_HITS else ()
+
+
+@dataclass
+class DocumentModel:
+    """
+    Cleaned document text plus offset tables for pages and section headings.
+
+    `page_starts[i]` is the offset in `text` where page `page_numbers[i]`
+    begins (pages without text are skipped, so numbers can have gaps);
+    `section_starts[i]` is where the heading `section_titles[i]` begins. Both
+    tables are sorted, so any offset maps back to its page and section with a
+    binary search. Formats without pages (DOCX, plain text) leave the page
+    tables empty.
+
+    Sections are also classified (budget, scope, evaluation, submission,
+    eligibility, contact, terms, or OTHER_SECTIONS when none applies);
+    `kind_sections` maps each kind to the indexes of its sections so a stage
+    can send only the parts of the document it needs.
+    """
+    text: str
+    page_starts: array = field(default_factory=lambda: array('q'))
+    page_numbers: array = field(default_factory=lambda: array('i'))
+    section_starts: array = field(default_factory=lambda: array('q'))
+    section_titles: List[str] = field(default_factory=list)
+    kind_sections: Dict[str, array] = field(default_factory=dict)
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Tuple[Optional[int], str]]) -> "DocumentModel":
+        """Clean and join (page_number, raw_text) records, recording where each page starts"""
+        parts: List[str] = []
+        page_starts, page_numbers = array('q'), array('i')
+        offset = 0
+        for page_number, raw_text in pages:
+            cleaned = clean_text(raw_text)
+            if not cleaned:
+                continue
+            if parts:
+                parts.append(" ")
+                offset += 1
+            if page_number is not None:
+                page_starts.append(offset)
+                page_numbers.append(page_number)
+            parts.append(cleaned)
+            offset += len(cleaned)
+
+        document = cls("".join(parts), page_starts, page_numbers)
+        document.index_sections()
+        return document
+
+    @classmethod
+    def from_text(cls, text: str) -> "DocumentModel":
+        """Model already-cleaned text that has no page information"""
+        document = cls(text or "")
+        document.index_sections()
+        return document
+
+    def index_sections(self) -> None:
+        """Record and classify every section heading"""
+        self.section_starts = array('q')
+        self.section_titles = []
+        self.kind_sections = {kind: array('i') for kind in (*SECTION_KINDS, OTHER_SECTIONS)}
+        for start, title in iter_headings(self.text):
+            self.section_starts.append(start)
+            self.section_titles.append(title)
+        for index, title in enumerate(self.section_titles):
+            for kind in classify_section(title, self.section_text(index)) or (OTHER_SECTIONS,):
+                self.kind_sections[kind].append(index)
+
+    # ---------- lookups ----------
+    def page_at(self, offset: int) -> Optional[int]:
+        """Page number containing `offset`, or None when the format has no pages"""
+        index = bisect_right(self.page_starts, offset) - 1
+        return self.page_numbers[index] if index >= 0 else None
+
+    def section_index_at(self, offset: int) -> Optional[int]:
+        index = bisect_right(self.section_starts, offset) - 1
+        return index if index >= 0 else None
+
+    def section_at(self, offset: int) -> Optional[str]:
+        """Title of the section containing `offset`, or None before the first heading"""
+        index = self.section_index_at(offset)
+        return self.section_titles[index] if index is not None else None
+
+    def section_span(self, index: int) -> Tuple[int, int]:
+        start = self.section_starts[index]
+        end = self.section_starts[index + 1] if index + 1 < len(self.section_starts) else len(self.text)
+        return start, end
+
+    def section_text(self, index: int) -> str:
+        start, end = self.section_span(index)
+        return self.text[start:end]
+
+    def iter_sections(self) -> Iterator[Tuple[str, int, int]]:
+        """Yield (title, start, end) for each section, in document order"""
+        for index, title in enumerate(self.section_titles):
+            start, end = self.section_span(index)
+            yield title, start, end
+
+    def section_spans(self, kinds: Sequence[str]) -> List[Tuple[int, int]]:
+        """Merged, ordered (start, end) spans of every section of the given kinds"""
+        indexes = sorted({index for kind in kinds for index in self.kind_sections.get(kind, ())})
+        spans: List[Tuple[int, int]] = []
+        for index in indexes:
+            start, end = self.section_span(index)
+            if spans and start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(end, spans[-1][1]))
+            else:
+                spans.append((start, end))
+        return spans
+
+    def sections_text(self, kinds: Sequence[str], lead_chars: int = SECTION_LEAD_CHARS) -> Optional[str]:
+        """
+        The document's opening `lead_chars` followed by its sections of the given
+        kinds, in document order; None when no section is of those kinds.
+        """
+        spans = self.section_spans(kinds)
+        if not spans:
+            return None
+        parts, covered = [self.text[:lead_chars]], lead_chars
+        for start, end in spans:
+            if end > covered:
+                parts.append(self.text[max(start, covered):end])
+                covered = end
+        return " ... ".join(part.strip() for part in parts if part.strip())
+
+    def locate(self, start: int, end: Optional[int] = None) -> dict:
+        """Map a character span back to its pages and section"""
+        end = start if end is None else max(start, end - 1)
+        first, last = self.page_at(start), self.page_at(end)
+        return {"start": start, "end": end + 1, "page": first,
+                "last_page": last if last != first else None, "section": self.section_at(start)}
+
+    def cite(self, start: int, end: Optional[int] = None) -> str:
+        """Human-readable location of a span, e.g. "Section 4.1 Audit Requirements (p. 12)" """
+        location = self.locate(start, end)
+        page, last_page, section = location["page"], location["last_page"], location["section"]
+        if page is None:
+            return section or "Document body"
+        if section:
+            return f"{section} (pp. {page}-{last_page})" if last_page else f"{section} (p. {page})"
+        return f"Pages {page}-{last_page}" if last_page else f"Page {page}"
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __sizeof__(self) -> int:
+        tables = (self.page_starts, self.page_numbers, self.section_starts, *self.kind_sections.values())
+        return (sys.getsizeof(self.text) + sum(len(table) * table.itemsize for table in tables)
+                + sum(sys.getsizeof(title) for title in self.section_titles))
+
+
+def as_document(source: Union[str, DocumentModel]) -> DocumentModel:
+    """Accept either a DocumentModel or plain cleaned text"""
+    return source if isinstance(source, DocumentModel) else DocumentModel.from_text(source)
+
+
+def document_text(source: Union[str, DocumentModel]) -> str:
+    """The text of a DocumentModel, or plain text unchanged (no section scan)"""
+    return source.text if isinstance(source, DocumentModel) else source
+
+
+def stage_text(source: Union[str, DocumentModel], kinds: Sequence[str]) -> str:
+    """
+    The text a stage should read: for a DocumentModel, the opening plus the
+    sections of `kinds` when it has any (and SECTION_ROUTING is on); otherwise
+    the whole text.
+    """
+    if SECTION_ROUTING and isinstance(source, DocumentModel):
+        routed = source.sections_text(kinds)
+        if routed:
+            return routed
+    return document_text(source)
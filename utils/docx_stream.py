@@ -0,0 +1,131 @@
+import re
+import zipfile
+from typing import IO, Iterator, List, Tuple
+from xml.etree.ElementTree import iterparse
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_P, _T, _TAB, _BR, _CR = _W + "p", _W + "t", _W + "tab", _W + "br", _W + "cr"
+_TBL, _TR, _TC, _BODY = _W + "tbl", _W + "tr", _W + "tc", _W + "body"
+
+CELL_SEPARATOR = " | "
+
+_PART_NUMBER = re.compile(r'(\d+)\.xml$')
+
+# Block kinds yielded by iter_docx_blocks
+HEADER = "header"
+PARAGRAPH = "paragraph"
+TABLE_ROW = "table_row"
+FOOTER = "footer"
+
+
+def _iter_part_blocks(part: IO[bytes]) -> Iterator[Tuple[str, str]]:
+    """
+    Stream one WordprocessingML part, yielding (kind, text) for each paragraph
+    and each table row, in document order.
+
+    Elements are cleared as soon as they are consumed, so memory stays flat no
+    matter how large the part is. Table cells are joined with CELL_SEPARATOR;
+    nested tables are folded into the text of the cell that holds them.
+    """
+    paragraphs: List[List[str]] = []  # text of each open paragraph (text boxes nest)
+    cells: List[str] = []
+    cell_text: List[str] = []
+    table_depth = 0
+    fallback_depth = 0
+    container = None
+
+    for event, elem in iterparse(part, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _P:
+                paragraphs.append([])
+            elif tag == _TBL:
+                table_depth += 1
+            elif tag == _MC_FALLBACK:
+                fallback_depth += 1
+            elif tag == _BODY or container is None and tag in (_W + "hdr", _W + "ftr"):
+                container = elem
+            continue
+
+        if fallback_depth:
+            # Fallback markup repeats the text of its mc:Choice sibling
+            if tag == _MC_FALLBACK:
+                fallback_depth -= 1
+                elem.clear()
+            continue
+
+        if tag == _T:
+            if paragraphs:
+                paragraphs[-1].append(elem.text or "")
+        elif tag == _TAB:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (_BR, _CR):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == _P:
+            text = "".join(paragraphs.pop())
+            if paragraphs:
+                # A text box inside another paragraph - keep its text in place
+                paragraphs[-1].append(text)
+            elif table_depth:
+                if text:
+                    cell_text.append(text)
+            else:
+                yield PARAGRAPH, text
+            elem.clear()
+        elif tag == _TC and table_depth == 1:
+            cells.append(" ".join(cell_text))
+            cell_text = []
+        elif tag == _TR and table_depth == 1:
+            yield TABLE_ROW, CELL_SEPARATOR.join(cells)
+            cells = []
+            elem.clear()
+        elif tag == _TBL:
+            table_depth -= 1
+            elem.clear()
+
+        # Drop finished top-level blocks so the tree never grows
+        if container is not None and not table_depth and not paragraphs and tag in (_P, _TBL):
+            container.clear()
+
+
+def _part_order(name: str) -> Tuple[int, str]:
+    match = _PART_NUMBER.search(name)
+    return (int(match.group(1)) if match else 0, name)
+
+
+def iter_docx_blocks(stream: IO[bytes]) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (kind, text) for every block of a DOCX: header paragraphs, then the
+    body's paragraphs and table rows in document order, then footer paragraphs.
+
+    `stream` is any seekable binary file object; the XML parts are streamed
+    straight out of the zip archive rather than loaded whole.
+    """
+    with zipfile.ZipFile(stream) as archive:
+        names = archive.namelist()
+        headers = sorted((n for n in names if re.fullmatch(r'word/header\d*\.xml', n)), key=_part_order)
+        footers = sorted((n for n in names if re.fullmatch(r'word/footer\d*\.xml', n)), key=_part_order)
+
+        seen = set()
+        for name in headers:
+            with archive.open(name) as part:
+                for _, text in _iter_part_blocks(part):
+                    # Sections often repeat the same header; emit each distinct line once
+                    if text and text not in seen:
+                        seen.add(text)
+                        yield HEADER, text
+
+        with archive.open("word/document.xml") as part:
+            yield from _iter_part_blocks(part)
+
+        seen = set()
+        for name in footers:
+            with archive.open(name) as part:
+                for _, text in _iter_part_blocks(part):
+                    if text and text not in seen:
+                        seen.add(text)
+                        yield FOOTER, text
@@ -0,0 +1,83 @@
+import hashlib
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from config.settings import EXTRACTION_CACHE_MAX_BYTES
+from utils.lru import LRUCache
+
+ExtractionKey = Tuple[str, str, str]
+
+
+class ExtractionCache:
+    """
+    Process-wide cache of extracted document text (or DocumentModels).
+
+    Keyed on the SHA-256 of the uploaded bytes, the file type and the extractor
+    version, so the same document is parsed once per process no matter how many
+    Streamlit reruns or sessions see it. Concurrent requests for a document that
+    is still being parsed wait for that parse instead of starting their own.
+    """
+
+    def __init__(self, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES):
+        self._entries = LRUCache(max_bytes=max_bytes, sizeof=sys.getsizeof)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[ExtractionKey, threading.Event] = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(data: Union[bytes, memoryview], file_type: str, extractor_version: str) -> ExtractionKey:
+        return hashlib.sha256(data).hexdigest(), file_type or "", extractor_version
+
+    def get_or_extract(self, key: ExtractionKey, extract: Callable[[], Any]) -> Any:
+        while True:
+            text = self._entries.get(key)
+            if text is not None:
+                with self._lock:
+                    self.stats["hits"] += 1
+                return text
+
+            with self._lock:
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    pending = self._in_flight[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+
+            if not owner:
+                # Another session is parsing this document - reuse its result (or retry if it failed)
+                pending.wait()
+                continue
+
+            try:
+                with self._lock:
+                    self.stats["misses"] += 1
+                text = extract()
+                self._entries.put(key, text)
+                return text
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+                pending.set()
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.stats)
+        total = stats["hits"] + stats["misses"]
+        stats.update(entries=len(self._entries), bytes=self._entries.total_bytes,
+                     hit_rate=round(stats["hits"] / total, 3) if total else 0.0)
+        return stats
+
+
+_default_cache: Optional[ExtractionCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Return the shared extraction cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ExtractionCache()
+        return _default_cache
@@ -1,40 +1,104 @@
 import PyPDF2
-from docx import Document
-from io import BytesIO
+from typing import Iterator, Tuple, Union
+from config.settings import PDF_PARALLEL_MIN_PAGES
+from .docx_stream import iter_docx_blocks
+from .document_model import DocumentModel
+from .extraction_cache import ExtractionCache, get_extraction_cache
+from .parallel_pdf import iter_pages_parallel, extraction_workers
+from .preflight import sniff_type
+from .upload_buffer import MemoryviewStream, open_document_buffer
 
-def extract_text_from_pdf(data: bytes) -> str:
+# Raw document bytes - a memoryview lets callers pass uploads and mapped files without copying
+Buffer = Union[bytes, memoryview]
+
+# Bump when extraction output changes so cached text from the old extractors is not reused
+EXTRACTOR_VERSION = "3"
+
+def iter_pdf_pages(data: Buffer, parallel: bool = None) -> Iterator[Tuple[int, str]]:
+    """Yield (page_number, text) for each page of a PDF, starting at 1
+
+    Long PDFs are extracted on a process pool; `parallel` forces either mode
+    instead of deciding by page count.
+    """
+    with MemoryviewStream(memoryview(data)) as stream:
+        reader = PyPDF2.PdfReader(stream)
+        page_count = len(reader.pages)
+        if parallel is None:
+            parallel = page_count >= PDF_PARALLEL_MIN_PAGES and extraction_workers() > 1
+
+        done = 0
+        if parallel:
+            try:
+                for page_text in iter_pages_parallel(data, page_count):
+                    done += 1
+                    yield done, page_text
+            except Exception:
+                # No usable process pool here - carry on serially from the first missing page
+                pass
+
+        for index in range(done, page_count):
+            yield index + 1, reader.pages[index].extract_text() or ""
+
+def iter_docx_paragraphs(data: Buffer) -> Iterator[Tuple[int, str]]:
+    """Yield (block_index, text) for each block of a DOCX, starting at 0
+
+    Blocks are header lines, body paragraphs, table rows (cells separated by
+    " | ") and footer lines, in document order - see utils.docx_stream.
+    """
+    with MemoryviewStream(memoryview(data)) as stream:
+        for index, (_, text) in enumerate(iter_docx_blocks(stream)):
+            yield index, text
+
+def extract_text_from_pdf(data: Buffer, parallel: bool = None) -> str:
     """Extract text from PDF file"""
     try:
-        pdf_file = BytesIO(data)
-        reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
+        text = "".join(page_text + "\n" for _, page_text in iter_pdf_pages(data, parallel) if page_text)
         return text if text else "No text extracted from PDF"
     except Exception as e:
         return f"PDF error: {str(e)}"
 
-def extract_text_from_docx(data: bytes) -> str:
+def extract_text_from_docx(data: Buffer) -> str:
     """Extract text from DOCX file"""
     try:
-        docx_file = BytesIO(data)
-        doc = Document(docx_file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return "".join(text + "\n" for _, text in iter_docx_paragraphs(data))
     except Exception as e:
         return f"DOCX error: {str(e)}"
 
-def process_uploaded_file(uploaded_file):
-    """Process uploaded file and extract text"""
-    data = uploaded_file.getvalue()
-
-    if uploaded_file.type == "application/pdf":
+def extract_text(data: Buffer, file_type: str) -> str:
+    """Extract text from raw upload bytes by MIME type"""
+    if file_type == "application/pdf":
         return extract_text_from_pdf(data)
-    elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+    elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
         return extract_text_from_docx(data)
     else:
-        return data.decode("utf-8", errors="ignore")
+        return str(data, "utf-8", errors="ignore")
+
+def extract_document(data: Buffer, file_type: str) -> DocumentModel:
+    """Extract a DocumentModel, keeping page boundaries where the format has them"""
+    if file_type == "application/pdf":
+        try:
+            document = DocumentModel.from_pages(iter_pdf_pages(data))
+            return document if document.text else DocumentModel.from_text("No text extracted from PDF")
+        except Exception as e:
+            return DocumentModel.from_text(f"PDF error: {str(e)}")
+    return DocumentModel.from_pages([(None, extract_text(data, file_type))])
+
+def process_uploaded_document(uploaded_file) -> DocumentModel:
+    """Like process_uploaded_file, but returns the cleaned DocumentModel used by the analysis stages"""
+    with open_document_buffer(uploaded_file) as data:
+        file_type = sniff_type(data) or uploaded_file.type
+        key = ExtractionCache.make_key(data, file_type, EXTRACTOR_VERSION + "/document")
+        return get_extraction_cache().get_or_extract(key, lambda: extract_document(data, file_type))
+
+def process_uploaded_file(uploaded_file):
+    """Process uploaded file and extract text
+
+    Results are cached per process by content hash, so reruns and other
+    sessions uploading the same document don't parse it again. The upload is
+    hashed and parsed through a view of its buffer rather than a copy. The
+    extractor is chosen from the file's magic bytes, not the browser's label.
+    """
+    with open_document_buffer(uploaded_file) as data:
+        file_type = sniff_type(data) or uploaded_file.type
+        key = ExtractionCache.make_key(data, file_type, EXTRACTOR_VERSION)
+        return get_extraction_cache().get_or_extract(key, lambda: extract_text(data, file_type))
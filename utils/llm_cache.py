@@ -0,0 +1,152 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.settings import (LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES,
+                             LLM_CACHE_MAX_DISK_BYTES, LLM_CACHE_TTL)
+from utils.lru import LRUCache
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def hash_messages(messages: List[Dict[str, str]]) -> str:
+    """Hash the normalized conversation so whitespace-only differences share an entry"""
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(message.get("role", "").encode())
+        digest.update(b"\x00")
+        digest.update(_WHITESPACE.sub(" ", message.get("content", "")).strip().encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+def make_cache_key(model: str, prompt_version: str, params: Dict[str, Any],
+                   messages: List[Dict[str, str]]) -> str:
+    """Content address for one chat completion request"""
+    material = json.dumps({
+        "model": model,
+        "prompt_version": prompt_version,
+        "params": params,
+        "input": hash_messages(messages),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for LLM responses.
+
+    An in-memory LRU sits in front of an SQLite file. Disk entries expire after
+    `ttl` seconds and the file is trimmed (least recently used first) whenever
+    the stored responses exceed `max_disk_bytes`.
+    """
+
+    def __init__(self, path: Optional[str] = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 max_disk_bytes: int = LLM_CACHE_MAX_DISK_BYTES, ttl: float = LLM_CACHE_TTL):
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = LRUCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+
+        if self._conn is not None:
+            now = time.time()
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self.stats["disk_hits"] += 1
+                    self._memory.put(key, row[0])
+                    return row[0]
+                if row:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        self._memory.put(key, value)
+        self.stats["writes"] += 1
+        if self._conn is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now))
+            self._trim(now)
+            self._conn.commit()
+
+    def _trim(self, now: float) -> None:
+        """Drop expired rows, then least recently used rows until under the size cap"""
+        expired = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)).rowcount
+        self.stats["evictions"] += max(expired, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {**self.stats, "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory)}
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the shared response cache, or None when caching is disabled"""
+    global _default_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
@@ -0,0 +1,233 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import httpx
+from groq import AsyncGroq
+
+from config.settings import (GROQ_API_KEY, GROQ_BASE_URL, MODEL_NAME, TEMPERATURE, LLM_TIMEOUT,
+                             LLM_MAX_CONCURRENCY, LLM_MAX_CONNECTIONS, LLM_KEEPALIVE_EXPIRY)
+from utils.llm_cache import LLMResponseCache, get_llm_cache, make_cache_key
+from utils.rate_limiter import RateLimitScheduler
+from utils.token_budget import estimate_tokens
+
+
+class LLMClient:
+    """
+    Process-wide async chat-completion client.
+
+    Owns a single AsyncGroq instance (one pooled, keep-alive HTTP connection pool)
+    running on a dedicated event loop thread, and bounds the number of in-flight
+    requests with a semaphore. Synchronous callers (analysis stages running on the
+    stage-graph thread pool) block on `chat_completion`; async callers await
+    `achat_completion` from any event loop.
+
+    Responses are memoized in the shared LLM response cache, keyed on model,
+    prompt version, request parameters and the normalized messages. Requests
+    that miss the cache are paced and retried by a RateLimitScheduler.
+
+    Passing `on_delta` streams the completion and calls it with each text
+    fragment as it arrives (on the client's loop thread). JSON-mode requests are
+    not streamed by Groq, so for those - and for cache hits - `on_delta` is
+    called once with the whole response.
+    """
+
+    def __init__(self, api_key: str = GROQ_API_KEY, model: str = MODEL_NAME,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, timeout: float = LLM_TIMEOUT,
+                 max_connections: int = LLM_MAX_CONNECTIONS, cache: Optional[LLMResponseCache] = None,
+                 scheduler: Optional[RateLimitScheduler] = None, base_url: Optional[str] = GROQ_BASE_URL):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.scheduler = scheduler or RateLimitScheduler()
+        self.usage = {"prompt_tokens": 0, "completion_tokens": 0}
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[AsyncGroq] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ---------- event loop ownership ----------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="llm-client-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def _get_client(self) -> AsyncGroq:
+        """Create the client lazily - must run on the owned loop"""
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                ),
+                timeout=self.timeout,
+            )
+            # Retries are handled by the rate limit scheduler
+            self._client = AsyncGroq(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout,
+                                     max_retries=0, http_client=http_client)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    # ---------- requests ----------
+    async def _create(self, messages: List[Dict[str, str]], request: Dict[str, Any],
+                      timeout: Optional[float], on_delta: Optional[Callable[[str], None]] = None) -> str:
+        client = self._get_client()
+        stream = on_delta is not None and "response_format" not in request
+
+        async def send():
+            async with self._semaphore:
+                response = await client.chat.completions.create(
+                    messages=messages,
+                    timeout=timeout or self.timeout,
+                    stream=stream,
+                    **request,
+                )
+                if not stream:
+                    if getattr(response, "usage", None):
+                        self.usage["prompt_tokens"] += response.usage.prompt_tokens or 0
+                        self.usage["completion_tokens"] += response.usage.completion_tokens or 0
+                    return response.choices[0].message.content
+
+                parts = []
+                async for chunk in response:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        on_delta(delta)
+                return "".join(parts)
+
+        # Tokens-per-minute budgets count the prompt plus the requested completion
+        estimated = sum(estimate_tokens(m.get("content", "")) for m in messages) + request["max_tokens"]
+        content = await self.scheduler.run(send, estimated)
+        if on_delta is not None and not stream and content:
+            on_delta(content)
+        return content
+
+    def _submit(self, messages, request, timeout, on_delta=None):
+        return asyncio.run_coroutine_threadsafe(self._create(messages, request, timeout, on_delta),
+                                                self._ensure_loop())
+
+    def _cache_lookup(self, messages, request, prompt_version):
+        """Return (key, cached content) - key is None when caching is disabled"""
+        if self.cache is None:
+            return None, None
+        params = {k: v for k, v in request.items() if k != "model"}
+        key = make_cache_key(request["model"], prompt_version, params, messages)
+        return key, self.cache.get(key)
+
+    def _cache_store(self, key, content):
+        if key is not None and content:
+            self.cache.put(key, content)
+
+    def _build_request(self, max_tokens: int, temperature: float, response_format: Optional[Dict[str, str]],
+                       model: Optional[str]) -> Dict[str, Any]:
+        request = {
+            "model": model or self.model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if response_format:
+            request["response_format"] = response_format
+        return request
+
+    async def achat_completion(self, messages: List[Dict[str, str]], max_tokens: int,
+                               temperature: float = TEMPERATURE, response_format: Optional[Dict[str, str]] = None,
+                               timeout: Optional[float] = None, model: Optional[str] = None,
+                               prompt_version: str = "v1", on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """Send a chat completion and return the message content (awaitable from any loop)"""
+        request = self._build_request(max_tokens, temperature, response_format, model)
+        key, cached = self._cache_lookup(messages, request, prompt_version)
+        if cached is not None:
+            if on_delta is not None:
+                on_delta(cached)
+            return cached
+        content = await asyncio.wrap_future(self._submit(messages, request, timeout, on_delta))
+        self._cache_store(key, content)
+        return content
+
+    def chat_completion(self, messages: List[Dict[str, str]], max_tokens: int,
+                        temperature: float = TEMPERATURE, response_format: Optional[Dict[str, str]] = None,
+                        timeout: Optional[float] = None, model: Optional[str] = None,
+                        prompt_version: str = "v1", on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """Blocking variant of `achat_completion` for synchronous stages"""
+        request = self._build_request(max_tokens, temperature, response_format, model)
+        key, cached = self._cache_lookup(messages, request, prompt_version)
+        if cached is not None:
+            if on_delta is not None:
+                on_delta(cached)
+            return cached
+        content = self._submit(messages, request, timeout, on_delta).result()
+        self._cache_store(key, content)
+        return content
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Scheduler queue/wait metrics, token usage and cache hit/miss counters"""
+        stats = {"scheduler": self.scheduler.get_stats(), "usage": dict(self.usage)}
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
+    def chat_completion_many(self, batch: List[List[Dict[str, str]]], max_tokens: int,
+                             temperature: float = TEMPERATURE, response_format: Optional[Dict[str, str]] = None,
+                             timeout: Optional[float] = None, model: Optional[str] = None,
+                             prompt_version: str = "v1") -> List[Union[str, Exception]]:
+        """
+        Send several conversations concurrently and wait for all of them.
+
+        Results come back in input order; a failed request yields its exception
+        instead of raising, so one bad chunk does not discard the others.
+        """
+        request = self._build_request(max_tokens, temperature, response_format, model)
+        keys, results, futures = [], [], {}
+        for index, messages in enumerate(batch):
+            key, cached = self._cache_lookup(messages, request, prompt_version)
+            keys.append(key)
+            results.append(cached)
+            if cached is None:
+                futures[index] = self._submit(messages, request, timeout)
+
+        for index, future in futures.items():
+            try:
+                results[index] = future.result()
+                self._cache_store(keys[index], results[index])
+            except Exception as e:
+                results[index] = e
+        return results
+
+
+_default_client: Optional[LLMClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Return the shared client, creating it on first use"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = LLMClient()
+        return _default_client
+
+
+def chat_completion(messages: List[Dict[str, str]], max_tokens: int, **kwargs) -> str:
+    """Blocking chat completion through the shared client"""
+    return get_llm_client().chat_completion(messages, max_tokens, **kwargs)
+
+
+def chat_completion_many(batch: List[List[Dict[str, str]]], max_tokens: int, **kwargs) -> List[Union[str, Exception]]:
+    """Concurrent batch of chat completions through the shared client"""
+    return get_llm_client().chat_completion_many(batch, max_tokens, **kwargs)
+
+
+async def achat_completion(messages: List[Dict[str, str]], max_tokens: int, **kwargs) -> str:
+    """Async chat completion through the shared client"""
+    return await get_llm_client().achat_completion(messages, max_tokens, **kwargs)
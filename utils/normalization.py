@@ -0,0 +1,73 @@
+import re
+import unicodedata
+
+# Characters PDF and DOCX extraction leaves behind, mapped in a single str.translate pass
+_CHARACTER_TABLE = str.maketrans({
+    # Typographic ligatures
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl", "\ufb05": "st", "\ufb06": "st",
+    # Unicode spaces become plain spaces (and are then collapsed)
+    "\u00a0": " ", "\u1680": " ", "\u2000": " ", "\u2001": " ", "\u2002": " ", "\u2003": " ", "\u2004": " ",
+    "\u2005": " ", "\u2006": " ", "\u2007": " ", "\u2008": " ", "\u2009": " ", "\u200a": " ", "\u202f": " ",
+    "\u205f": " ", "\u3000": " ", "\u2028": "\n", "\u2029": "\n\n", "\x85": "\n",
+    # Invisible characters: soft hyphen, zero-width spaces and joiners, byte order mark
+    "\u00ad": None, "\u200b": None, "\u200c": None, "\u200d": None, "\u2060": None, "\ufeff": None,
+    # Curly quotes, dashes and ellipsis in their ASCII forms
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201b": "'", "\u2032": "'",
+    "\u201c": '"', "\u201d": '"', "\u201e": '"', "\u201f": '"', "\u2033": '"',
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2015": "-", "\u2212": "-",
+    "\u2026": "...",
+    # C0 and C1 control characters other than whitespace
+    **{chr(code): None for code in (*range(0x00, 0x09), 0x0e, 0x0f, *range(0x10, 0x20), 0x7f, *range(0x80, 0x85),
+                                    *range(0x86, 0xa0))},
+})
+
+# The ASCII part of the table - str.translate has a C fast path for ASCII text
+_ASCII_TABLE = {code: value for code, value in _CHARACTER_TABLE.items() if code < 0x80}
+
+# Any character the table rewrites, for non-ASCII text; only matches call back into Python
+_SPECIAL_CHARACTERS = re.compile("[" + "".join(re.escape(chr(code)) for code in _CHARACTER_TABLE) + "]")
+
+# Each rule starts with a literal, so the regex engine jumps between candidates instead of trying every position
+_HYPHEN_BREAK = re.compile(r'-(?<=[^\W\d_]-)[ \t]*\r?\n\s*(?=[a-z])')  # "recov-\nery" -> "recovery"
+_DOT_LEADER = re.compile(r'\.\.\.\.+')  # "Budget ........ 12" -> "Budget 12"
+_PARAGRAPH_BREAK = re.compile(r'\n[^\S\n]*\n\s*')  # a blank line
+
+
+def _map_character(match: "re.Match") -> str:
+    return _CHARACTER_TABLE[ord(match.group())] or ""
+
+
+def _collapse(text: str) -> str:
+    return " ".join(text.split())
+
+
+def normalize_text(text: str, keep_paragraphs: bool = False) -> str:
+    """
+    Normalize extracted document text.
+
+    Ligatures, Unicode spaces, curly quotes and dashes are mapped to plain
+    forms and control characters dropped, then the text is NFC-normalized if
+    it isn't already. Words hyphenated across line breaks are joined, dot
+    leaders removed and whitespace collapsed to single spaces - or, with
+    `keep_paragraphs`, blank-line paragraph breaks are kept as "\\n\\n".
+
+    Every rule runs as one C-level scan from a precompiled table (a translate
+    table, a character class, a literal-prefixed pattern, or str.split) and
+    only calls back into Python where it actually matches, so ordinary text is
+    never touched character by character in Python.
+    """
+    if not text:
+        return ""
+    if text.isascii():
+        text = text.translate(_ASCII_TABLE)
+    else:
+        text = _SPECIAL_CHARACTERS.sub(_map_character, text)
+        if not unicodedata.is_normalized("NFC", text):
+            text = unicodedata.normalize("NFC", text)
+    if "-" in text:
+        text = _HYPHEN_BREAK.sub("", text)
+    if "...." in text:
+        text = _DOT_LEADER.sub(" ", text)
+    if keep_paragraphs:
+        return "\n\n".join(filter(None, map(_collapse, _PARAGRAPH_BREAK.split(text))))
+    return _collapse(text)
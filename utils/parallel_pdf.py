@@ -0,0 +1,131 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+from config.settings import PDF_EXTRACTION_WORKERS
+from utils.upload_buffer import MemoryviewStream
+
+# Contiguous page ranges handed to each worker per document; a few per worker evens out slow pages
+SHARDS_PER_WORKER = 3
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Worker-side: how long an idle worker keeps the last document mapped for another shard of it
+DOCUMENT_IDLE_SECONDS = 1.0
+
+# Worker-side: the shared memory block, stream and reader of the document currently being extracted
+_worker_document: Dict[str, Any] = {}
+_worker_lock = threading.Lock()
+
+
+def extraction_workers() -> int:
+    return PDF_EXTRACTION_WORKERS or os.cpu_count() or 1
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Process-wide pool, created on first use so serial-only callers never pay for it.
+
+    Workers are spawned, not forked: the app process runs Streamlit, stage-graph
+    and event-loop threads, and a forked child can inherit a lock one of them held.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=extraction_workers(), mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown, wait=False)
+        return _pool
+
+
+def _open_document(name: str, size: int) -> PyPDF2.PdfReader:
+    """Parse the shared PDF once per worker and document, not once per shard"""
+    if _worker_document.get("name") != name:
+        _close_document()
+        shm = shared_memory.SharedMemory(name=name)
+        stream = MemoryviewStream(shm.buf[:size])
+        _worker_document.update(name=name, shm=shm, stream=stream, reader=PyPDF2.PdfReader(stream))
+    return _worker_document["reader"]
+
+
+def _close_document() -> None:
+    if _worker_document:
+        # Drop every view of the buffer before closing, or close() raises BufferError
+        _worker_document["reader"] = None
+        _worker_document["stream"].close()
+        _worker_document["shm"].close()
+        _worker_document.clear()
+
+
+def _release_idle_document(name: str) -> None:
+    """Unmap the document once no shard has used it for DOCUMENT_IDLE_SECONDS"""
+    with _worker_lock:
+        if (_worker_document.get("name") == name
+                and time.monotonic() - _worker_document["used"] >= DOCUMENT_IDLE_SECONDS):
+            _close_document()
+
+
+def _extract_page_range(name: str, size: int, start: int, stop: int) -> List[str]:
+    try:
+        with _worker_lock:
+            reader = _open_document(name, size)
+            return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+    finally:
+        with _worker_lock:
+            if _worker_document:
+                _worker_document["used"] = time.monotonic()
+        timer = threading.Timer(DOCUMENT_IDLE_SECONDS, _release_idle_document, (name,))
+        timer.daemon = True
+        timer.start()
+
+
+def page_ranges(page_count: int, shards: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into at most `shards` contiguous, near-equal ranges"""
+    shards = max(1, min(shards, page_count))
+    size, extra = divmod(page_count, shards)
+    ranges, start = [], 0
+    for i in range(shards):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def iter_pages_parallel(data: bytes, page_count: int) -> Iterator[str]:
+    """
+    Extract every page's text on the process pool, yielding pages in order.
+
+    The PDF bytes are copied once into shared memory; each worker opens its own
+    PdfReader over that block instead of receiving a pickled copy per shard, and
+    unmaps it DOCUMENT_IDLE_SECONDS after its last shard.
+    Pages are yielded as soon as their shard (and every earlier one) is done.
+    """
+    global _pool
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    futures = []
+    try:
+        shm.buf[:len(data)] = data
+        pool = _get_pool()
+        futures = [pool.submit(_extract_page_range, shm.name, len(data), start, stop)
+                   for start, stop in page_ranges(page_count, extraction_workers() * SHARDS_PER_WORKER)]
+        for future in futures:
+            yield from future.result()
+    except BrokenProcessPool:
+        # A crashed worker poisons the pool; start a fresh one next time
+        with _pool_lock:
+            _pool = None
+        raise
+    finally:
+        # The consumer may stop early - don't leave shards queued against freed memory
+        for future in futures:
+            future.cancel()
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,114 @@
+import re
+from functools import lru_cache
+from typing import Any
+
+from config.settings import COMPLETION_RULES_PATH
+from utils.completion_trie import CompletionRules
+
+# Fields holding solicitation numbers, which the model sometimes returns without their "RFP-" prefix
+ID_FIELDS = ("event_id",)
+
+# Strings shorter than this are labels ("High", "N/A") and keep their ending as-is
+MIN_SENTENCE_LENGTH = 10
+
+# Formatted amounts ("4,500,000", "1250.00") that lost their currency sign
+_AMOUNT = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?\b|\d+\.\d{2}\b'
+
+_SENTENCE_ENDS = '.!?'
+
+_CONTAINERS = (dict, list, tuple)
+
+
+_ID_OPENING = re.compile(r'(?P<rfp_id>(?=\d+-\d))|(?P<amount>(?=' + _AMOUNT + r'))|(?P<lowercase>[a-z])')
+_OPENING = re.compile(r'(?P<amount>(?=' + _AMOUNT + r'))|(?P<lowercase>[a-z])')
+
+
+@lru_cache(maxsize=1)
+def get_completion_rules() -> CompletionRules:
+    """Truncated-opening completions from COMPLETION_RULES_PATH, loaded and built into tries once"""
+    return CompletionRules.from_file(COMPLETION_RULES_PATH)
+
+
+def fix_opening(text: str, field: str = "") -> str:
+    """
+    Repair the start of a string: a truncated opening from the completion
+    rules (one trie walk), else an ID missing its "RFP-" prefix, an amount
+    missing its "$", or a lowercase first letter (one anchored match).
+    """
+    completion = get_completion_rules().match(text, field)
+    if completion:
+        return completion[1] + text[completion[0]:]
+    match = (_ID_OPENING if field in ID_FIELDS else _OPENING).match(text)
+    if not match:
+        return text
+    kind = match.lastgroup
+    if kind == "rfp_id":
+        return "RFP-" + text
+    if kind == "amount":
+        return "$" + text
+    return match.group().upper() + text[1:]
+
+
+def _fix_ending(text: str) -> str:
+    """End on a complete sentence: cut a trailing fragment, or terminate a single unfinished one"""
+    if text[-1] in _SENTENCE_ENDS:
+        return text
+    boundary = max(text.rfind('. '), text.rfind('! '), text.rfind('? '))
+    if boundary > 0:
+        return text[:boundary + 1]
+    # IDs, dates and amounts aren't sentences
+    if len(text) < MIN_SENTENCE_LENGTH or " " not in text or not text[-1].isalpha():
+        return text
+    return text + '.'
+
+
+@lru_cache(maxsize=65536)
+def postprocess_text(text: str, field: str = "") -> str:
+    """
+    Repair one model-generated string in a single pass.
+
+    The opening is fixed by fix_opening (truncated-word completions, general
+    and per-`field`), then the ending is cut back to the last complete
+    sentence or terminated. Results are memoized, since the same values recur
+    across stages and reruns.
+    """
+    text = text.strip()
+    if not text:
+        return text
+    return _fix_ending(fix_opening(text, field))
+
+
+def _walk(node: Any, field: str) -> Any:
+    """Rebuild a dict, list or tuple, repairing its strings; leaves are handled inline to skip a call each"""
+    if isinstance(node, dict):
+        fixed = {}
+        for key, value in node.items():
+            key_field = key if isinstance(key, str) else field
+            if isinstance(value, str):
+                fixed[key] = postprocess_text(value, key_field)
+            elif isinstance(value, _CONTAINERS):
+                fixed[key] = _walk(value, key_field)
+            else:
+                fixed[key] = value
+        return fixed
+
+    items = [postprocess_text(item, field) if isinstance(item, str)
+             else _walk(item, field) if isinstance(item, _CONTAINERS) else item
+             for item in node]
+    return items if isinstance(node, list) else tuple(items)
+
+
+def postprocess_results(results: Any, field: str = "") -> Any:
+    """
+    Recursively repair every string in an analysis result tree.
+
+    Dicts, lists and tuples are walked to any depth and rebuilt; each string
+    is processed with the key of the nearest enclosing dict as its field, so
+    field-specific rules also reach strings inside lists and nested records.
+    Other values are returned unchanged.
+    """
+    if isinstance(results, str):
+        return postprocess_text(results, field)
+    if isinstance(results, _CONTAINERS):
+        return _walk(results, field)
+    return results
@@ -0,0 +1,161 @@
+import re
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+import PyPDF2
+
+from config.settings import PREFLIGHT_MIN_CHARS_PER_PAGE, PREFLIGHT_SAMPLE_PAGES
+from .upload_buffer import MemoryviewStream, open_document_buffer
+
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT_TYPE = "text/plain"
+TYPE_NAMES = {PDF_TYPE: "PDF", DOCX_TYPE: "DOCX", TEXT_TYPE: "plain text"}
+
+# PDF readers accept the header anywhere in the first kilobyte
+_PDF_MAGIC_WINDOW = 1024
+_ZIP_MAGIC = b"PK\x03\x04"
+
+# Bytes inspected to decide whether an upload is text, and to estimate DOCX text density
+_TEXT_SAMPLE_BYTES = 64 * 1024
+# Above this share of control characters a "text" upload is treated as binary
+_MAX_CONTROL_RATIO = 0.05
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+_DOCX_TEXT_RUN = re.compile(rb'<w:t(?:\s[^>]*)?>([^<]*)</w:t>')
+
+Buffer = Union[bytes, memoryview]
+
+
+@dataclass
+class PreflightReport:
+    """What the pre-flight check learned about an upload, before any full parse"""
+    declared_type: str
+    detected_type: Optional[str]
+    size: int
+    ok: bool = True
+    reason: str = ""
+    page_count: Optional[int] = None
+    parts: List[str] = field(default_factory=list)
+    estimated_chars: Optional[int] = None
+    chars_per_page: Optional[float] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def file_type(self) -> str:
+        """Type to extract the upload as: the sniffed type wins over the browser's label"""
+        return self.detected_type or self.declared_type
+
+    @property
+    def rerouted(self) -> bool:
+        return bool(self.detected_type) and self.detected_type != self.declared_type
+
+    def reject(self, reason: str) -> "PreflightReport":
+        self.ok, self.reason = False, reason
+        return self
+
+
+def _looks_like_text(sample: Buffer) -> bool:
+    sample = bytes(sample)
+    if b"\x00" in sample:
+        return False
+    try:
+        decoded = sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the sample boundary is still text
+        if e.start < len(sample) - 3:
+            return False
+        decoded = sample[:e.start].decode("utf-8")
+    return len(_CONTROL_CHARS.findall(decoded)) <= len(decoded) * _MAX_CONTROL_RATIO
+
+
+def sniff_type(data: Buffer) -> Optional[str]:
+    """Identify PDF, DOCX or plain text from the content itself; None for anything else"""
+    head = bytes(data[:_PDF_MAGIC_WINDOW])
+    if b"%PDF-" in head:
+        return PDF_TYPE
+    if head.startswith(_ZIP_MAGIC):
+        try:
+            with MemoryviewStream(memoryview(data)) as stream, zipfile.ZipFile(stream) as archive:
+                return DOCX_TYPE if "word/document.xml" in archive.namelist() else None
+        except zipfile.BadZipFile:
+            return None
+    if _looks_like_text(data[:_TEXT_SAMPLE_BYTES]):
+        return TEXT_TYPE
+    return None
+
+
+def _inspect_pdf(data: Buffer, report: PreflightReport) -> None:
+    """Page count from the page tree and text density from a few sampled pages"""
+    with MemoryviewStream(memoryview(data)) as stream:
+        reader = PyPDF2.PdfReader(stream)
+        if reader.is_encrypted and not reader.decrypt(""):
+            report.reject("PDF is password-protected")
+            return
+        report.page_count = page_count = len(reader.pages)
+        if not page_count:
+            report.reject("PDF has no pages")
+            return
+
+        # Spread the sample over the document so a text cover page doesn't hide a scanned body
+        samples = min(PREFLIGHT_SAMPLE_PAGES, page_count)
+        indexes = sorted({round(i * (page_count - 1) / max(samples - 1, 1)) for i in range(samples)})
+        sampled = sum(len((reader.pages[i].extract_text() or "").strip()) for i in indexes)
+
+    report.chars_per_page = sampled / len(indexes)
+    report.estimated_chars = round(report.chars_per_page * page_count)
+    if report.chars_per_page < PREFLIGHT_MIN_CHARS_PER_PAGE:
+        report.reject("PDF has little or no text layer (likely scanned) - run OCR on it before uploading")
+
+
+def _inspect_docx(data: Buffer, report: PreflightReport) -> None:
+    """Part list from the zip directory; text size extrapolated from the start of the body part"""
+    with MemoryviewStream(memoryview(data)) as stream, zipfile.ZipFile(stream) as archive:
+        report.parts = archive.namelist()
+        body = archive.getinfo("word/document.xml")
+        with archive.open(body) as part:
+            sample = part.read(_TEXT_SAMPLE_BYTES)
+
+    sampled = sum(len(run) for run in _DOCX_TEXT_RUN.findall(sample))
+    report.estimated_chars = round(sampled * body.file_size / len(sample)) if sample else 0
+    if not report.estimated_chars:
+        report.reject("DOCX contains no text")
+
+
+def preflight(data: Buffer, declared_type: str = "") -> PreflightReport:
+    """
+    Decide in milliseconds whether an upload is worth parsing.
+
+    The type is sniffed from magic bytes rather than trusted from the browser
+    or extension; a mislabelled but supported file is rerouted to the right
+    extractor via `report.file_type`. PDFs are checked for a usable text layer
+    by sampling a few pages, DOCX files by reading their zip directory and the
+    start of the body part. Unsupported binaries, encrypted or empty PDFs and
+    scanned PDFs come back with `ok=False` and a reason.
+    """
+    started = time.perf_counter()
+    report = PreflightReport(declared_type=declared_type or "", detected_type=sniff_type(data), size=len(data))
+
+    try:
+        if report.detected_type == PDF_TYPE:
+            _inspect_pdf(data, report)
+        elif report.detected_type == DOCX_TYPE:
+            _inspect_docx(data, report)
+        elif report.detected_type == TEXT_TYPE:
+            report.estimated_chars = report.size
+            if not bytes(data[:_TEXT_SAMPLE_BYTES]).strip():
+                report.reject("File is empty")
+        else:
+            report.reject("Unrecognized file content - expected a PDF, DOCX or plain-text document")
+    except Exception as e:
+        report.reject(f"Corrupt or unreadable file: {str(e)}")
+
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
+
+
+def preflight_upload(uploaded_file) -> PreflightReport:
+    """Run the pre-flight check on an uploaded file without copying it"""
+    with open_document_buffer(uploaded_file) as data:
+        return preflight(data, getattr(uploaded_file, "type", ""))
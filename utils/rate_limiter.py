@@ -0,0 +1,153 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from groq import APIConnectionError, APIStatusError, RateLimitError
+
+from config.settings import (GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE, LLM_MAX_RETRIES,
+                             LLM_BACKOFF_BASE, LLM_BACKOFF_MAX)
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` units per second up to `capacity`"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (requests larger than capacity wait for a full bucket)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+
+class RateLimitScheduler:
+    """
+    Paces LLM requests against requests-per-minute and tokens-per-minute budgets.
+
+    Callers queue in FIFO order until both buckets can cover the request. Rate
+    limit (429), server (5xx) and connection errors are retried with jittered
+    exponential backoff, honoring the server's retry-after header when present;
+    a 429 also pauses the whole queue so other callers don't pile on.
+    A budget of 0 disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute: int = GROQ_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = GROQ_TOKENS_PER_MINUTE, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE, backoff_max: float = LLM_BACKOFF_MAX):
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock: Optional[asyncio.Lock] = None
+        self._paused_until = 0.0
+        self._queue_depth = 0
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0,
+                      "total_wait": 0.0, "max_wait": 0.0}
+
+    async def _acquire(self, tokens: int) -> None:
+        if self._lock is None:
+            # Created lazily so it binds to the loop that runs the scheduler
+            self._lock = asyncio.Lock()
+
+        self._queue_depth += 1
+        start = time.monotonic()
+        try:
+            async with self._lock:
+                while True:
+                    wait = max(
+                        self._paused_until - time.monotonic(),
+                        self._requests.wait_time(1) if self._requests else 0.0,
+                        self._tokens.wait_time(tokens) if self._tokens else 0.0,
+                    )
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+
+                if self._requests:
+                    self._requests.consume(1)
+                if self._tokens:
+                    self._tokens.consume(tokens)
+        finally:
+            self._queue_depth -= 1
+
+        waited = time.monotonic() - start
+        self.stats["requests"] += 1
+        self.stats["total_wait"] += waited
+        self.stats["max_wait"] = max(self.stats["max_wait"], waited)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the error is not retryable"""
+        if isinstance(error, APIStatusError):
+            status = getattr(error, "status_code", None)
+            if not isinstance(error, RateLimitError) and (status is None or status < 500):
+                return None
+        elif not isinstance(error, APIConnectionError):
+            return None
+
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        retry_after = None
+        try:
+            if headers.get("retry-after-ms"):
+                retry_after = float(headers["retry-after-ms"]) / 1000
+            elif headers.get("retry-after"):
+                retry_after = float(headers["retry-after"])
+        except ValueError:
+            retry_after = None
+
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max) + random.uniform(0, self.backoff_base)
+
+        # Full jitter: uniform between half and all of the exponential step
+        step = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(step / 2, step)
+
+    async def run(self, request: Callable[[], Awaitable[Any]], estimated_tokens: int = 0) -> Any:
+        """Run `request()` once budget allows, retrying transient failures"""
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens)
+            try:
+                return await request()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                if isinstance(e, RateLimitError):
+                    self.stats["rate_limited"] += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self.stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting for budget"""
+        return self._queue_depth
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "queue_depth": self._queue_depth,
+            "avg_wait": round(self.stats["total_wait"] / requests, 3) if requests else 0.0,
+        }
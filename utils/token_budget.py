@@ -0,0 +1,109 @@
+import re
+from dataclasses import dataclass
+
+from config.settings import (MODEL_NAME, MAX_TOKENS, MAX_PROMPT_TOKENS, MAX_INPUT_TOKENS, STAGE_OUTPUT_TOKENS,
+                             GROQ_TOKENS_PER_MINUTE)
+
+# Context window (prompt + completion tokens) of the models we run on Groq
+MODEL_CONTEXT_WINDOWS = {
+    "llama-3.1-8b-instant": 131072,
+    "llama-3.3-70b-versatile": 131072,
+    "llama3-8b-8192": 8192,
+    "llama3-70b-8192": 8192,
+    "gemma2-9b-it": 8192,
+    "mixtral-8x7b-32768": 32768,
+    "openai/gpt-oss-20b": 131072,
+    "openai/gpt-oss-120b": 131072,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Conservative characters-per-token ratio used to turn token budgets into slice sizes
+CHARS_PER_TOKEN = 3.5
+
+# Tokens kept free for chat formatting overhead and estimation error
+SAFETY_MARGIN_TOKENS = 256
+
+_TOKEN_PIECES = re.compile(r"[^\W\d_]+|\d{1,3}|[^\w\s]|_")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of BPE tokens in text without a tokenizer.
+
+    Counts words, short digit groups and punctuation marks as one token each and
+    charges long words an extra token per seven characters, which tracks the
+    Llama 3 tokenizer closely on English RFP prose.
+    """
+    if not text:
+        return 0
+    pieces = _TOKEN_PIECES.findall(text)
+    return len(pieces) + sum(len(piece) // 7 for piece in pieces if len(piece) > 7)
+
+
+def context_window(model: str = MODEL_NAME) -> int:
+    return MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+@dataclass
+class StageBudget:
+    """Token allowance for one stage request"""
+    input_tokens: int
+    max_tokens: int
+
+    @property
+    def input_chars(self) -> int:
+        return int(self.input_tokens * CHARS_PER_TOKEN)
+
+
+def plan_stage_budget(stage: str, *fixed_prompt_parts: str, model: str = MODEL_NAME) -> StageBudget:
+    """
+    Size a stage's request for the configured model.
+
+    The output allowance comes from STAGE_OUTPUT_TOKENS (capped by MAX_TOKENS);
+    whatever remains of the context window after the fixed prompt text, the
+    output allowance and a safety margin is available for document text.
+    MAX_PROMPT_TOKENS, when set, caps the prompt regardless of the model.
+
+    Groq counts a request's prompt and max_tokens against the tokens-per-minute
+    limit and rejects a request larger than the whole limit (413), so with
+    GROQ_TOKENS_PER_MINUTE set the prompt also fits in what remains of it.
+    MAX_INPUT_TOKENS, when set, caps the document text directly.
+    """
+    window = context_window(model)
+    max_tokens = min(STAGE_OUTPUT_TOKENS.get(stage, MAX_TOKENS), MAX_TOKENS, window // 2)
+
+    prompt_limit = window - max_tokens - SAFETY_MARGIN_TOKENS
+    if MAX_PROMPT_TOKENS:
+        prompt_limit = min(prompt_limit, MAX_PROMPT_TOKENS)
+    if GROQ_TOKENS_PER_MINUTE:
+        prompt_limit = min(prompt_limit, GROQ_TOKENS_PER_MINUTE - max_tokens - SAFETY_MARGIN_TOKENS)
+
+    fixed = sum(estimate_tokens(part) for part in fixed_prompt_parts)
+    input_tokens = max(prompt_limit - fixed, 0)
+    if MAX_INPUT_TOKENS:
+        input_tokens = min(input_tokens, MAX_INPUT_TOKENS)
+    return StageBudget(input_tokens=input_tokens, max_tokens=max_tokens)
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """Trim text so its estimated token count fits within max_tokens"""
+    if not text or max_tokens <= 0:
+        return ""
+
+    # Only look at a prefix a bit larger than the budget, so the cut point
+    # depends on the text being kept and not on edits further down
+    probe_len = int(max_tokens * CHARS_PER_TOKEN * 2)
+    while True:
+        probe = text[:probe_len]
+        tokens = estimate_tokens(probe)
+        if tokens > max_tokens:
+            break
+        if probe_len >= len(text):
+            return text
+        probe_len *= 2
+
+    # Scale by the prefix's own character/token ratio, then verify
+    cut = int(len(probe) * max_tokens / tokens)
+    while cut > 0 and estimate_tokens(text[:cut]) > max_tokens:
+        cut = int(cut * 0.95)
+    return text[:cut]
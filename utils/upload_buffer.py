@@ -0,0 +1,115 @@
+import io
+import mmap
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import Iterator
+
+from config.settings import UPLOAD_SPOOL_MAX_BYTES
+
+_COPY_CHUNK = 1024 * 1024
+
+
+class MemoryviewStream(io.RawIOBase):
+    """Seekable read-only stream over a memoryview, so the PDF/DOCX parsers read buffers in place"""
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        n = len(chunk)
+        buffer[:n] = chunk
+        self._pos += n
+        return n
+
+    def close(self):
+        # Exported views must be released before the shared memory block can be closed
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def upload_size(uploaded_file) -> int:
+    """Size of an upload in bytes, without copying its contents"""
+    size = getattr(uploaded_file, "size", None)
+    if size is not None:
+        return size
+    if hasattr(uploaded_file, "getbuffer"):
+        with uploaded_file.getbuffer() as view:
+            return view.nbytes
+    position = uploaded_file.tell()
+    uploaded_file.seek(0, io.SEEK_END)
+    size = uploaded_file.tell()
+    uploaded_file.seek(position)
+    return size
+
+
+@contextmanager
+def _mapped(file) -> Iterator[memoryview]:
+    """Memory-map an open file read-only; the page cache holds the data, not the heap"""
+    file.seek(0, io.SEEK_END)
+    if file.tell() == 0:
+        yield memoryview(b"")
+        return
+    mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    try:
+        yield view
+    finally:
+        view.release()
+        mapping.close()
+
+
+@contextmanager
+def open_document_buffer(source) -> Iterator[memoryview]:
+    """
+    Expose a document's bytes as a single memoryview, copying as little as possible.
+
+    In-memory uploads (Streamlit's UploadedFile, BytesIO) are viewed in place;
+    bytes-like objects are wrapped; paths are memory-mapped. Other file objects
+    are spooled to a temporary file, kept in memory up to UPLOAD_SPOOL_MAX_BYTES
+    and memory-mapped from disk beyond that. The view is only valid inside the
+    `with` block.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with memoryview(source) as view:
+            yield view
+    elif isinstance(source, (str, Path)):
+        with open(source, "rb") as file, _mapped(file) as view:
+            yield view
+    elif hasattr(source, "getbuffer"):
+        with source.getbuffer() as view:
+            yield view
+    else:
+        with SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES) as spool:
+            if getattr(source, "seekable", lambda: False)():
+                source.seek(0)
+            shutil.copyfileobj(source, spool, _COPY_CHUNK)
+            if getattr(spool, "_rolled", False):
+                spool.flush()
+                with _mapped(spool) as view:
+                    yield view
+            else:
+                with spool._file.getbuffer() as view:
+                    yield view
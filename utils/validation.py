@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from typing import Any, Dict, List, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel, ValidationError
+
+from utils.llm_client import chat_completion
+
+Model = TypeVar("Model", bound=BaseModel)
+
+REPAIR_SYSTEM_PROMPT = """Some fields of a JSON answer failed validation. For each field you are given its
+current value and the validation error. Return a JSON object with a corrected value for exactly these
+fields, using the same keys (dotted paths are nested fields). Keep the meaning; use null if unknown."""
+
+REPAIR_MAX_TOKENS = 1024
+
+
+class ValidationStats:
+    """Per-stage validation time, failures and repair requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def add(self, stage: str, key: str, amount: float = 1) -> None:
+        with self._lock:
+            stats = self._stages.setdefault(stage, {"validations": 0, "failures": 0, "repairs": 0,
+                                                    "repaired": 0, "validate_s": 0.0, "repair_s": 0.0})
+            stats[key] += amount
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                stage: {
+                    **stats,
+                    "validate_s": round(stats["validate_s"], 6),
+                    "repair_s": round(stats["repair_s"], 3),
+                    "avg_validate_us": round(stats["validate_s"] / stats["validations"] * 1e6, 1)
+                    if stats["validations"] else 0.0,
+                }
+                for stage, stats in self._stages.items()
+            }
+
+
+validation_stats = ValidationStats()
+
+
+def get_validation_stats() -> Dict[str, Dict[str, Any]]:
+    return validation_stats.get_stats()
+
+
+def _validate(model: Type[Model], content: Union[str, Dict[str, Any]]) -> Model:
+    # Raw responses go straight to pydantic-core's JSON parser, with no dict in between
+    return model.model_validate_json(content) if isinstance(content, str) else model.model_validate(content)
+
+
+def _invalid_paths(error: ValidationError, data: Dict[str, Any]) -> Dict[Tuple[str, ...], List[str]]:
+    """
+    The parts of `data` to repair, with their error messages: each error's
+    location cut at the deepest key that exists, so a bad value inside a list
+    or union repairs the whole value and a missing field is asked for by name.
+    """
+    paths: Dict[Tuple[str, ...], List[str]] = {}
+    for detail in error.errors():
+        node, path = data, []
+        for part in detail["loc"]:
+            if not isinstance(node, dict) or part not in node:
+                break
+            path.append(part)
+            node = node[part]
+        if not path and detail["loc"]:
+            path = [detail["loc"][0]]
+        if path:
+            paths.setdefault(tuple(str(part) for part in path), []).append(detail["msg"])
+    return paths
+
+
+def _get_path(data: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    for part in path:
+        data = data.get(part) if isinstance(data, dict) else None
+    return data
+
+
+def _set_path(data: Dict[str, Any], path: Tuple[str, ...], value: Any) -> None:
+    for part in path[:-1]:
+        data = data.setdefault(part, {})
+    data[path[-1]] = value
+
+
+def _drop_path(data: Dict[str, Any], path: Tuple[str, ...]) -> None:
+    parent = _get_path(data, path[:-1])
+    if isinstance(parent, dict):
+        parent.pop(path[-1], None)
+
+
+def _request_repair(paths: Dict[Tuple[str, ...], List[str]], data: Dict[str, Any],
+                    prompt_version: str) -> Dict[str, Any]:
+    fields = {".".join(path): {"value": _get_path(data, path), "error": "; ".join(messages)}
+              for path, messages in paths.items()}
+    content = chat_completion(
+        messages=[{"role": "system", "content": REPAIR_SYSTEM_PROMPT},
+                  {"role": "user", "content": json.dumps(fields, default=str)}],
+        max_tokens=REPAIR_MAX_TOKENS,
+        temperature=0,
+        response_format={"type": "json_object"},
+        prompt_version=f"{prompt_version}-repair"
+    )
+    fixes = json.loads(content)
+    return fixes if isinstance(fixes, dict) else {}
+
+
+def validate_stage_output(stage: str, model: Type[Model], content: Union[str, Dict[str, Any]],
+                          prompt_version: str = "v1") -> Model:
+    """
+    Validate a stage's output - the raw JSON response, or a merged dict in
+    chunked mode - against its schema.
+
+    If validation fails, one repair request is sent with only the invalid
+    fields (their values and errors) and the corrections are merged back.
+    Fields that are still invalid - or all of them, if the repair request
+    fails or doesn't return JSON - fall back to their schema defaults; if a
+    required one is among them, the ValidationError is raised. Responses that
+    are not a JSON object can't be repaired field by field and raise at once.
+    """
+    start = time.perf_counter()
+    try:
+        return _validate(model, content)
+    except ValidationError as error:
+        failure = error
+    finally:
+        validation_stats.add(stage, "validate_s", time.perf_counter() - start)
+        validation_stats.add(stage, "validations")
+    validation_stats.add(stage, "failures")
+    return _repair(stage, model, content, failure, prompt_version)
+
+
+def _repair(stage: str, model: Type[Model], content: Union[str, Dict[str, Any]], error: ValidationError,
+            prompt_version: str) -> Model:
+    try:
+        data = json.loads(content) if isinstance(content, str) else json.loads(json.dumps(content, default=str))
+    except json.JSONDecodeError:
+        raise error
+    if not isinstance(data, dict):
+        raise error
+
+    paths = _invalid_paths(error, data)
+    if not paths:
+        raise error
+    start = time.perf_counter()
+    validation_stats.add(stage, "repairs")
+    try:
+        fixes = _request_repair(paths, data, prompt_version)
+    except Exception:
+        # A failed or unreadable repair leaves the invalid fields to the fallback below
+        fixes = {}
+    finally:
+        validation_stats.add(stage, "repair_s", time.perf_counter() - start)
+    for path in paths:
+        key = ".".join(path)
+        if key in fixes:
+            _set_path(data, path, fixes[key])
+
+    try:
+        validated = model.model_validate(data)
+    except ValidationError as still_invalid:
+        # Let the schema defaults stand in for what the repair didn't fix
+        for path in _invalid_paths(still_invalid, data):
+            _drop_path(data, path)
+        validated = model.model_validate(data)
+    validation_stats.add(stage, "repaired")
+    return validated